@@ -1,9 +1,8 @@
 import streamlit as st
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
-from qiskit.circuit.library import QFT
-import matplotlib.pyplot as plt
+from quantum_engine import (exact_probabilities, grover_circuit, grover_iterations,
+                            probabilities_dict, qft_circuit)
+from report_engine import figure_png
+from sim_jobs import ACTIVE_STATES, CANCELLED, DONE, JobQueue
 
 st.set_page_config(
     page_title="Quantum Lab",
@@ -27,6 +26,108 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True) # Hatalı kısım burasıydı, düzelttim.
 
+# --- CACHING LAYER ---
+# Streamlit reruns the whole script on every interaction (even a tab switch).
+# Circuits, transpiled circuits, counts and rendered figures are memoized on
+# (algorithm, qubit count, gate choice, shots, seed) with LRU eviction, and the
+# simulator is one long-lived instance shared by all sessions.
+# Simulations themselves run on a shared background JobQueue (sim_jobs), so a
+# long run neither blocks this session's script thread nor queues other users
+# behind it; identical in-flight requests are deduplicated there.
+# Qiskit, Aer and matplotlib are imported inside the cached helpers, so the
+# page renders before the first simulation needs them.
+
+@st.cache_resource
+def get_backend():
+    from qiskit_aer import AerSimulator
+
+    return AerSimulator()
+
+
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(max_workers=2)
+
+
+@st.cache_resource(max_entries=64)
+def build_circuit(algo, n_qubits=None, gate_type=None):
+    # gate_type: the gate for "Basic Gates", the marked bitstring for Grover.
+    if algo == "Basic Gates":
+        from qiskit import QuantumCircuit
+
+        qc = QuantumCircuit(1)
+        if gate_type == "Hadamard":
+            qc.h(0)
+        elif gate_type == "Pauli-X":
+            qc.x(0)
+        else:
+            qc.z(0)
+    elif algo == "Grover's Search":
+        qc = grover_circuit(n_qubits, gate_type)
+    else:
+        qc = qft_circuit(n_qubits)
+    return qc
+
+
+@st.cache_resource(max_entries=64)
+def transpiled_circuit(algo, n_qubits=None, gate_type=None):
+    from qiskit import transpile
+
+    m_qc = build_circuit(algo, n_qubits, gate_type).copy()
+    m_qc.measure_all()
+    return transpile(m_qc, get_backend())
+
+
+def run_counts(backend, t_qc, shots, seed):
+    # Runs on a JobQueue worker thread: no Streamlit calls in here.
+    return backend.run(t_qc, shots=shots, seed_simulator=seed).result().get_counts()
+
+
+def run_exact(backend, qc):
+    # Exact mode: probabilities straight from the statevector, no shot sampling.
+    return probabilities_dict(exact_probabilities(qc, backend), qc.num_qubits)
+
+
+@st.cache_data(max_entries=64)
+def circuit_png(algo, n_qubits=None, gate_type=None):
+    return figure_png(build_circuit(algo, n_qubits, gate_type).draw(output='mpl'), bbox_inches='tight')
+
+
+@st.cache_data(max_entries=256)
+def histogram_png(counts):
+    from qiskit.visualization import plot_histogram
+
+    return figure_png(plot_histogram(counts), bbox_inches='tight')
+
+
+def job_panel(job_id):
+    jobs = get_job_queue()
+    status = jobs.status(job_id)
+    if status is None:
+        return
+
+    if status["state"] in ACTIVE_STATES:
+        st.info(f"Simulation job #{job_id} is {status['state']}... "
+                f"({jobs.active_count()} active job(s) on the server)")
+        if st.button("Cancel Simulation"):
+            jobs.cancel(job_id)
+            st.rerun()
+    elif status["state"] == DONE:
+        counts = jobs.result(job_id)
+        res_col1, res_col2 = st.columns([2, 1])
+        with res_col1:
+            st.subheader("Probability Distribution")
+            st.image(histogram_png(counts))
+
+        with res_col2:
+            st.subheader("Exact Probabilities" if status["key"][-1] else "Measurement Data")
+            st.write(counts)
+    elif status["state"] == CANCELLED:
+        st.warning(f"Simulation job #{job_id} was cancelled.")
+    else:
+        st.error(f"Simulation job #{job_id} failed: {status['error']}")
+
+
 st.title("Quantum Computing Research Laboratory")
 st.markdown("---")
 
@@ -37,30 +138,37 @@ with st.sidebar:
         ["Basic Gates", "Grover's Search", "Quantum Fourier Transform"]
     )
 
+    st.markdown("---")
+    exact = st.checkbox("Exact probabilities (statevector, no sampling)", value=False)
+    shots = st.number_input("Shots", min_value=1, max_value=100_000, value=2048, step=256,
+                            disabled=exact)
+    # Runs are seeded so a cached result is the result the user would get again.
+    seed = int(st.number_input("Simulator Seed", min_value=0, value=42, step=1))
+
     st.markdown("---")
     st.info("This environment uses the Qiskit Aer high-performance simulator for circuit execution.")
 
-qc = None
+circuit_key = None
 
 if algo == "Basic Gates":
     col1, col2 = st.columns([1, 1])
     with col1:
         st.subheader("Configuration")
         gate_type = st.radio("Gate Type", ["Hadamard", "Pauli-X", "Pauli-Z"])
-        qc = QuantumCircuit(1)
-        if gate_type == "Hadamard":
-            qc.h(0)
-        elif gate_type == "Pauli-X":
-            qc.x(0)
-        else:
-            qc.z(0)
+        circuit_key = (algo, None, gate_type)
 
     with col2:
         st.subheader("Circuit Architecture")
-        st.pyplot(qc.draw(output='mpl'))
+        st.image(circuit_png(*circuit_key))
 
 elif algo == "Grover's Search":
-    st.subheader("Grover's Algorithm (2-Qubit State Search)")
+    n_qubits = st.slider("Qubit Register Size", 2, 12, 2)
+    marked = st.text_input("Marked State (bitstring, qubit 0 on the right)", "1" * n_qubits)
+    if len(marked) != n_qubits or set(marked) - {"0", "1"}:
+        st.error(f"Marked state must be a {n_qubits}-bit string.")
+        st.stop()
+    st.subheader(f"Grover's Algorithm ({n_qubits}-Qubit State Search, "
+                 f"{grover_iterations(n_qubits)} iteration(s))")
 
     tab1, tab2 = st.tabs(["Mathematical Logic", "Circuit Visualization"])
 
@@ -69,43 +177,43 @@ elif algo == "Grover's Search":
         st.markdown(
             "The algorithm enhances the probability amplitude of the target state through reflection about the average.")
 
+    circuit_key = (algo, n_qubits, marked)
     with tab2:
-        qc = QuantumCircuit(2)
-        qc.h(range(2))
-        qc.cz(0, 1)
-        qc.h(range(2))
-        qc.z(range(2))
-        qc.cz(0, 1)
-        qc.h(range(2))
-        st.pyplot(qc.draw(output='mpl'))
+        if n_qubits <= 5:
+            st.image(circuit_png(*circuit_key))
+        else:
+            st.caption("Circuit too large to draw; it can still be simulated.")
 
 elif algo == "Quantum Fourier Transform":
     st.subheader("Quantum Fourier Transform (QFT)")
-    n_qubits = st.slider("Qubit Register Size", 2, 6, 3)
+    n_qubits = st.slider("Qubit Register Size", 2, 12, 3)
 
     with st.expander("Theoretical Foundation"):
         st.latex(r"QFT_N |j\rangle = \frac{1}{\sqrt{N}} \sum_{k=0}^{N-1} \omega_N^{jk} |k\rangle")
 
-    qc = QFT(num_qubits=n_qubits).decompose()
-    st.pyplot(qc.draw(output='mpl'))
+    circuit_key = (algo, n_qubits, None)
+    st.image(circuit_png(*circuit_key))
 
 st.markdown("---")
 
-if qc:
+if circuit_key:
+    jobs = get_job_queue()
+    if exact:
+        request = (*circuit_key, None, None, True)
+    else:
+        request = (*circuit_key, int(shots), seed, False)
     if st.button("Execute Quantum Simulation"):
-        with st.spinner("Processing quantum states..."):
-            backend = AerSimulator()
-            m_qc = qc.copy()
-            m_qc.measure_all()
-
-            result = backend.run(m_qc, shots=2048).result()
-            counts = result.get_counts()
-
-            res_col1, res_col2 = st.columns([2, 1])
-            with res_col1:
-                st.subheader("Probability Distribution")
-                st.pyplot(plot_histogram(counts))
-
-            with res_col2:
-                st.subheader("Measurement Data")
-                st.write(counts)
\ No newline at end of file
+        if exact:
+            st.session_state.job_id = jobs.submit(request, run_exact, get_backend(), build_circuit(*circuit_key))
+        else:
+            t_qc = transpiled_circuit(*circuit_key)
+            st.session_state.job_id = jobs.submit(request, run_counts, get_backend(), t_qc, int(shots), seed)
+
+    job_id = st.session_state.get("job_id")
+    status = jobs.status(job_id) if job_id else None
+    if status is not None and status["key"] == request:
+        if status["state"] in ACTIVE_STATES:
+            # Poll only this panel while the job is in flight.
+            st.fragment(run_every=1)(job_panel)(job_id)
+        else:
+            job_panel(job_id)
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Batch Runner: headless versions of the case-study analyses.
+
+The case scripts end in plt.show() and hardcode one time window. Here an
+analysis is a job dict,
+
+    {"analysis": "anomaly", "path": "data/voyager2_jupiter_s3.tab",
+     "start": "1979-07-08 12:00", "end": "1979-07-10 00:00", "encoding": "entangled3"}
+
+and run_jobs() executes a list of them in one process pool: every worker
+imports NumPy/Qiskit once and then handles many windows/files. Each job
+writes `<name>.csv` (time, inputs, score) to the output directory, a PNG only
+when plotting is requested (Agg backend, no display), and one line of
+`summary.json`.
+
+    python -m quantum_engine run anomaly --encoding entangled3 \\
+        --windows "1979-07-08 12:00,1979-07-10 00:00" "1979-07-20,1979-07-25" --workers 4
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DEFAULT_DATA_PATH = "data/voyager2_jupiter_s3.tab"
+DEFAULT_OUT_DIR = "results/runs"
+
+# analysis -> what it reproduces
+ANALYSES = {
+    "signal": "1_process_signal.py: B_Mag over the window",
+    "anomaly": "quantum_anomaly.py (encoding ry / aer-ry) and complex_quantum.py (entangled3)",
+    "window": "quantum_bridge.py --window: k-qubit sliding-window scores",
+}
+ENCODINGS = ("ry", "aer-ry", "entangled3")
+
+JOB_DEFAULTS = {
+    "path": DEFAULT_DATA_PATH,
+    "start": None,
+    "end": None,
+    "encoding": "ry",
+    "n_reference": None,  # None: 10 for ry, 20 for entangled3 (as in the scripts)
+    "k": 4,
+    "stride": 1,
+    "shots": None,  # anomaly only: None exact, an int (fixed per sample) or "adaptive"
+}
+
+
+def make_jobs(analysis, paths=(DEFAULT_DATA_PATH,), windows=((None, None),), **options):
+    """One job per (file, window) pair; `options` are shared JOB_DEFAULTS overrides."""
+    if analysis not in ANALYSES:
+        raise ValueError(f"analysis must be one of {tuple(ANALYSES)}")
+    jobs = []
+    for path in paths:
+        for start, end in windows:
+            jobs.append(dict(JOB_DEFAULTS, **options, analysis=analysis, path=path, start=start, end=end))
+    for i, job in enumerate(jobs):
+        job.setdefault("name", job_name(job, i))
+    return jobs
+
+
+def job_name(job, index):
+    stem = os.path.splitext(os.path.basename(job["path"]))[0]
+    tag = job["encoding"] if job["analysis"] == "anomaly" else job["analysis"]
+    return f"{index:03d}_{stem}_{tag}"
+
+
+def _scores(job, df):
+    """(scores, shots per sample or None) for the job's analysis."""
+    from quantum_engine import anomaly_scores, entangled3_anomaly_scores, shot_anomaly_scores, window_anomaly_scores
+
+    if job["analysis"] == "signal":
+        return None, None
+    if job["analysis"] == "anomaly" and job.get("shots"):
+        # Compute-uncompute estimates on Aer; aer-ry is the same circuit as ry.
+        if job["encoding"] == "entangled3":
+            data, encoding = df[["Bx", "By", "Bz"]].values, "entangled3"
+        else:
+            data, encoding = df["B_Mag"].values, "ry"
+        return shot_anomaly_scores(data, encoding, job["n_reference"], job["shots"], seed=0)
+    if job["analysis"] == "window":
+        scores = window_anomaly_scores(df["B_Mag"].values, job["k"], job["stride"],
+                                       n_reference=job["n_reference"] or 10)
+        # Window i (starting at row i * stride) scores rows i * stride up to
+        # (i + 1) * stride - 1, so the last window also covers the `stride`
+        # rows from its own start; only the rows after those stay NaN.
+        return np.concatenate([np.repeat(scores, job["stride"]),
+                               np.full(len(df), np.nan)])[:len(df)], None
+    if job["encoding"] == "entangled3":
+        return entangled3_anomaly_scores(df[["Bx", "By", "Bz"]].values, n_reference=job["n_reference"] or 20), None
+    if job["encoding"] not in ENCODINGS:
+        raise ValueError(f"encoding must be one of {ENCODINGS}")
+    return anomaly_scores(df["B_Mag"].values, n_reference=job["n_reference"] or 10, encoding=job["encoding"]), None
+
+
+def _plot(job, df, scores, png_path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    value_cols = [c for c in df.columns if c != "Time"]
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+    for col in value_cols:
+        ax1.plot(df["Time"], df[col], linewidth=1, label=col)
+    ax1.set_ylabel("Magnetic Field (nT)")
+    ax1.legend(loc="upper left")
+    if scores is not None:
+        ax2 = ax1.twinx()
+        ax2.plot(df["Time"], scores, color="tab:red", linestyle="--", label="Anomaly Score")
+        ax2.set_ylabel("Quantum Anomaly Score (0-1)")
+    ax1.set_title(f"{job['name']}: {job['start'] or 'start'} - {job['end'] or 'end'}")
+    fig.tight_layout()
+    fig.savefig(png_path)
+    plt.close(fig)
+
+
+def run_job(job, out_dir=DEFAULT_OUT_DIR, plot=False):
+    """Runs one job and returns its summary record (errors are recorded, not raised)."""
+    from voyager_data import load_window
+
+    t0 = time.perf_counter()
+    record = {k: job[k] for k in ("name", "analysis", "path", "start", "end", "encoding")}
+    try:
+        if job["analysis"] == "anomaly" and job["encoding"] == "entangled3":
+            columns = {"Time": 0, "Bx": 3, "By": 4, "Bz": 5}
+        else:
+            columns = {"Time": 0, "B_Mag": 8}
+        # The scripts assume complete rows; gaps in the record are dropped here.
+        df = load_window(job["path"], job["start"], job["end"], columns).dropna().reset_index(drop=True)
+        if df.empty:
+            raise ValueError("no data in window")
+        scores, shots = _scores(job, df)
+
+        os.makedirs(out_dir, exist_ok=True)
+        out = df.copy()
+        if scores is not None:
+            out["score"] = scores
+        if shots is not None:
+            out["shots"] = shots
+            record["total_shots"] = int(np.sum(shots))
+        csv_path = os.path.join(out_dir, f"{job['name']}.csv")
+        out.to_csv(csv_path, index=False)
+        record["outputs"] = [csv_path]
+        if plot:
+            png_path = os.path.join(out_dir, f"{job['name']}.png")
+            _plot(job, df, scores, png_path)
+            record["outputs"].append(png_path)
+
+        record["n_samples"] = len(df)
+        if scores is not None and np.isfinite(scores).any():
+            peak = int(np.nanargmax(scores))
+            record["max_score"] = float(scores[peak])
+            record["max_score_time"] = str(df["Time"].iloc[peak])
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = time.perf_counter() - t0
+    return record
+
+
+def _run_job_args(args):
+    return run_job(*args)
+
+
+def run_jobs(jobs, out_dir=DEFAULT_OUT_DIR, workers=None, plot=False):
+    """
+    Runs the jobs (in a process pool when workers > 1) and writes
+    out_dir/summary.json. Returns the summary records in job order.
+    """
+    tasks = [(job, out_dir, plot) for job in jobs]
+    if workers and workers > 1 and len(jobs) > 1:
+        from voyager_data import ensure_cache
+
+        # Build each file's column cache once, here, so workers sharing a
+        # file only memory-map it instead of racing to parse it.
+        for path in dict.fromkeys(job["path"] for job in jobs):
+            try:
+                ensure_cache(path)
+            except (OSError, ValueError):
+                pass  # reported by the job itself
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            records = list(pool.map(_run_job_args, tasks))
+    else:
+        records = [run_job(*task) for task in tasks]
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "summary.json"), "w") as f:
+        json.dump(records, f, indent=2)
+    return records
+
+
+def load_job_list(path):
+    """Job list file: a JSON list of job dicts (missing keys take JOB_DEFAULTS)."""
+    with open(path) as f:
+        entries = json.load(f)
+    jobs = [dict(JOB_DEFAULTS, **entry) for entry in entries]
+    for i, job in enumerate(jobs):
+        if job.get("analysis") not in ANALYSES:
+            raise ValueError(f"job {i}: analysis must be one of {tuple(ANALYSES)}")
+        job.setdefault("name", job_name(job, i))
+    return jobs
+
+
+def parse_window(text):
+    """'START,END' (either side may be empty) -> (start, end)."""
+    start, _, end = text.partition(",")
+    return start.strip() or None, end.strip() or None
@@ -1,5 +1,13 @@
 import os
-import requests
+import sys
+import argparse
+
+# PATH CONFIG (pds_download proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from pds_download import DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS, download_all
 
 # NASA PDS-PPI Node (UCLA) - Kesinleşmiş URL
 # Dataset: Voyager 2 Jupiter Encounter Magnetometer Data (System III Coords)
@@ -7,31 +15,44 @@ import requests
 REAL_DATA_URL = "https://pds-ppi.igpp.ucla.edu/data/VG2-J-MAG-4-SUMM-S3COORDS-48.0SEC-V1.1/DATA/S3_48S.TAB"
 SAVE_PATH = "data/voyager2_jupiter_s3.tab"
 
-def download_confirmed_data():
-    print(f"📡 NASA UCLA Sunucusuna Bağlanılıyor...")
-    print(f"🔗 Hedef: {REAL_DATA_URL}")
-
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Science-Bot)'}
-        response = requests.get(REAL_DATA_URL, headers=headers, stream=True)
-
-        if response.status_code == 200:
-            total_size = int(response.headers.get('content-length', 0))
-            print(f"✅ Dosya bulundu! İndiriliyor... (Tahmini boyut: ~15-20 MB)")
-
-            with open(SAVE_PATH, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-
-            print(f"💾 Kaydedildi: {SAVE_PATH}")
-        else:
-            print(f"❌ Hata! Sunucu yanıtı: {response.status_code}")
+# Varsayılan ürün listesi; komut satırından başka PDS ürün URL'leri de verilebilir.
+PRODUCTS = [{'url': REAL_DATA_URL, 'path': SAVE_PATH}]
+
+
+def download_products(products=PRODUCTS, out_dir="data", workers=DEFAULT_WORKERS,
+                      chunk_size=DEFAULT_CHUNK_SIZE, verify=True):
+    """
+    Ürünleri paralel indirir: yarım kalan '.part' dosyaları HTTP Range ile
+    devam ettirilir, MD5 PDS etiketinden (.LBL/.xml) doğrulanır, dosya ancak
+    doğrulandıktan sonra yerine taşınır.
+    """
+    print(f"📡 NASA UCLA Sunucusuna Bağlanılıyor... ({len(products)} ürün, {workers} iş parçacığı)")
+    records = download_all(products, out_dir, workers=workers, chunk_size=chunk_size, verify=verify)
+    for record in records:
+        if record['status'] == 'error':
+            print(f"❌ {record['url']}: {record['error']}")
             print("Link yapısı değişmiş olabilir, lütfen tarayıcıdan kontrol edin.")
+            continue
+        check = "MD5 doğrulandı" if record['verified'] else "etikette checksum yok, doğrulanmadı"
+        verb = "Zaten mevcut" if record['status'] == 'cached' else "Kaydedildi"
+        print(f"💾 {verb}: {record['path']} ({record['bytes'] / 2**20:.1f} MB, {check})")
+    return records
 
-    except Exception as e:
-        print(f"⚠️ Bağlantı hatası: {e}")
+
+def download_confirmed_data():
+    return download_products()
 
 
 if __name__ == "__main__":
-    os.makedirs(os.path.dirname(SAVE_PATH), exist_ok=True)
-    download_confirmed_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="PDS ürünlerini indir (devam ettirilebilir, paralel, doğrulamalı)")
+    parser.add_argument('urls', nargs='*', help="PDS ürün URL'leri (varsayılan: Voyager 2 S3_48S.TAB)")
+    parser.add_argument('--out', default="data", help="URL verildiğinde hedef dizin")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Bayt")
+    parser.add_argument('--no-verify', action='store_true', help="Etiket checksum'ını kontrol etme")
+    args = parser.parse_args()
+
+    products = [{'url': url} for url in args.urls] if args.urls else PRODUCTS
+    records = download_products(products, args.out, args.workers, args.chunk_size, not args.no_verify)
+    if any(record['status'] == 'error' for record in records):
+        sys.exit(1)
@@ -1,31 +1,35 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+import sys
+
+# PATH CONFIG (voyager_data proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from voyager_data import load_window, open_store
 
 DATA_PATH = "data/voyager2_jupiter_s3.tab"
 
 
 def load_and_visualize():
+    import matplotlib.pyplot as plt
+
     print(f"📂 Dosya analiz ediliyor: {DATA_PATH}")
 
     try:
-        df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
-
         # 0: Time
         # 5, 6, 7: Bx, By, Bz (Bileşenler)
         # 8: B_Magnitude (Alan Şiddeti - Aradığımız veri)
-        df = df.rename(columns={0: 'Time', 8: 'B_Mag'})
-
-        # Zaman formatını düzelt
-        df['Time'] = pd.to_datetime(df['Time'])
+        # Dosya bir kez ayrıştırılıp önbelleğe alınır (voyager_data), sonraki açılışlar memory-map.
+        store = open_store(DATA_PATH, [8])
 
         # Jüpiter Geçiş Anı (9 Temmuz 1979)
         start_date = '1979-07-08'
         end_date = '1979-07-10'
 
-        mask = (df['Time'] >= start_date) & (df['Time'] <= end_date)
-        df_zoom = df.loc[mask]
+        df_zoom = load_window(DATA_PATH, start_date, end_date, {'Time': 0, 'B_Mag': 8})
 
-        print(f"📊 Toplam Veri: {len(df)} satır")
+        print(f"📊 Toplam Veri: {len(store[0])} satır")
         print(f"🚀 Jüpiter Yakın Geçiş Verisi: {len(df_zoom)} satır")
 
         # Çizim
@@ -1,40 +1,56 @@
-import pandas as pd
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector, state_fidelity
+
+# PATH CONFIG (quantum_engine proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from quantum_engine import (NOISE_CHANNELS, entangled3_anomaly_scores, fidelity_scores,
+                            noisy_anomaly_scores, noisy_entangled3_anomaly_scores)
+from results_store import DEFAULT_ROOT, ResultsStore, dataset_id
+from voyager_data import load_window
 
 DATA_PATH = "data/voyager2_jupiter_s3.tab"
+RESULTS_DIR = "results/benchmark"
+
+# Etiketli şok pencereleri (ROC/AUC için pozitif sınıf).
+# Varsayılan: quantum_bridge'deki şok anından pencerenin sonuna kadar.
+SHOCK_WINDOWS = [('1979-07-09 12:00', '1979-07-10 00:00')]
+
+# Kapı gürültüsü (yoğunluk matrisi) varyantları için varsayılan kanal ve şiddet.
+GATE_NOISE = ('depolarizing', 0.01)
 
 
 # --- YARDIMCI FONKSİYONLAR ---
 def load_data():
-    df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
-    df = df.rename(columns={0: 'Time', 8: 'B_Mag'})
-    df['Time'] = pd.to_datetime(df['Time'])
     start_date = '1979-07-08 12:00'
     end_date = '1979-07-10 00:00'
-    mask = (df['Time'] >= start_date) & (df['Time'] <= end_date)
-    return df.loc[mask]['B_Mag'].values
+    return load_window(DATA_PATH, start_date, end_date, {'B_Mag': 8})['B_Mag'].values
+
+
+def load_labelled_data(shock_windows=SHOCK_WINDOWS):
+    """Tarama için (B_Mag, [Bx, By, Bz], etiket) dizilerini döndürür."""
+    df = load_window(DATA_PATH, '1979-07-08 12:00', '1979-07-10 00:00',
+                     {'Time': 0, 'Bx': 3, 'By': 4, 'Bz': 5, 'B_Mag': 8})
+    labels = np.zeros(len(df), dtype=bool)
+    for start, end in shock_windows:
+        labels |= ((df['Time'] >= start) & (df['Time'] <= end)).values
+    return df['B_Mag'].values, df[['Bx', 'By', 'Bz']].values, labels
 
 
 def quantum_score(data):
-    # Kuantum Fidelity Metodu
+    # Kuantum Fidelity Metodu (kapalı form, tüm veri tek seferde)
     min_val, max_val = np.min(data), np.max(data)
-    scores = []
 
     # Referans (Sessiz Uzay)
     ref_val = np.mean(data[:20])
-    qc_ref = QuantumCircuit(1)
-    qc_ref.ry((ref_val - min_val) / (max_val - min_val) * np.pi, 0)
-    state_ref = Statevector.from_instruction(qc_ref)
-
-    for val in data:
-        qc = QuantumCircuit(1)
-        qc.ry((val - min_val) / (max_val - min_val) * np.pi, 0)
-        state_curr = Statevector.from_instruction(qc)
-        scores.append(1 - state_fidelity(state_ref, state_curr))  # Anomali Skoru
-    return np.array(scores)
+    return 1 - fidelity_scores(data, ref_val, min_val, max_val, eps=0)  # Anomali Skoru
 
 
 def classical_score(data):
@@ -47,8 +63,162 @@ def classical_score(data):
     return z_scores / np.max(z_scores)
 
 
+def entangled_score(vectors):
+    # 3-Qubit Dolanık Kodlama (complex_quantum ile aynı)
+    return entangled3_anomaly_scores(vectors, n_reference=20)
+
+
+def quantum_dm_score(data, gate_noise=GATE_NOISE):
+    # quantum_score ile aynı, ama kodlama devresi gürültülü (kapalı form Bloch güncellemesi)
+    return noisy_anomaly_scores(data, *gate_noise, n_reference=20)
+
+
+def entangled_dm_score(vectors, gate_noise=GATE_NOISE):
+    # entangled_score, her kapıdan sonra gürültü kanalı ile (toplu yoğunluk matrisleri)
+    return noisy_entangled3_anomaly_scores(vectors, *gate_noise, n_reference=20)
+
+
+VARIANTS = {'quantum': quantum_score, 'classical': classical_score, 'entangled3': entangled_score}
+# Yoğunluk matrisi modu: isteğe bağlı, ideal varyantlarla yan yana çalıştırılır.
+NOISY_VARIANTS = {'quantum-dm': quantum_dm_score, 'entangled3-dm': entangled_dm_score}
+
+
+def roc_curve(labels, scores):
+    """(fpr, tpr) eğrisi; eşit skorlar tek eşik olarak ele alınır."""
+    order = np.argsort(-scores, kind='mergesort')
+    scores, labels = scores[order], labels[order]
+    last = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tp = np.cumsum(labels)[last]
+    fp = (last + 1) - tp
+    tpr = np.r_[0.0, tp / max(labels.sum(), 1)]
+    fpr = np.r_[0.0, fp / max((~labels).sum(), 1)]
+    return fpr, tpr
+
+
+def roc_auc(labels, scores):
+    fpr, tpr = roc_curve(labels, scores)
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+
+# --- PARALEL GÜRÜLTÜ TARAMASI ---
+# Her işçi süreç veriyi bir kez alır (initializer); görevler sadece parametre taşır.
+# store_root verilirse skorlar (veri, yöntem, gürültü, tohum) anahtarıyla
+# results_store'a yazılır; aynı konfigürasyon tekrar çalıştırılınca diskten okunur.
+_WORKER_DATA = {}
+
+
+def _init_worker(b_mag, vectors, labels, store_root=None, dataset=None, gate_noise=GATE_NOISE):
+    _WORKER_DATA.update(b_mag=b_mag, vectors=vectors, labels=labels, dataset=dataset, gate_noise=gate_noise,
+                        store=ResultsStore(store_root) if store_root else None)
+
+
+def run_task(task):
+    """Tek bir (gürültü, tohum, yöntem) konfigürasyonunu skorlar."""
+    noise_amp, seed_index, seed_seq, variant = task
+    b_mag, vectors, labels = _WORKER_DATA['b_mag'], _WORKER_DATA['vectors'], _WORKER_DATA['labels']
+    store = _WORKER_DATA.get('store')
+    # Tohum, kök tohum ve spawn yolu ile tanımlanır (ızgaradaki sırası değil).
+    params = {'noise': noise_amp, 'entropy': seed_seq.entropy, 'spawn_key': list(seed_seq.spawn_key)}
+    gate_noise = _WORKER_DATA['gate_noise'] if variant in NOISY_VARIANTS else None
+    if gate_noise:
+        params['gate_noise'] = list(gate_noise)
+
+    cached = store.load(_WORKER_DATA['dataset'], f"benchmark-{variant}", params) if store else None
+    if cached is not None:
+        # Depodaki skorun süresi eski bir koşuya ait; bu koşunun hızı olarak raporlanmaz.
+        scores = np.array(cached['scores'])
+        wall_time = None
+        stored_wall_time = cached['meta']['metadata']['wall_time']
+    else:
+        # Aynı (gürültü, tohum) çifti tüm yöntemlerde aynı gürültüyü görür.
+        rng = np.random.default_rng(seed_seq)
+        noise = rng.normal(0, noise_amp, (len(b_mag), 4))
+
+        t0 = time.perf_counter()
+        if variant == 'entangled3':
+            scores = entangled_score(vectors + noise[:, 1:])
+        elif variant == 'entangled3-dm':
+            scores = entangled_dm_score(vectors + noise[:, 1:], gate_noise)
+        elif variant == 'quantum-dm':
+            scores = quantum_dm_score(b_mag + noise[:, 0], gate_noise)
+        else:
+            scores = VARIANTS[variant](b_mag + noise[:, 0])
+        wall_time = stored_wall_time = time.perf_counter() - t0
+        if store:
+            store.save(_WORKER_DATA['dataset'], f"benchmark-{variant}", params, scores,
+                       metadata={'wall_time': wall_time, 'seed': seed_index})
+
+    return {
+        'noise': noise_amp,
+        'seed': seed_index,
+        'variant': variant,
+        'auc': roc_auc(labels, scores),
+        'gate_noise': list(gate_noise) if gate_noise else None,
+        'wall_time': wall_time,
+        'samples_per_sec': len(scores) / wall_time if wall_time else None,
+        'n_samples': len(scores),
+        'cached': cached is not None,
+        'stored_wall_time': stored_wall_time,
+    }, scores
+
+
+def run_sweep(b_mag, vectors, labels, noise_levels, n_seeds=4, variants=tuple(VARIANTS),
+              root_seed=0, workers=None, out_dir=RESULTS_DIR, store_root=None, gate_noise=GATE_NOISE,
+              shock_windows=SHOCK_WINDOWS):
+    """
+    Gürültü x tohum x yöntem ızgarasını süreç havuzunda çalıştırır.
+    Sonuçlar: out_dir/benchmark_results.json (AUC, süre) ve
+    out_dir/benchmark_scores.npz (skorlar ve ROC eğrileri).
+    store_root verilirse (CLI: --store) önceki skorlar yeniden kullanılır; bu
+    kayıtlar 'cached' ile işaretlenir, süreleri ölçülmez (wall_time=None,
+    eski süre 'stored_wall_time' alanında).
+    gate_noise = (kanal, şiddet): '-dm' varyantlarının kapı gürültüsü.
+    shock_windows: `labels`'ın üretildiği şok pencereleri (JSON'a yazılır).
+    """
+    root = np.random.SeedSequence(root_seed)
+    children = root.spawn(len(noise_levels) * n_seeds)
+    tasks = [(noise_amp, seed_index, children[i * n_seeds + seed_index], variant)
+             for i, noise_amp in enumerate(noise_levels)
+             for seed_index in range(n_seeds)
+             for variant in variants]
+
+    print(f"🧪 {len(tasks)} konfigürasyon çalıştırılıyor...")
+    dataset = dataset_id(b_mag, vectors) if store_root else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(b_mag, vectors, labels, store_root, dataset, gate_noise)) as pool:
+        outputs = list(pool.map(run_task, tasks))
+    n_cached = sum(record['cached'] for record, _ in outputs)
+    if n_cached:
+        print(f"♻️ {n_cached}/{len(tasks)} konfigürasyon sonuç deposundan okundu.")
+    # İdeal ve gürültülü yolun maliyeti yan yana (örnek/s, tohumlar üzerinden ortalama)
+    for variant in variants:
+        rates = [r['samples_per_sec'] for r, _ in outputs if r['variant'] == variant and r['samples_per_sec']]
+        if rates:
+            print(f"   {variant:>14}: {np.mean(rates):14,.0f} örnek/s")
+
+    records = [record for record, _ in outputs]
+    arrays = {}
+    for record, scores in outputs:
+        key = f"{record['variant']}_noise{record['noise']}_seed{record['seed']}"
+        fpr, tpr = roc_curve(labels, scores)
+        arrays[key] = scores
+        arrays[key + '_fpr'], arrays[key + '_tpr'] = fpr, tpr
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, 'benchmark_results.json'), 'w') as f:
+        json.dump({'root_seed': root_seed, 'shock_windows': [list(w) for w in shock_windows], 'results': records},
+                  f, indent=2)
+    np.savez_compressed(os.path.join(out_dir, 'benchmark_scores.npz'), labels=labels, **arrays)
+
+    print(f"💾 Sonuçlar kaydedildi: {out_dir}")
+    return records
+
+
 # --- DENEY ---
 def run_benchmark():
+    # matplotlib sadece grafik modunda; tarama işçileri onu hiç yüklemez.
+    import matplotlib.pyplot as plt
+
     raw_signal = load_data()
 
     # Gürültü Seviyeleri (Noise Levels)
@@ -56,9 +226,10 @@ def run_benchmark():
 
     fig, axes = plt.subplots(len(noise_levels), 1, figsize=(10, 12), sharex=True)
 
+    rng = np.random.default_rng(0)
     for i, noise_amp in enumerate(noise_levels):
         # Sinyale Gürültü Ekle
-        noisy_signal = raw_signal + np.random.normal(0, noise_amp, len(raw_signal))
+        noisy_signal = raw_signal + rng.normal(0, noise_amp, len(raw_signal))
 
         # Skorları Hesapla
         q_scores = quantum_score(noisy_signal)
@@ -80,4 +251,27 @@ def run_benchmark():
 
 
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Kuantum vs klasik anomali skoru benchmark'ı")
+    parser.add_argument('--sweep', action='store_true', help="Grafik yerine paralel gürültü taraması çalıştır")
+    parser.add_argument('--noise', type=float, nargs='+', default=[0, 5, 10], help="Gürültü genlikleri (nT)")
+    parser.add_argument('--seeds', type=int, default=4, help="Her gürültü seviyesi için tohum sayısı")
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS), choices=[*VARIANTS, *NOISY_VARIANTS])
+    parser.add_argument('--gate-noise', nargs=2, default=list(GATE_NOISE), metavar=('CHANNEL', 'P'),
+                        help=f"'-dm' varyantları için kapı gürültüsü; kanal: {', '.join(NOISE_CHANNELS)}")
+    parser.add_argument('--root-seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default=RESULTS_DIR)
+    parser.add_argument('--shock', nargs=2, action='append', metavar=('START', 'END'),
+                        help="Etiketli şok penceresi (tekrarlanabilir; varsayılan: SHOCK_WINDOWS)")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_ROOT, default=None,
+                        help=f"Önceki skorları sonuç deposundan kullan/depoya yaz (varsayılan dizin: {DEFAULT_ROOT}). "
+                             "Kapalıyken her konfigürasyon yeniden ölçülür.")
+    args = parser.parse_args()
+
+    if args.sweep:
+        shock_windows = [tuple(w) for w in args.shock] if args.shock else SHOCK_WINDOWS
+        run_sweep(*load_labelled_data(shock_windows), args.noise, args.seeds, args.variants,
+                  args.root_seed, args.workers, args.out, args.store,
+                  (args.gate_noise[0], float(args.gate_noise[1])), shock_windows)
+    else:
+        run_benchmark()
\ No newline at end of file
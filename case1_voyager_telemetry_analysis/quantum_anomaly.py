@@ -1,8 +1,16 @@
-import pandas as pd
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector, state_fidelity
+
+# PATH CONFIG (quantum_engine proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from instrumentation import count
+from quantum_engine import fidelity_scores
+from results_store import DEFAULT_ROOT, ResultsStore, dataset_id
+from voyager_data import RunningStats, iter_tab_chunks, load_window
 
 # Veri Yolu
 DATA_PATH = "data/voyager2_jupiter_s3.tab"
@@ -11,14 +19,9 @@ DATA_PATH = "data/voyager2_jupiter_s3.tab"
 def load_data():
     """Veriyi yükler ve Jüpiter geçişine odaklar."""
     try:
-        df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
-        df = df.rename(columns={0: 'Time', 8: 'B_Mag'})
-        df['Time'] = pd.to_datetime(df['Time'])
-
         # Jüpiter Şok Geçişi (Zoom) - Temmuz 1979 başı
         # Analiz hızlı olsun diye sadece 300 veri noktasını alıyoruz
-        mask = (df['Time'] >= '1979-07-08 00:00') & (df['Time'] <= '1979-07-10 00:00')
-        return df.loc[mask].reset_index(drop=True)
+        return load_window(DATA_PATH, '1979-07-08 00:00', '1979-07-10 00:00', {'Time': 0, 'B_Mag': 8})
     except Exception as e:
         print(f"Hata: {e}")
         return None
@@ -29,6 +32,10 @@ def data_to_quantum_state(value, min_val, max_val):
     Tek bir sayısal değeri (Magnetic Field) Kuantum Durumuna (Statevector) çevirir.
     Yöntem: Ry Rotation (Y ekseninde döndürme)
     """
+    # Qiskit sadece bu referans yolunda gerekir (kapalı form onsuz çalışır).
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+
     # 1. Veriyi 0 ile Pi arasına normalize et
     norm_val = (value - min_val) / (max_val - min_val + 1e-6)
     angle = norm_val * np.pi
@@ -38,10 +45,30 @@ def data_to_quantum_state(value, min_val, max_val):
     qc.ry(angle, 0)  # Qubit'i 'angle' kadar döndür
 
     # 3. Durum Vektörünü (Statevector) Hesapla
+    count("circuits_built")
+    count("statevector_evaluations")
     return Statevector.from_instruction(qc)
 
 
-def run_anomaly_detection():
+def stream_anomaly_detection(paths, chunksize=100_000, start=None, end=None):
+    """
+    Çok dosyalı / RAM'e sığmayan kayıtlar için akış modu.
+    1. geçiş: min/max ve referans (ilk 10 verinin ortalaması) parça parça toplanır.
+    2. geçiş: her parça skorlanır ve (zaman, skor) blokları olarak döndürülür.
+    Bellek kullanımı parça boyutuyla sınırlıdır.
+    """
+    stats = RunningStats([8], n_reference=10)
+    for _ in iter_tab_chunks(paths, [8], chunksize, start, end, stats=stats):
+        pass
+
+    for block in iter_tab_chunks(paths, [8], chunksize, start, end):
+        fidelities = fidelity_scores(block[8], stats.reference[0], stats.min[0], stats.max[0])
+        yield block[0], 1 - fidelities
+
+
+def run_anomaly_detection(store_root=None):
+    import matplotlib.pyplot as plt
+
     print("🚀 Kuantum Anomali Dedektörü Başlatılıyor...")
 
     # 1. Veriyi Yükle
@@ -56,26 +83,24 @@ def run_anomaly_detection():
     # 2. REFERANS DURUMU BELİRLE (Sessiz Uzay)
     # İlk 10 verinin ortalamasını 'Normal Uzay' kabul ediyoruz.
     reference_value = np.mean(magnetic_data[:10])
-    reference_state = data_to_quantum_state(reference_value, min_val, max_val)
 
     print(f"🌌 Referans (Normal) Değer: {reference_value:.2f} nT")
 
-    # 3. TARAMA (Scanning)
-    # Her veri noktası için 'Fidelity' hesapla
-    fidelities = []
-
-    for value in magnetic_data:
-        # Mevcut veriyi kuantum durumuna çevir
-        current_state = data_to_quantum_state(value, min_val, max_val)
-
-        # Referans ile benzerliğini ölç (0 ile 1 arası)
-        # 1.0 = Birebir Aynı, 0.0 = Tamamen Zıt
-        fid = state_fidelity(reference_state, current_state)
-        fidelities.append(fid)
-
-    # 4. ANOMALİ SKORU (Ters Fidelity)
+    # 3. TARAMA (Scanning) + 4. ANOMALİ SKORU (Ters Fidelity)
+    # Tüm veri noktaları için 'Fidelity' tek seferde hesaplanır.
+    # Ry kodlamasında fidelity = cos²((θ_i - θ_ref) / 2), devre kurmaya gerek yok.
+    # 1.0 = Birebir Aynı, 0.0 = Tamamen Zıt
     # Benzerlik ne kadar düşükse, anomali o kadar yüksektir.
-    anomaly_scores = 1 - np.array(fidelities)
+    # store_root verilirse (CLI: --store) skorlar sonuç deposuna yazılır; aynı
+    # veriyle tekrar çalıştırınca diskten okunur. Varsayılan: diske yazılmaz.
+    def compute():
+        return 1 - fidelity_scores(magnetic_data, reference_value, min_val, max_val)
+
+    if store_root:
+        anomaly_scores = ResultsStore(store_root).get_or_compute(
+            dataset_id(magnetic_data), 'ry', {'n_reference': 10, 'eps': 1e-6}, compute)['scores']
+    else:
+        anomaly_scores = compute()
 
     # 5. GÖRSELLEŞTİRME
     fig, ax1 = plt.subplots(figsize=(12, 6))
@@ -113,4 +138,9 @@ def run_anomaly_detection():
 
 
 if __name__ == "__main__":
-    run_anomaly_detection()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kuantum anomali dedektörü (1 qubit, B_Mag)")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_ROOT, default=None,
+                        help=f"Skorları sonuç deposundan kullan/depoya yaz (varsayılan dizin: {DEFAULT_ROOT})")
+    run_anomaly_detection(parser.parse_args().store)
\ No newline at end of file
@@ -1,9 +1,16 @@
-import pandas as pd
+import os
+import sys
+import argparse
 import numpy as np
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_bloch_multivector
-import matplotlib.pyplot as plt
+
+# PATH CONFIG (voyager_data proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from instrumentation import count, timer
+from quantum_engine import AerParameterRunner, ry_template, window_anomaly_scores
+from voyager_data import open_store, time_slice
 
 DATA_PATH = "data/voyager2_jupiter_s3.tab"
 
@@ -13,16 +20,16 @@ def get_shock_data():
     Gerçek veriden Jüpiter şok dalgasının en belirgin olduğu 4 noktayı çeker.
     """
     try:
-        df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
-        df = df.rename(columns={0: 'Time', 8: 'B_Mag'})
-        df['Time'] = pd.to_datetime(df['Time'])
+        store = open_store(DATA_PATH, [8])
 
-        # Jüpiter Şok Anı (Tam geçiş saati)
+        # Jüpiter Şok Anı (Tam geçiş saati) - sıralı zaman ekseninde ikili arama
         shock_time = '1979-07-09 12:00'
-        start_idx = df[df['Time'] >= shock_time].index[0]
+        start_idx = time_slice(store[0], start=shock_time).start
 
         # 4 Ardışık veri noktasını al
-        shock_values = df['B_Mag'].iloc[start_idx: start_idx + 4].values
+        shock_values = np.array(store[8][start_idx: start_idx + 4])
+        if len(shock_values) == 0:
+            raise IndexError(f"{shock_time} sonrasında veri yok")
         return shock_values
 
     except Exception as e:
@@ -30,6 +37,20 @@ def get_shock_data():
         return np.array([10.0, 12.0, 45.0, 15.0])
 
 
+def windowed_shock_scores(k=4, stride=1):
+    """
+    encode_to_quantum'un k-kübitlik kayan pencere hali: tüm kayıt boyunca her
+    pencere bir çarpım durumu, referansa sadakat kübit başına cos² çarpımı.
+    Döner: (pencere başlangıç zamanları, skorlar)
+    """
+    store = open_store(DATA_PATH, [8])
+    valid = ~np.isnan(store[8])
+    times = store[0][valid]
+    with timer("encode", samples=int(valid.sum())):
+        scores = window_anomaly_scores(store[8][valid], k=k, stride=stride)
+    return times[:len(times) - k + 1:stride], scores
+
+
 def normalize_to_angles(data):
     # Veriyi 0 ile Pi arasına sıkıştır (Radyan)
     min_val = np.min(data)
@@ -40,6 +61,8 @@ def normalize_to_angles(data):
 
 
 def encode_to_quantum(angles):
+    from qiskit import QuantumCircuit
+
     # Ry kapıları ile veriyi kuantum durumuna kodla
     n_qubits = len(angles)
     qc = QuantumCircuit(n_qubits)
@@ -49,6 +72,25 @@ def encode_to_quantum(angles):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Voyager -> kuantum durum köprüsü")
+    parser.add_argument('--window', type=int, default=0,
+                        help="k > 0: tüm kaydı k-kübitlik kayan pencerelerle skorla")
+    parser.add_argument('--stride', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.window > 0:
+        window_times, scores = windowed_shock_scores(args.window, args.stride)
+        top = np.argsort(scores)[::-1][:5]
+        print(f"🪟 {len(scores)} pencere (k={args.window}, stride={args.stride}) skorlandı. En anormal pencereler:")
+        for i in top:
+            print(f"   {window_times[i]} | skor={scores[i]:.4f}")
+        sys.exit(0)
+
+    # Qiskit/matplotlib sadece tek-pencere gösteriminde yüklenir
+    from qiskit.quantum_info import Statevector
+    from qiskit.visualization import plot_bloch_multivector
+    import matplotlib.pyplot as plt
+
     # 1. Veriyi Al
     raw_data = get_shock_data()
     print(f"📡 Voyager Ham Verisi (4 Adım): {raw_data} nT")
@@ -58,14 +100,15 @@ if __name__ == "__main__":
     print(f"🔄 Kuantum Açıları (Radyan): {np.round(quantum_angles, 3)}")
 
     # 3. Devre ve Simülasyon
-    qc = encode_to_quantum(quantum_angles)
+    with timer("encode", samples=len(quantum_angles)):
+        qc = encode_to_quantum(quantum_angles)
+    count("circuits_built")
     print("\n⚛️ Kuantum Devresi:")
     print(qc)
 
-    backend = AerSimulator(method='statevector')
-    qc.save_statevector()
-    result = backend.run(qc).result()
-    statevector = result.get_statevector(qc)
+    # Şablon (ParameterVector) bir kez transpile edilir; açılar tek işte bağlanır
+    runner = AerParameterRunner(ry_template(len(quantum_angles)))
+    statevector = Statevector(runner.statevectors(quantum_angles)[0])
 
     print("\n📊 Bloch Küresi Gösteriliyor...")
     plot_bloch_multivector(statevector)
@@ -1,23 +1,26 @@
-import pandas as pd
+import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector, state_fidelity
+
+# PATH CONFIG (quantum_engine proje kökünde)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from instrumentation import count
+from quantum_engine import entangled3_fidelity_scores, entangled3_states
+from results_store import DEFAULT_ROOT, ResultsStore, dataset_id
+from voyager_data import RunningStats, iter_tab_chunks, load_window
 
 DATA_PATH = "voyager2_jupiter_s3.tab"
 
 def load_vector_data():
     """Voyager 2'nin 3 boyutlu (X, Y, Z) manyetik verisini çeker."""
     try:
-        df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
         # Sütunlar: 3(Br), 4(Bt), 5(Bn) -> 3 Boyutlu Veri
-        df = df.iloc[:, [0, 3, 4, 5]]
-        df.columns = ['Time', 'Bx', 'By', 'Bz']
-        df['Time'] = pd.to_datetime(df['Time'])
-
         # Jüpiter Şok Geçişi
-        mask = (df['Time'] >= '1979-07-08 12:00') & (df['Time'] <= '1979-07-10 00:00')
-        return df.loc[mask].reset_index(drop=True)
+        return load_window(DATA_PATH, '1979-07-08 12:00', '1979-07-10 00:00',
+                           {'Time': 0, 'Bx': 3, 'By': 4, 'Bz': 5})
     except Exception as e:
         print(f"Hata: {e}")
         return None
@@ -28,6 +31,10 @@ def encode_multidimensional(data_row, min_vals, max_vals):
     3 Farklı veriyi (Bx, By, Bz) alır ve
     3 Qubit'lik DOLANIK (Entangled) bir devreye kodlar.
     """
+    # Qiskit sadece bu referans yolunda gerekir (toplu yol NumPy ile çalışır).
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+
     qc = QuantumCircuit(3)
 
     # 1. ENCODING (Her veriyi kendi Qubit'ine yükle)
@@ -44,10 +51,30 @@ def encode_multidimensional(data_row, min_vals, max_vals):
     qc.cx(1, 2)  # CNOT: By değişirse Bz de etkilensin
     qc.cx(2, 0)  # Ring connection (Halka bağlantı)
 
+    count("circuits_built")
+    count("statevector_evaluations")
     return Statevector.from_instruction(qc)
 
 
-def run_complex_analysis():
+def stream_complex_analysis(paths, chunksize=100_000, start=None, end=None):
+    """
+    Uzun kayıtlar için akış modu: önce sütun bazlı min/max ve referans
+    (ilk 20 satırın ortalaması) toplanır, sonra her parça (zaman, skor) olarak skorlanır.
+    """
+    columns = [3, 4, 5]
+    stats = RunningStats(columns, n_reference=20)
+    for _ in iter_tab_chunks(paths, columns, chunksize, start, end, stats=stats):
+        pass
+
+    for block in iter_tab_chunks(paths, columns, chunksize, start, end):
+        vectors = np.column_stack([block[c] for c in columns])
+        fidelities = entangled3_fidelity_scores(vectors, stats.reference, stats.min, stats.max)
+        yield block[0], 1 - fidelities
+
+
+def run_complex_analysis(store_root=None):
+    import matplotlib.pyplot as plt
+
     print("🚀 3-Qubit Vektör Analizi Başlatılıyor...")
     df = load_vector_data()
     if df is None: return
@@ -63,16 +90,23 @@ def run_complex_analysis():
 
     # 1. Referans Durumu (Sessiz Uzay Ortalaması)
     ref_vector = np.mean(vectors[:20], axis=0)
-    state_ref = encode_multidimensional(ref_vector, min_vals, max_vals)
 
     # 2. Tarama
-    fidelities = []
-    for row in vectors:
-        state_curr = encode_multidimensional(row, min_vals, max_vals)
-        # 3 Qubit'lik uzayda (8 Boyutlu Hilbert Uzayı) benzerlik ölçümü
-        fidelities.append(state_fidelity(state_ref, state_curr))
-
-    anomaly_scores = 1 - np.array(fidelities)
+    # Tüm satırlar tek seferde (N, 8) durum matrisine kodlanır; CNOT halkası
+    # sabit bir indeks permütasyonu olarak uygulanır.
+    # 3 Qubit'lik uzayda (8 Boyutlu Hilbert Uzayı) benzerlik ölçümü
+    # store_root verilirse (CLI: --store) skorlar ve (N, 8) durum genlikleri
+    # sonuç deposuna yazılır; tekrar çalıştırmada ya da başka araçlarda
+    # diskten (memmap) okunur. Varsayılan: diske yazılmaz.
+    def compute():
+        fidelities = entangled3_fidelity_scores(vectors, ref_vector, min_vals, max_vals)
+        return 1 - fidelities, entangled3_states(vectors, min_vals, max_vals)
+
+    if store_root:
+        anomaly_scores = ResultsStore(store_root).get_or_compute(
+            dataset_id(vectors), 'entangled3', {'n_reference': 20, 'eps': 1e-6}, compute)['scores']
+    else:
+        anomaly_scores = compute()[0]
 
     # 3. Görselleştirme
     plt.figure(figsize=(12, 6))
@@ -91,4 +125,9 @@ def run_complex_analysis():
 
 
 if __name__ == "__main__":
-    run_complex_analysis()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="3-qubit dolanık vektör anomali analizi (Bx, By, Bz)")
+    parser.add_argument('--store', nargs='?', const=DEFAULT_ROOT, default=None,
+                        help=f"Skorları ve durumları sonuç deposundan kullan/depoya yaz (varsayılan dizin: {DEFAULT_ROOT})")
+    run_complex_analysis(parser.parse_args().store)
\ No newline at end of file
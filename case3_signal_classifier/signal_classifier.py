@@ -1,25 +1,11 @@
 import sys
 import os
-import matplotlib
-matplotlib.use('Agg') # No GUI mode
-import matplotlib.pyplot as plt
+import argparse
 import numpy as np
-import pandas as pd
 import time
-import base64
-from datetime import datetime
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import accuracy_score
-from qiskit.primitives import StatevectorSampler
-from qiskit import QuantumCircuit
-from qiskit.circuit.library import ZZFeatureMap, RealAmplitudes
-from qiskit_machine_learning.neural_networks import SamplerQNN
-from qiskit_algorithms.utils import algorithm_globals
-from scipy.optimize import minimize
-from weasyprint import HTML
 
+# Ağır kütüphaneler (sklearn, qiskit, matplotlib, weasyprint) ilk kullanıldıkları
+# fonksiyonda yüklenir: --help ve veri hazırlığı Qiskit'i beklemez.
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -27,152 +13,200 @@ warnings.filterwarnings('ignore')
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 DATA_PATH = os.path.join(project_root, 'data', 'voyager2_jupiter_s3.tab')
+REPORT_PATH = os.path.join(current_dir, "Quantum_Analysis_Report.pdf")
+KERNEL_CACHE = os.path.join(project_root, 'results', 'kernels')
+sys.path.append(project_root)
 
-def create_dataset():
+from feature_pipeline import build_dataset, load_series, split_scaled
+from instrumentation import timer
+from qnn_engine import FidelityKernel, StatevectorQNN, fit, fit_kernel_svm, parity, qnn_forward, sampler_qnn
+from report_engine import figure_png, report_queue, submit_report
+
+def create_dataset(start=5000, stop=5400, stride=None):
+    """
+    start/stop: temizlenmiş, zamana göre sıralı sütun önbelleğindeki satır
+    konumları (bozuk satırlar atlanır; ham dosyadaki satır numarası değil,
+    bkz. feature_pipeline.load_series).
+    stop=None: kaydın sonuna kadar (tüm Voyager verisi). Pencereler bellek
+    eşlemli sütundan kopyasız alınır (feature_pipeline); stride < 4 örtüşen
+    pencereler üretir. Döner: X_train, X_test, y_train, y_test; ölçekleyici
+    yalnızca eğitim kümesine göre ayarlanır.
+    """
     print("📡 Preparing Signal Dataset...")
     try:
         if os.path.exists(DATA_PATH):
-            df = pd.read_csv(DATA_PATH, header=None, sep=',', on_bad_lines='skip')
-            raw_data = df.iloc[5000:5400, 8].values 
-            raw_data = raw_data[~np.isnan(raw_data)]
+            raw_data = load_series(DATA_PATH, start, stop)
             print("✅ Real Voyager data loaded.")
         else:
             raise FileNotFoundError()
     except:
-        raw_data = np.random.normal(10, 2, 400)
-    
-    X_nat = raw_data[:len(raw_data)//4 * 4].reshape(-1, 4)
-    y_nat = np.zeros(len(X_nat))
-    t = np.linspace(0, 20, len(raw_data))
-    X_art = (5 * np.sin(t) + 10 + np.random.normal(0, 0.5, len(raw_data)))[:len(raw_data)//4 * 4].reshape(-1, 4)
-    
-    min_len = min(len(X_nat), len(X_art))
-    X = np.concatenate([X_nat[:min_len], X_art[:min_len]])
-    y = np.concatenate([y_nat[:min_len], np.ones(min_len)])
-    X_scaled = MinMaxScaler(feature_range=(0, 1)).fit_transform(X)
-    return X_scaled, y
+        raw_data = np.random.normal(10, 2, (stop or start + 400) - start)
+
+    X, y = build_dataset(raw_data, width=4, stride=stride)
+    return split_scaled(X, y, test_size=0.3, random_state=42)
 
-def parity(x):
-    return "{:b}".format(x).count("1") % 2
+def rows_label(rows):
+    """Rapor etiketi: stop=None (kaydın sonu) 'end' olarak yazılır."""
+    start, stop = rows
+    return f"rows {start}-{'end' if stop is None else stop}"
 
-def generate_pdf_report(metrics, loss_history, image_path):
+def generate_pdf_report(runs, wait=True):
+    """
+    Bir veya daha fazla eğitim koşusunu tek PDF raporda toplar (koşu başına
+    metrik + grafik bölümü). HTML önbellekli bölümlerden hemen kurulur, PDF
+    arka plandaki report_engine kuyruğunda yazılır; wait=False iş kimliğini
+    döndürür, böylece sonraki eğitim beklemeden başlar.
+    """
     print("✍️ Generating PDF Report...")
-    
-    # Grafiği Base64'e çevir (PDF'e gömmek için)
-    with open(image_path, "rb") as img_file:
-        img_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            @page {{ size: A4; margin: 20mm; background-color: #fdfbf7; }}
-            body {{ font-family: 'Georgia', serif; color: #2c2c2c; line-height: 1.6; background-color: #fdfbf7; }}
-            .header {{ border-bottom: 2px solid #5d4037; padding-bottom: 10px; margin-bottom: 30px; }}
-            h1 {{ color: #5d4037; font-size: 24pt; margin: 0; }}
-            .meta {{ font-size: 10pt; color: #795548; font-style: italic; }}
-            .section {{ margin-bottom: 25px; padding: 15px; background: white; border-left: 5px solid #8d6e63; box-shadow: 2px 2px 5px rgba(0,0,0,0.05); }}
-            h2 {{ color: #795548; font-size: 16pt; margin-top: 0; border-bottom: 1px solid #eee; }}
-            .metric-box {{ display: inline-block; width: 45%; padding: 10px; text-align: center; border: 1px solid #d7ccc8; margin-right: 10px; }}
-            .math {{ font-family: 'Times New Roman', serif; font-style: italic; font-weight: bold; color: #4e342e; }}
-            .plot {{ width: 100%; margin-top: 20px; border: 1px solid #d7ccc8; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 10px; }}
-            th, td {{ border: 1px solid #d7ccc8; padding: 8px; text-align: left; font-size: 10pt; }}
-            th {{ background-color: #efebe9; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Quantum Signal Analysis Report</h1>
-            <div class="meta">Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} | Investigator: Aleyna Nil Uzunoğlu</div>
-        </div>
-
-        <div class="section">
-            <h2>1. Executive Summary</h2>
-            <p>This report documents the results of a Quantum Neural Network (QNN) trained to classify deep-space telemetry signals. 
-            The model distinguishes between <b>Natural Stochastic Noise</b> (Voyager 2) and <b>Coherent Artificial Signals</b> using Hilbert Space mapping.</p>
-        </div>
-
-        <div class="section">
-            <h2>2. Model Architecture</h2>
-            <ul>
-                <li><b>Encoding:</b> <span class="math">ZZFeatureMap</span> (4 Qubits)</li>
-                <li><b>Variational Layer:</b> <span class="math">RealAmplitudes</span> (reps=2)</li>
-                <li><b>Optimization:</b> COBYLA (maxiter=150)</li>
-                <li><b>Loss Function:</b> Mean Squared Error (<span class="math">MSE = 1/n &Sigma; (y_i - &ycirc;_i)&sup2;</span>)</li>
-            </ul>
-        </div>
-
-        <div class="section">
-            <h2>3. Performance Metrics</h2>
-            <div class="metric-box">
-                <div style="font-size: 9pt;">Training Accuracy</div>
-                <div style="font-size: 18pt; font-weight: bold;">{metrics['train_acc']:.2f}%</div>
-            </div>
-            <div class="metric-box">
-                <div style="font-size: 9pt;">Test Accuracy</div>
-                <div style="font-size: 18pt; font-weight: bold; color: #bf360c;">{metrics['test_acc']:.2f}%</div>
-            </div>
-        </div>
-
-        <div class="section">
-            <h2>4. Training Visualizations</h2>
-            <img src="data:image/png;base64,{img_base64}" class="plot">
-        </div>
-
-        <div class="section">
-            <h2>5. Analysis & Conclusion</h2>
-            <p>The convergence of the loss function indicates that the <span class="math">SamplerQNN</span> successfully identified non-linear 
-            periodicities in the Hilbert space. The variance in predictions likely stems from Gaussian noise injected into the artificial signal. 
-            Further research will focus on entanglement-driven feature maps.</p>
-        </div>
-    </body>
-    </html>
+    job_id = submit_report(runs, REPORT_PATH)
+    if not wait:
+        return job_id
+
+    queue = report_queue()
+    queue.result(job_id)
+    status = queue.status(job_id)
+    if status['state'] == 'done':
+        print(f"✅ Report saved to: {REPORT_PATH}")
+    else:
+        print(f"⚠️ Report failed: {status['error']}")
+    return job_id
+
+def build_qnn(fast=True):
+    """
+    fast=True: feature-map durumları bir kez hesaplanır, her adımda sadece
+    RealAmplitudes unitary'si uygulanır (qnn_engine). fast=False: SamplerQNN.
     """
-    pdf_path = os.path.join(current_dir, "Quantum_Analysis_Report.pdf")
-    HTML(string=html_content).write_pdf(pdf_path)
-    print(f"✅ Report saved to: {pdf_path}")
+    from qiskit.circuit.library import ZZFeatureMap, RealAmplitudes
 
-def train_model():
-    X, y = create_dataset()
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-    
-    qc = QuantumCircuit(4)
     feature_map = ZZFeatureMap(4)
     ansatz = RealAmplitudes(4, reps=2)
-    qc.compose(feature_map, inplace=True)
-    qc.compose(ansatz, inplace=True)
+    if fast:
+        return StatevectorQNN(feature_map, ansatz, interpret=parity, output_shape=2)
+    return sampler_qnn(feature_map, ansatz, interpret=parity, output_shape=2)
+
+def train_model(fast=True, optimizers=None, maxiter=150, batch_size=None, workers=None, rows=(5000, 5400), stride=None):
+    """
+    Her optimizer aynı başlangıç ağırlıklarıyla eğitilir; kayıp eğrileri ve
+    süreleri aynı grafikte karşılaştırılır, en düşük kayıplı model raporlanır.
+    Gradyan tabanlı yöntemler (L-BFGS-B, Adam) parameter-shift gradyanı kullanır.
+    batch_size verilirse Adam mini-batch ile eğitilir (diğer yöntemler tüm
+    veriyle çalışır); workers > 1 ise
+    feature-map durumları süreç havuzunda hesaplanır (büyük veri setleri için).
+    Döner: rapor için koşu özeti (metrikler, optimizer sonuçları, PNG grafik).
+    """
+    import matplotlib
+    matplotlib.use('Agg') # No GUI mode
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import accuracy_score
+    from qiskit_algorithms.utils import algorithm_globals
+
+    if optimizers is None:
+        optimizers = ("Adam",) if batch_size else ("COBYLA", "L-BFGS-B")
+    with timer("load"):
+        X_train, X_test, y_train, y_test = create_dataset(*rows, stride=stride)
     
-    qnn = SamplerQNN(circuit=qc, input_params=feature_map.parameters, weight_params=ansatz.parameters, 
-                     interpret=parity, output_shape=2, sampler=StatevectorSampler())
+    qnn = build_qnn(fast)
+    x0 = 0.1 * (2 * algorithm_globals.random.random(qnn.num_weights) - 1)
     
-    loss_history = []
-    def cost_func(params):
-        probs = qnn.forward(X_train, params)
-        cost = np.sum((probs[:, 1] - y_train) ** 2) / len(y_train)
-        loss_history.append(cost)
-        print(f"📉 Step {len(loss_history)} | Loss: {cost:.4f}", end='\r')
-        return cost
-
-    print("\n🚀 Starting Manual Optimization...")
-    res = minimize(cost_func, 0.1 * (2 * algorithm_globals.random.random(qnn.num_weights) - 1), 
-                   method='COBYLA', options={'maxiter': 150})
+    runs = {}
+    for method in optimizers:
+        print(f"\n🚀 Starting {method} Optimization...")
+        with timer("train"):
+            runs[method] = fit(qnn, X_train, y_train, x0, method=method, maxiter=maxiter,
+                               batch_size=batch_size if method == "Adam" else None, workers=workers,
+                               callback=lambda step, cost: print(f"📉 Step {step} | Loss: {cost:.4f}", end='\r'))
+        res, loss_history, wall_time = runs[method]
+        print(f"\n⏱️ {method}: loss={res.fun:.4f} | {len(loss_history)} evaluations | {wall_time:.2f}s")
     
-    y_pred = np.where(qnn.forward(X_test, res.x)[:, 1] > 0.5, 1, 0)
-    train_acc = accuracy_score(y_train, np.where(qnn.forward(X_train, res.x)[:, 1] > 0.5, 1, 0)) * 100
+    best = min(runs, key=lambda m: runs[m][0].fun)
+    res = runs[best][0]
+    if fast:
+        qnn.feature_states(X_test, workers=workers)
+    
+    y_pred = np.where(qnn_forward(qnn, X_test, res.x)[:, 1] > 0.5, 1, 0)
+    train_acc = accuracy_score(y_train, np.where(qnn_forward(qnn, X_train, res.x)[:, 1] > 0.5, 1, 0)) * 100
     test_acc = accuracy_score(y_test, y_pred) * 100
     
-    # Save chart for the report
-    img_path = os.path.join(current_dir, "temp_plot.png")
-    plt.figure(figsize=(10, 5))
-    plt.subplot(1, 2, 1); plt.plot(loss_history, color='#5d4037'); plt.title("Convergence")
+    # Chart for the report (rendered straight to PNG bytes, no temp file)
+    fig = plt.figure(figsize=(10, 5))
+    plt.subplot(1, 2, 1)
+    for method, (_, loss_history, wall_time) in runs.items():
+        plt.plot(loss_history, label=f"{method} ({wall_time:.1f}s)")
+    plt.xlabel("Loss evaluations"); plt.legend(); plt.title("Convergence")
     plt.subplot(1, 2, 2); plt.scatter(range(20), y_test[:20], c='gray', alpha=0.5); plt.scatter(range(20), y_pred[:20], c='red', marker='x'); plt.title("Predictions")
-    plt.savefig(img_path)
     
-    # Generate PDF
-    generate_pdf_report({'train_acc': train_acc, 'test_acc': test_acc}, loss_history, img_path)
-    os.remove(img_path) # Clean up temp image
+    results = ", ".join(f"{m} (loss={r.fun:.4f}, {t:.1f}s)" for m, (r, _, t) in runs.items())
+    setup = f"{', '.join(optimizers)} (maxiter={maxiter}" + (f", Adam batch_size={batch_size})" if batch_size and "Adam" in optimizers else ")")
+    return {'train_acc': train_acc, 'test_acc': test_acc, 'png': figure_png(fig), 'model': 'qnn',
+            'ansatz': '<span class="math">RealAmplitudes</span> (reps=2)',
+            'loss': 'Mean Squared Error (<span class="math">MSE = 1/n &Sigma; (y_i - &ycirc;_i)&sup2;</span>)',
+            'optimization': setup,
+            'results': f"{results} | reported: {best}", 'label': rows_label(rows)}
+
+def train_kernel_model(C=1.0, rows=(5000, 5400), block_size=1024, stride=None):
+    """
+    Varyasyonel devre yerine fidelity-kernel SVM: K = |<phi(x_i)|phi(x_j)>|^2.
+    Eğitim Gram matrisi veri seti hash'iyle KERNEL_CACHE'e yazılır (aynı
+    satırlarla tekrar eğitim simülasyon yapmaz); test için sadece test x
+    eğitim çapraz bloğu hesaplanır.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from qiskit.circuit.library import ZZFeatureMap
+    from sklearn.metrics import accuracy_score
+
+    with timer("load"):
+        X_train, X_test, y_train, y_test = create_dataset(*rows, stride=stride)
+
+    print("\n🚀 Fitting fidelity-kernel SVM...")
+    t0 = time.perf_counter()
+    kernel = FidelityKernel(ZZFeatureMap(4), cache_dir=KERNEL_CACHE, block_size=block_size)
+    with timer("train"):
+        gram = kernel.gram(X_train)
+        svm = fit_kernel_svm(gram, y_train, C=C)
+    train_acc = accuracy_score(y_train, svm.predict(gram)) * 100
+    y_pred = svm.predict(kernel.cross(X_test, X_train))
+    test_acc = accuracy_score(y_test, y_pred) * 100
+    wall_time = time.perf_counter() - t0
+    print(f"⏱️ Kernel SVM: {len(svm.support_)} support vectors | {wall_time:.2f}s")
+
+    fig = plt.figure(figsize=(10, 5))
+    plt.subplot(1, 2, 1); plt.imshow(gram[np.ix_(np.argsort(y_train), np.argsort(y_train))], cmap='viridis')
+    plt.colorbar(); plt.title("Training Kernel (sorted by class)")
+    plt.subplot(1, 2, 2); plt.scatter(range(20), y_test[:20], c='gray', alpha=0.5); plt.scatter(range(20), y_pred[:20], c='red', marker='x'); plt.title("Predictions")
+
+    return {'train_acc': train_acc, 'test_acc': test_acc, 'png': figure_png(fig), 'model': 'kernel',
+            'optimization': f"Precomputed-kernel SVC (C={C})",
+            'results': f"{len(svm.support_)} support vectors, {wall_time:.1f}s",
+            'label': f"kernel, {rows_label(rows)}"}
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Quantum signal classifier training")
+    parser.add_argument('--model', choices=["qnn", "kernel"], default="qnn",
+                        help="qnn: variational classifier, kernel: fidelity-kernel SVM")
+    parser.add_argument('--C', type=float, default=1.0, help="SVM regularization (--model kernel)")
+    parser.add_argument('--optimizers', nargs='+', default=None, choices=["COBYLA", "L-BFGS-B", "Adam"])
+    parser.add_argument('--maxiter', type=int, default=150)
+    parser.add_argument('--batch-size', type=int, default=None, help="Mini-batch size (Adam only; other optimizers use the full set)")
+    parser.add_argument('--workers', type=int, default=None, help="Processes for feature-map states")
+    parser.add_argument('--stride', type=int, default=None,
+                        help="Samples between 4-sample windows (default 4: non-overlapping)")
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 5400], metavar='START STOP',
+                        help="Row range(s), one training run each (STOP=-1: whole record). Rows are positions "
+                             "in the cleaned, time-sorted column cache (bad lines skipped), not raw file lines")
+    args = parser.parse_args()
+    if len(args.rows) % 2:
+        parser.error("--rows takes START STOP pairs")
+
+    # Her koşudan sonra rapor arka planda güncellenir; son rapor tüm koşuları içerir.
+    reports = []
+    for start, stop in zip(args.rows[::2], args.rows[1::2]):
+        rows = (start, None if stop < 0 else stop)
+        if args.model == "kernel":
+            reports.append(train_kernel_model(C=args.C, rows=rows, stride=args.stride))
+        else:
+            reports.append(train_model(optimizers=args.optimizers, maxiter=args.maxiter, batch_size=args.batch_size,
+                                       workers=args.workers, rows=rows, stride=args.stride))
+        generate_pdf_report(reports, wait=False)
+    generate_pdf_report(reports)
\ No newline at end of file
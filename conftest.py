@@ -0,0 +1 @@
+# Proje kökünü sys.path'e ekler; testler `quantum_engine` gibi kök modülleri import edebilsin.
@@ -0,0 +1,107 @@
+"""
+Feature Pipeline: windowed, labelled datasets for the signal classifier.
+
+signal_classifier used to reshape a 400-row slice into 4-sample rows, build
+the artificial class with the same ad-hoc reshape and fit one MinMaxScaler on
+train + test together. Here:
+
+- the series is a read-only memory map of the cached TAB column (row or time
+  range), and windows are a `sliding_window_view` of it: no copy until the
+  rows are written into the dataset,
+- windows containing gaps (NaN) are dropped instead of being stitched across,
+- the artificial class (5 sin(t) + 10 + N(0, 0.5) on t = 0..20 over the
+  series) is generated in bulk at the same window positions as the natural
+  windows, so both classes always have the same size,
+- everything runs in chunks of `chunk` windows, so building millions of
+  windows only holds the output arrays (or nothing, via dataset_chunks()),
+- split_scaled() fits the scaler on the training split only.
+"""
+import numpy as np
+
+from instrumentation import count, timed
+from voyager_data import COLUMNS, open_store, time_slice
+
+DEFAULT_WIDTH = 4
+DEFAULT_CHUNK = 1 << 16
+
+# Artificial (coherent) class: AMPLITUDE * sin(t) + OFFSET + N(0, NOISE), t in [0, SPAN].
+AMPLITUDE = 5.0
+OFFSET = 10.0
+NOISE = 0.5
+SPAN = 20.0
+
+
+def load_series(path, start=None, stop=None, column=COLUMNS['B_Mag']):
+    """
+    Read-only memory-mapped slice of one TAB column. `start`/`stop` are row
+    numbers, or timestamps (ISO strings, datetime64) for a time range.
+
+    Row numbers are positions in the column cache (voyager_data), i.e. after
+    malformed lines and rows without a valid time are dropped and the rows are
+    sorted by time; they match raw file line numbers only for a clean,
+    already-sorted file. Use timestamps to select the same data regardless.
+    """
+    store = open_store(path, [column])
+    if all(v is None or isinstance(v, (int, np.integer)) for v in (start, stop)):
+        rows = slice(start, stop)
+    else:
+        rows = time_slice(store[COLUMNS['Time']], start, stop)
+    return store[column][rows]
+
+
+def windows(series, width=DEFAULT_WIDTH, stride=None):
+    """(W, width) view of the windows starting every `stride` samples (default: non-overlapping)."""
+    series = np.asarray(series, dtype=float)
+    if len(series) < width:
+        raise ValueError(f"Need at least width={width} samples, got {len(series)}")
+    return np.lib.stride_tricks.sliding_window_view(series, width)[::stride or width]
+
+
+def artificial_windows(positions, width, total, rng):
+    """Artificial-class windows starting at sample `positions` of a `total`-sample series."""
+    t = (np.asarray(positions)[:, None] + np.arange(width)) * (SPAN / max(total - 1, 1))
+    return AMPLITUDE * np.sin(t) + OFFSET + rng.normal(0, NOISE, t.shape)
+
+
+def dataset_chunks(series, width=DEFAULT_WIDTH, stride=None, chunk=DEFAULT_CHUNK, seed=None):
+    """
+    Yields (natural, artificial) window arrays, at most `chunk` windows each;
+    windows with NaNs are skipped in both classes.
+    """
+    view = windows(series, width, stride)
+    stride = stride or width
+    rng = np.random.default_rng(seed)
+    for lo in range(0, len(view), chunk):
+        block = view[lo:lo + chunk]
+        keep = np.flatnonzero(~np.isnan(block).any(axis=1))
+        yield block[keep], artificial_windows((lo + keep) * stride, width, len(series), rng)
+
+
+@timed("features", samples=len)
+def build_dataset(series, width=DEFAULT_WIDTH, stride=None, chunk=DEFAULT_CHUNK, seed=None):
+    """
+    (X, y): natural windows (label 0) followed by as many artificial windows
+    (label 1). Output arrays are allocated once and filled chunk by chunk.
+    """
+    view = windows(series, width, stride)
+    n = sum(int((~np.isnan(view[lo:lo + chunk]).any(axis=1)).sum()) for lo in range(0, len(view), chunk))
+    X = np.empty((2 * n, width))
+    y = np.repeat([0.0, 1.0], n)
+    filled = 0
+    for natural, artificial in dataset_chunks(series, width, stride, chunk, seed):
+        X[filled:filled + len(natural)] = natural
+        X[n + filled:n + filled + len(natural)] = artificial
+        filled += len(natural)
+    count("windows_built", 2 * n)
+    return X, y
+
+
+def split_scaled(X, y, test_size=0.3, random_state=42, feature_range=(0, 1)):
+    """Train/test split; the MinMaxScaler is fitted on the training split only."""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import MinMaxScaler
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    # The split returns fresh arrays, so they can be scaled in place.
+    scaler = MinMaxScaler(feature_range=feature_range, copy=False).fit(X_train)
+    return scaler.transform(X_train), scaler.transform(X_test), y_train, y_test
@@ -0,0 +1,184 @@
+"""
+Instrumentation: lightweight timers and counters for the analysis pipeline.
+
+Stages (load, encode, simulate, score, train) are timed with `timer()` or the
+`@timed()` decorator; events (circuits built, statevector evaluations, QNN
+forward calls) are tallied with `count()`. Stage times are inclusive, so a
+"score" call that encodes internally also contributes to "encode".
+
+Everything is a no-op until `enable()` is called, or until the QLAB_PROFILE
+environment variable names a JSON file; in that case the per-run profile is
+written there when the process exits:
+
+    QLAB_PROFILE=profile.json python case2_anomaly_detection/complex_quantum.py
+
+`import_times()` measures cold-start import cost in a fresh interpreter
+(`python -X importtime`), for tracking startup in tests and benchmarks.
+"""
+import atexit
+import functools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+ENV_VAR = "QLAB_PROFILE"
+
+_enabled = False
+_lock = threading.Lock()
+_stages = {}    # stage -> [calls, seconds, samples]
+_counters = {}  # name -> count
+_started = time.perf_counter()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    global _started
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _started = time.perf_counter()
+
+
+def record(stage, seconds, samples=0):
+    with _lock:
+        entry = _stages.setdefault(stage, [0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += samples
+
+
+def count(name, n=1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("stage", "samples", "_t0")
+
+    def __init__(self, stage, samples):
+        self.stage = stage
+        self.samples = samples
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.stage, time.perf_counter() - self._t0, self.samples)
+        return False
+
+
+def timer(stage, samples=0):
+    """Context manager timing one pass through `stage` over `samples` items."""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(stage, samples)
+
+
+def timed(stage, samples=None):
+    """
+    Decorator version of timer(). `samples`, if given, is applied to the
+    return value to get the item count (e.g. `samples=len`).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            t0 = time.perf_counter()
+            result = func(*args, **kwargs)
+            record(stage, time.perf_counter() - t0, samples(result) if samples else 0)
+            return result
+        return wrapper
+    return decorator
+
+
+def profile():
+    """Current profile as a JSON-serializable dict."""
+    with _lock:
+        stages = {
+            stage: {
+                "calls": calls,
+                "seconds": seconds,
+                "samples": n,
+                "samples_per_sec": n / seconds if n and seconds > 0 else None,
+            }
+            for stage, (calls, seconds, n) in sorted(_stages.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "argv": sys.argv,
+        "wall_time": time.perf_counter() - _started,
+        "stages": stages,
+        "counters": counters,
+    }
+
+
+def dump(path):
+    directory = os.path.dirname(os.fspath(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile(), f, indent=2)
+    return path
+
+
+def import_times(target, cwd=None):
+    """
+    Cold-start import profile of `target` in a fresh interpreter.
+
+    `target` is a module name ("quantum_engine") or the argv of a script run
+    (["script.py", "--help"]). Returns {"total": seconds, "modules": {name:
+    cumulative seconds}}; "total" sums the top-level imports.
+    """
+    args = ["-c", f"import {target}"] if isinstance(target, str) else list(target)
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd,
+                          capture_output=True, text=True)
+    modules = {}
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        seconds = int(cumulative) / 1e6
+        modules.setdefault(name.strip(), seconds)
+        if not name.startswith("  "):
+            total += seconds
+    return {"total": total, "modules": modules}
+
+
+if os.environ.get(ENV_VAR):
+    enable()
+    atexit.register(dump, os.environ[ENV_VAR])
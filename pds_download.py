@@ -0,0 +1,180 @@
+"""
+PDS Download: resumable, parallel, checksum-verified fetching of PDS products.
+
+0_fetch_data used to stream one URL in 8 KB chunks straight into the final
+file. Here every product
+
+- is downloaded into `<path>.part` in large chunks (1 MB by default) and, if a
+  `.part` file is already there, resumed with an HTTP Range request (a server
+  that ignores the range sends the whole file again and the part is rewritten),
+- is verified against the MD5 checksum of its PDS label (`MD5_CHECKSUM = "..."`
+  in PDS3 `.LBL` files, `<md5_checksum>` in PDS4 `.xml` labels) or an
+  explicit `md5`, before being renamed onto the final path with os.replace,
+  so a crash never leaves a truncated file under the real name,
+- is retried (resuming) after connection errors; a checksum mismatch throws
+  the part away and starts over.
+
+download_all() runs a list of products on a thread pool (downloads are I/O
+bound) and returns one record per product; errors are recorded, not raised,
+as in batch_runner.
+"""
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import count
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_WORKERS = 4
+USER_AGENT = "Mozilla/5.0 (Science-Bot)"
+LABEL_SUFFIXES = (".LBL", ".lbl", ".xml")
+PART_SUFFIX = ".part"
+
+_MD5_PATTERNS = (
+    re.compile(r'^\s*MD5_CHECKSUM\s*=\s*"?([0-9a-fA-F]{32})"?', re.MULTILINE),  # PDS3
+    re.compile(r"<md5_checksum>\s*([0-9a-fA-F]{32})\s*</md5_checksum>"),       # PDS4
+)
+
+
+class ChecksumError(ValueError):
+    """Downloaded bytes do not match the expected MD5 checksum."""
+
+
+def parse_label_md5(text):
+    """MD5 checksum (lower-case hex) declared in a PDS3/PDS4 label, or None."""
+    for pattern in _MD5_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).lower()
+    return None
+
+
+def label_urls(url):
+    """Candidate label URLs of a product: same name with .LBL / .lbl / .xml."""
+    stem = url.rsplit(".", 1)[0] if "." in url.rsplit("/", 1)[-1] else url
+    return [stem + suffix for suffix in LABEL_SUFFIXES]
+
+
+def _session():
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    return session
+
+
+def fetch_label_md5(url, label_url=None, session=None, timeout=30):
+    """Checksum from the product's label (first candidate that exists), or None."""
+    import requests
+
+    session = session or _session()
+    for candidate in [label_url] if label_url else label_urls(url):
+        try:
+            response = session.get(candidate, timeout=timeout)
+        except requests.RequestException:
+            continue
+        if response.status_code == 200:
+            md5 = parse_label_md5(response.text)
+            if md5:
+                return md5
+    return None
+
+
+def file_md5(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fetch_part(session, url, part_path, chunk_size, timeout, record):
+    """Appends the rest of `url` to the part file (Range resume), counting bytes in record['bytes']."""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:  # nothing left past `offset`
+            return
+        response.raise_for_status()
+        mode = "ab" if offset and response.status_code == 206 else "wb"
+        if offset and mode == "wb":
+            count("download.range_ignored")
+        elif offset:
+            count("download.resumed")
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                record["bytes"] += len(chunk)
+
+
+def download(url, path, md5=None, verify=True, label_url=None, chunk_size=DEFAULT_CHUNK_SIZE,
+             retries=3, timeout=60, session=None):
+    """
+    Downloads one product to `path` and returns its record. `md5=None` with
+    verify=True looks the checksum up in the product's label; an existing
+    `path` that matches the checksum (or any existing file, if there is none)
+    is kept.
+    """
+    import requests
+
+    session = session or _session()
+    t0 = time.perf_counter()
+    record = {"url": url, "path": os.fspath(path), "bytes": 0}
+    if verify and md5 is None:
+        md5 = fetch_label_md5(url, label_url, session)
+    record["md5"] = md5
+
+    if os.path.exists(path) and (md5 is None or file_md5(path, chunk_size) == md5):
+        record.update(status="cached", verified=md5 is not None, seconds=time.perf_counter() - t0)
+        return record
+
+    directory = os.path.dirname(os.fspath(path))
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    part_path = os.fspath(path) + PART_SUFFIX
+    for attempt in range(retries + 1):
+        try:
+            _fetch_part(session, url, part_path, chunk_size, timeout, record)
+            if md5 is not None and file_md5(part_path, chunk_size) != md5:
+                os.remove(part_path)
+                raise ChecksumError(f"MD5 mismatch for {url}")
+            os.replace(part_path, path)
+            break
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                ChecksumError):
+            # The part file is kept (unless corrupt), so the next attempt resumes it.
+            count("download.retries")
+            if attempt == retries:
+                raise
+    count("download.files")
+    record.update(status="ok", verified=md5 is not None, seconds=time.perf_counter() - t0)
+    return record
+
+
+def product_path(url, out_dir):
+    return os.path.join(out_dir, url.rstrip("/").rsplit("/", 1)[-1])
+
+
+def download_all(products, out_dir=".", workers=DEFAULT_WORKERS, **options):
+    """
+    Downloads products concurrently. Each product is a URL or a dict with
+    'url' and optionally 'path', 'md5', 'label_url'. `options` go to
+    download(). Returns records in input order.
+    """
+    products = [{"url": p} if isinstance(p, str) else dict(p) for p in products]
+
+    def run(product):
+        path = product.get("path") or product_path(product["url"], out_dir)
+        try:
+            return download(product["url"], path, md5=product.get("md5"), label_url=product.get("label_url"),
+                            **options)
+        except Exception as e:
+            return {"url": product["url"], "path": os.fspath(path), "status": "error",
+                    "error": f"{type(e).__name__}: {e}"}
+
+    if workers and workers > 1 and len(products) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(run, products))
+    return [run(product) for product in products]
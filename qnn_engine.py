@@ -0,0 +1,426 @@
+"""
+QNN Engine: fast forward pass for feature-map + ansatz classifiers.
+
+signal_classifier's SamplerQNN re-simulates ZZFeatureMap + RealAmplitudes for
+every training row on every optimizer step, although the feature-map half
+only depends on the data. Here the encoded states |phi(x)> are computed once
+per dataset, each step applies just the ansatz unitary U(theta) to all rows
+as one matrix product, and `interpret` (e.g. parity) is folded into a
+precomputed basis-state mask:
+
+    probs = |Phi @ U(theta)^T|^2 @ mask
+
+U(theta) itself comes from quantum_engine's batched NumPy simulator (the
+ansatz applied to every basis state at once), so the 2 * num_weights shifted
+unitaries of a gradient step are a single simulate_ops() call.
+
+Weight gradients use the parameter-shift rule on the same cached states, and
+`fit` trains with COBYLA, L-BFGS-B or Adam on an MSE loss. For large datasets
+the feature states can be computed across a process pool, and Adam can run
+on mini-batches drawn from the cached states.
+
+FidelityKernel is the non-variational alternative: an SVM on the kernel
+|<phi(x_i)|phi(x_j)>|^2 of the same feature map, whose Gram matrix is one
+blocked matrix product over the batched feature states (cached on disk per
+dataset), so training never re-simulates circuits.
+"""
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from instrumentation import count, timed
+from quantum_engine import circuit_ops, simulate_ops
+
+
+def parity(x):
+    return "{:b}".format(x).count("1") % 2
+
+
+def interpret_mask(num_qubits, interpret, output_shape):
+    """(2**n, output_shape) 0/1 matrix mapping basis states to output classes."""
+    mask = np.zeros((2 ** num_qubits, output_shape))
+    for basis in range(2 ** num_qubits):
+        mask[basis, interpret(basis)] = 1.0
+    return mask
+
+
+def dataset_key(X):
+    X = np.ascontiguousarray(X, dtype=float)
+    return X.shape, hashlib.sha1(X.tobytes()).hexdigest()
+
+
+def encode_rows(feature_map, X):
+    """
+    Feature-map statevectors for the rows of X (also the process-pool task):
+    one batched simulate_ops() call, or one Statevector per row for gates
+    outside the NumPy engine.
+    """
+    X = np.asarray(X, dtype=float)
+    try:
+        ops = circuit_ops(feature_map)
+    except ValueError:
+        from qiskit.quantum_info import Statevector
+
+        return np.array([Statevector(feature_map.assign_parameters(x)).data for x in X])
+    return simulate_ops(feature_map.num_qubits, ops, X)
+
+
+class StatevectorQNN:
+    """
+    Exact-probability drop-in for SamplerQNN(feature_map + ansatz, interpret).
+
+    `forward(X, weights)` returns the same (N, output_shape) probabilities as
+    SamplerQNN with an exact sampler; feature-map states are cached for the
+    last `cache_size` datasets, so repeated calls on the training set only
+    cost one matmul.
+    """
+
+    def __init__(self, feature_map, ansatz, interpret=parity, output_shape=2, cache_size=4):
+        self.feature_map = feature_map
+        self.ansatz = ansatz
+        self.num_qubits = feature_map.num_qubits
+        self.num_weights = ansatz.num_parameters
+        self.mask = interpret_mask(self.num_qubits, interpret, output_shape)
+        self.cache_size = cache_size
+        self._states = OrderedDict()  # LRU: dataset key -> feature states
+        try:
+            circuit_ops(feature_map)
+            self._batched = True
+        except ValueError:
+            self._batched = False
+        try:
+            self._ansatz_ops = circuit_ops(ansatz)
+        except ValueError:  # gates outside the NumPy engine: fall back to Operator
+            self._ansatz_ops = None
+
+    def feature_states(self, X, workers=None):
+        """
+        Encoded feature-map statevectors (N, 2**n), computed once per dataset.
+
+        With `workers` > 1 the rows are split into shards that are simulated
+        in a process pool and written back by index.
+        """
+        key = dataset_key(X)
+        if key in self._states:
+            self._states.move_to_end(key)
+            return self._states[key]
+        X = np.asarray(X, dtype=float)
+        count("circuits_built", 1 if self._batched else len(X))
+        if not self._batched:
+            count("statevector_evaluations", len(X))
+        if workers and workers > 1 and len(X) > 1:
+            states = self._sharded_feature_states(X, workers)
+        else:
+            states = encode_rows(self.feature_map, X)
+        self._states[key] = states
+        while len(self._states) > self.cache_size:
+            self._states.popitem(last=False)
+        return states
+
+    def _sharded_feature_states(self, X, workers):
+        states = np.empty((len(X), 2 ** self.num_qubits), dtype=complex)
+        bounds = np.linspace(0, len(X), min(len(X), 4 * workers) + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(encode_rows, self.feature_map, X[lo:hi]): (lo, hi)
+                       for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo}
+            for future in as_completed(futures):
+                lo, hi = futures[future]
+                states[lo:hi] = future.result()
+        return states
+
+    def ansatz_unitary(self, weights):
+        return self.ansatz_unitaries(np.atleast_2d(weights))[0]
+
+    def ansatz_unitaries(self, weight_sets):
+        """(K, 2**n, 2**n) unitaries for K weight vectors."""
+        weight_sets = np.asarray(weight_sets, dtype=float)
+        if self._ansatz_ops is None:
+            from qiskit.quantum_info import Operator
+
+            return np.stack([Operator(self.ansatz.assign_parameters(w)).data for w in weight_sets])
+        dim = 2 ** self.num_qubits
+        # Row k of the output is U|k>, i.e. column k of U.
+        columns = simulate_ops(self.num_qubits, self._ansatz_ops,
+                               np.repeat(weight_sets, dim, axis=0), np.tile(np.eye(dim), (len(weight_sets), 1)))
+        return np.swapaxes(columns.reshape(len(weight_sets), dim, dim), 1, 2)
+
+    def forward(self, X, weights):
+        return self.forward_states(self.feature_states(X), weights)
+
+    def backward(self, X, weights):
+        """
+        (None, weight_grad) like SamplerQNN.backward; weight_grad has shape
+        (N, output_shape, num_weights).
+        """
+        return None, self.backward_states(self.feature_states(X), weights)
+
+    @timed("qnn.forward", samples=len)
+    def forward_states(self, states, weights):
+        """forward() on already-encoded feature states (e.g. a mini-batch of them)."""
+        count("qnn_forward_calls")
+        count("qnn_forward_rows", len(states))
+        states = states @ self.ansatz_unitary(weights).T
+        return (np.abs(states) ** 2) @ self.mask
+
+    @timed("qnn.backward", samples=len)
+    def backward_states(self, states, weights):
+        """
+        Parameter-shift rule, exact when every weight drives a single Pauli
+        rotation (RealAmplitudes, EfficientSU2): all 2 * num_weights shifted
+        unitaries are applied to the encoded states in one batched product.
+        """
+        count("qnn_backward_calls")
+        weights = np.asarray(weights, dtype=float)
+        shifts = np.eye(self.num_weights) * (np.pi / 2)
+        unitaries = self.ansatz_unitaries(np.concatenate([weights + shifts, weights - shifts]))
+        states = np.einsum('nj,kij->kni', states, unitaries)
+        probs = (np.abs(states) ** 2) @ self.mask
+        plus, minus = probs[:self.num_weights], probs[self.num_weights:]
+        return np.moveaxis((plus - minus) / 2, 0, -1)
+
+
+# --- TRAINING ---
+OPTIMIZERS = ("COBYLA", "L-BFGS-B", "Adam")
+
+
+def sampler_qnn(feature_map, ansatz, interpret=parity, output_shape=2):
+    """
+    The reference SamplerQNN(feature_map + ansatz) that StatevectorQNN
+    replaces. It runs on the exact V1 Sampler: qiskit-machine-learning 0.7
+    calls sampler.run(circuits, parameter_values), which the V2
+    StatevectorSampler does not accept (and V2 samplers draw shots).
+    """
+    from qiskit import QuantumCircuit
+    from qiskit.primitives import Sampler
+    from qiskit_machine_learning.neural_networks import SamplerQNN
+
+    qc = QuantumCircuit(feature_map.num_qubits)
+    qc.compose(feature_map, inplace=True)
+    qc.compose(ansatz, inplace=True)
+    return SamplerQNN(circuit=qc, input_params=feature_map.parameters, weight_params=ansatz.parameters,
+                      interpret=interpret, output_shape=output_shape, sampler=Sampler())
+
+
+def qnn_forward(qnn, X, weights):
+    """qnn.forward(X, weights), counting calls/rows for a SamplerQNN as forward_states() does."""
+    if not isinstance(qnn, StatevectorQNN):
+        count("qnn_forward_calls")
+        count("qnn_forward_rows", len(X))
+    return qnn.forward(X, weights)
+
+
+def mse_loss(probs, y):
+    """Loss used by signal_classifier: mean squared error on P(class 1)."""
+    return np.sum((probs[:, 1] - y) ** 2) / len(y)
+
+
+def mse_grad(probs, weight_grad, y):
+    return 2 * (probs[:, 1] - y) @ weight_grad[:, 1, :] / len(y)
+
+
+def minibatches(n_rows, batch_size, rng):
+    """Endless stream of shuffled row-index batches (a new permutation per epoch)."""
+    while True:
+        order = rng.permutation(n_rows)
+        for start in range(0, n_rows, batch_size):
+            yield order[start:start + batch_size]
+
+
+def adam(fun_and_grad, x0, maxiter=150, learning_rate=0.1, beta1=0.9, beta2=0.999, eps=1e-8):
+    """Plain Adam on a (loss, grad) function, returning a scipy OptimizeResult."""
+    from scipy.optimize import OptimizeResult
+
+    x = np.array(x0, dtype=float)
+    m = np.zeros_like(x)
+    v = np.zeros_like(x)
+    for t in range(1, maxiter + 1):
+        loss, grad = fun_and_grad(x)
+        m = beta1 * m + (1 - beta1) * grad
+        v = beta2 * v + (1 - beta2) * grad ** 2
+        x = x - learning_rate * (m / (1 - beta1 ** t)) / (np.sqrt(v / (1 - beta2 ** t)) + eps)
+    return OptimizeResult(x=x, fun=loss, nit=maxiter, nfev=maxiter, success=True)
+
+
+def fit(qnn, X, y, x0, method="COBYLA", maxiter=150, callback=None, learning_rate=0.1,
+        batch_size=None, seed=None, workers=None):
+    """
+    Trains `qnn` (StatevectorQNN or SamplerQNN) on the MSE loss.
+
+    `batch_size` switches Adam to mini-batch steps over shuffled epochs
+    (`seed` fixes the shuffling). For a StatevectorQNN the feature states of
+    the whole training set are computed once (across `workers` processes)
+    and every step only indexes into them.
+
+    Returns (result, loss_history, wall_time); `callback(step, loss)` is
+    called after every loss evaluation (on the current batch, if any).
+    """
+    from scipy.optimize import minimize
+
+    if method not in OPTIMIZERS:
+        raise ValueError(f"method must be one of {OPTIMIZERS}")
+    if batch_size is not None and method != "Adam":
+        raise ValueError("Mini-batch training needs a stochastic optimizer (method='Adam')")
+    y = np.asarray(y, dtype=float)
+    loss_history = []
+
+    if isinstance(qnn, StatevectorQNN):
+        data = qnn.feature_states(X, workers=workers)
+        forward, backward = qnn.forward_states, qnn.backward_states
+    else:
+        data = np.asarray(X, dtype=float)
+        forward = lambda rows, weights: qnn_forward(qnn, rows, weights)
+        backward = lambda rows, weights: qnn.backward(rows, weights)[1]
+
+    batches = None
+    if batch_size is not None:
+        batches = minibatches(len(y), batch_size, np.random.default_rng(seed))
+
+    def track(loss):
+        loss_history.append(loss)
+        if callback is not None:
+            callback(len(loss_history), loss)
+
+    def loss_only(weights):
+        loss = mse_loss(forward(data, weights), y)
+        track(loss)
+        return loss
+
+    def loss_and_grad(weights):
+        rows, targets = data, y
+        if batches is not None:
+            idx = next(batches)
+            rows, targets = data[idx], y[idx]
+        probs = forward(rows, weights)
+        loss = mse_loss(probs, targets)
+        track(loss)
+        return loss, mse_grad(probs, backward(rows, weights), targets)
+
+    t0 = time.perf_counter()
+    if method == "COBYLA":
+        res = minimize(loss_only, x0, method='COBYLA', options={'maxiter': maxiter})
+    elif method == "L-BFGS-B":
+        res = minimize(loss_and_grad, x0, jac=True, method='L-BFGS-B', options={'maxiter': maxiter})
+    else:
+        res = adam(loss_and_grad, x0, maxiter=maxiter, learning_rate=learning_rate)
+    return res, loss_history, time.perf_counter() - t0
+
+
+# --- FIDELITY KERNEL ---
+def circuit_key(circuit):
+    """Hash of a circuit's gates, qubits and (symbolic) parameters."""
+    gates = [(inst.operation.name, [circuit.find_bit(q).index for q in inst.qubits],
+              [str(p) for p in inst.operation.params]) for inst in circuit.decompose().data]
+    return hashlib.sha1(repr((circuit.num_qubits, gates)).encode()).hexdigest()
+
+
+class FidelityKernel:
+    """
+    Quantum kernel K(x, x') = |<phi(x)|phi(x')>|^2 for a feature map.
+
+    All feature states of a dataset are simulated once, in one batched
+    simulate_ops() call. The Gram matrix is |S S^H|^2 computed in
+    `block_size` x `block_size` tiles over the upper triangle only (mirrored),
+    and test points need only the cross block |S_test S_train^H|^2. With
+    `cache_dir`, Gram matrices and training states are stored as .npy files
+    keyed by the feature map and dataset hash, so refitting on the same data
+    skips simulation and cross() only simulates the new points. The states of
+    the last training set are also kept in memory.
+    """
+
+    def __init__(self, feature_map, cache_dir=None, block_size=1024):
+        self.feature_map = feature_map
+        self.num_qubits = feature_map.num_qubits
+        self.cache_dir = cache_dir
+        self.block_size = block_size
+        self._key = circuit_key(feature_map)
+        self._train = None  # (dataset key, states) of the last training set
+        try:
+            self._ops = circuit_ops(feature_map)
+        except ValueError:  # gates outside the NumPy engine: per-row Statevector
+            self._ops = None
+
+    @timed("kernel.states", samples=len)
+    def states(self, X):
+        X = np.asarray(X, dtype=float)
+        count("circuits_built", 1 if self._ops is not None else len(X))
+        if self._ops is None:
+            count("statevector_evaluations", len(X))
+            return encode_rows(self.feature_map, X)
+        return simulate_ops(self.num_qubits, self._ops, X)
+
+    def _blocks(self, n):
+        return [(lo, min(lo + self.block_size, n)) for lo in range(0, n, self.block_size)]
+
+    def _cache_path(self, X, kind="gram"):
+        shape, digest = dataset_key(X)
+        name = f"{kind}_{self._key[:12]}_{digest[:16]}_{'x'.join(map(str, shape))}.npy"
+        return os.path.join(self.cache_dir, name)
+
+    def _save(self, path, array):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = path[:-len(".npy")] + ".tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+
+    def train_states(self, X):
+        """Feature states of a training set: from memory, the cache, or simulated once."""
+        key = dataset_key(X)
+        if self._train is not None and self._train[0] == key:
+            return self._train[1]
+        path = self._cache_path(X, "states") if self.cache_dir else None
+        if path and os.path.exists(path):
+            count("kernel.states_cached")
+            states = np.load(path)
+        else:
+            states = self.states(X)
+            if path:
+                self._save(path, states)
+        self._train = (key, states)
+        return states
+
+    @timed("kernel.gram", samples=len)
+    def gram(self, X):
+        """(N, N) training kernel matrix, loaded from the cache when available."""
+        path = self._cache_path(X) if self.cache_dir else None
+        if path and os.path.exists(path):
+            count("kernel.gram_cached")
+            return np.load(path)
+
+        states = self.train_states(X)
+        n = len(states)
+        gram = np.empty((n, n))
+        blocks = self._blocks(n)
+        for i, (lo_i, hi_i) in enumerate(blocks):
+            for lo_j, hi_j in blocks[i:]:
+                tile = np.abs(states[lo_i:hi_i] @ states[lo_j:hi_j].conj().T) ** 2
+                if lo_j == lo_i:  # make the diagonal tile exactly symmetric
+                    tile = np.triu(tile) + np.triu(tile, 1).T
+                gram[lo_i:hi_i, lo_j:hi_j] = tile
+                gram[lo_j:hi_j, lo_i:hi_i] = tile.T
+        np.fill_diagonal(gram, 1.0)
+
+        if path:
+            self._save(path, gram)
+        return gram
+
+    @timed("kernel.cross", samples=len)
+    def cross(self, X, X_train, train_states=None):
+        """(M, N) kernel between new points and the training set (whose states are reused)."""
+        states = self.states(X)
+        train_states = self.train_states(X_train) if train_states is None else train_states
+        out = np.empty((len(states), len(train_states)))
+        for lo_i, hi_i in self._blocks(len(states)):
+            for lo_j, hi_j in self._blocks(len(train_states)):
+                out[lo_i:hi_i, lo_j:hi_j] = np.abs(states[lo_i:hi_i] @ train_states[lo_j:hi_j].conj().T) ** 2
+        return out
+
+
+def fit_kernel_svm(gram, y, C=1.0):
+    """sklearn SVC on a precomputed (N, N) fidelity-kernel Gram matrix (FidelityKernel.gram)."""
+    from sklearn.svm import SVC
+
+    return SVC(kernel="precomputed", C=C).fit(gram, y)
@@ -0,0 +1,1278 @@
+"""
+Quantum Engine: vectorized scoring core for the telemetry anomaly detectors.
+
+The case studies encode every magnetometer sample onto a qubit with an Ry
+rotation and compare it to a "quiet space" reference state. For Ry encodings
+the fidelity has a closed form,
+
+    |<0|Ry(a)^dagger Ry(b)|0>|^2 = cos^2((a - b) / 2),
+
+so a whole record can be scored with a handful of NumPy operations instead of
+building one QuantumCircuit + Statevector per sample. Encodings without a
+closed form fall back to the Qiskit statevector path.
+"""
+import sys
+
+import numpy as np
+
+from instrumentation import count, timed, timer
+
+
+def values_to_angles(values, min_val, max_val, eps=1e-6):
+    """Maps raw values onto Ry angles in [0, pi] (same rule as the case1 scripts)."""
+    values = np.asarray(values, dtype=float)
+    return (values - min_val) / (max_val - min_val + eps) * np.pi
+
+
+def ry_circuit(angle):
+    """Single-qubit Ry encoding circuit; the Qiskit reference for the closed form."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(1)
+    qc.ry(angle, 0)
+    return qc
+
+
+def ry_fidelity(angles, ref_angle):
+    """Closed-form fidelity between Ry(angles)|0> and Ry(ref_angle)|0>."""
+    return np.cos((np.asarray(angles, dtype=float) - ref_angle) / 2) ** 2
+
+
+# Encodings whose fidelity against a reference can be computed analytically.
+CLOSED_FORM_ENCODINGS = {
+    "ry": ry_fidelity,
+}
+
+
+@timed("simulate", samples=len)
+def statevector_fidelities(angles, ref_angle, encoder):
+    """
+    Reference path: builds one circuit per angle with `encoder(angle)` and
+    measures state_fidelity against the reference with Qiskit.
+    """
+    from qiskit.quantum_info import Statevector, state_fidelity
+
+    angles = np.asarray(angles, dtype=float)
+    count("circuits_built", len(angles) + 1)
+    count("statevector_evaluations", len(angles) + 1)
+    state_ref = Statevector.from_instruction(encoder(ref_angle))
+    return np.array([
+        state_fidelity(state_ref, Statevector.from_instruction(encoder(angle)))
+        for angle in angles
+    ])
+
+
+@timed("score", samples=len)
+def fidelity_scores(values, reference_value, min_val, max_val, encoding="ry", eps=1e-6):
+    """
+    Fidelity of every sample against the reference value.
+
+    `encoding` is a key of CLOSED_FORM_ENCODINGS (vectorized), a key of
+    SIMULATED_ENCODINGS (one Aer job for the whole window) or a callable
+    angle -> QuantumCircuit, which is evaluated through Qiskit per sample.
+    """
+    angles = values_to_angles(values, min_val, max_val, eps)
+    ref_angle = values_to_angles(reference_value, min_val, max_val, eps)
+
+    if callable(encoding):
+        return statevector_fidelities(angles, ref_angle, encoding)
+    if encoding in SIMULATED_ENCODINGS:
+        return SIMULATED_ENCODINGS[encoding](angles, ref_angle)
+    if encoding not in CLOSED_FORM_ENCODINGS:
+        raise ValueError(f"Unknown encoding: {encoding!r}")
+    return CLOSED_FORM_ENCODINGS[encoding](angles, ref_angle)
+
+
+def anomaly_scores(data, n_reference=10, encoding="ry", eps=1e-6):
+    """
+    1 - fidelity for a whole record in one pass.
+
+    The window is normalized by its own min/max and the reference is the mean
+    of the first `n_reference` samples, exactly as in quantum_anomaly.py.
+    """
+    data = np.asarray(data, dtype=float)
+    min_val, max_val = np.min(data), np.max(data)
+    reference_value = np.mean(data[:n_reference])
+    return 1 - fidelity_scores(data, reference_value, min_val, max_val, encoding, eps)
+
+
+# --- TRANSPILE-ONCE, BIND-MANY AER EXECUTION ---
+# Building a numeric circuit per sample means one transpile + one job each.
+# A ParameterVector template is transpiled once; every binding then rides in
+# a single backend.run(..., parameter_binds=...) job.
+
+def ry_template(num_qubits, name="theta"):
+    """n-qubit Ry encoding template: qubit i gets Ry(theta[i])."""
+    from qiskit import QuantumCircuit
+    from qiskit.circuit import ParameterVector
+
+    theta = ParameterVector(name, num_qubits)
+    qc = QuantumCircuit(num_qubits)
+    for i in range(num_qubits):
+        qc.ry(theta[i], i)
+    return qc
+
+
+class AerParameterRunner:
+    """
+    Runs many parameter sets of one template on Aer.
+
+    `values` passed to statevectors()/counts() has shape (B, P), columns in
+    the order of `template.parameters`. Each mode's circuit (with
+    save_statevector or measure_all appended) is transpiled once, on first use.
+    """
+
+    def __init__(self, template, backend=None):
+        from qiskit_aer import AerSimulator
+
+        self.template = template
+        self.parameters = list(template.parameters)
+        self.backend = backend or AerSimulator(method="statevector")
+        self._compiled = {}
+
+    def _circuit(self, mode):
+        if mode not in self._compiled:
+            from qiskit import transpile
+
+            qc = self.template.copy()
+            if mode == "statevector":
+                qc.save_statevector()
+            else:
+                qc.measure_all()
+            self._compiled[mode] = transpile(qc, self.backend)
+            count("circuits_built")
+        return self._compiled[mode]
+
+    def _binds(self, values):
+        values = np.asarray(values, dtype=float).reshape(-1, len(self.parameters))
+        return values, [{p: values[:, i].tolist() for i, p in enumerate(self.parameters)}]
+
+    @timed("simulate", samples=len)
+    def statevectors(self, values):
+        """(B, 2**n) statevectors, one Aer job for all B bindings."""
+        values, binds = self._binds(values)
+        result = self.backend.run(self._circuit("statevector"), parameter_binds=binds).result()
+        count("statevector_evaluations", len(values))
+        return np.array([np.asarray(result.get_statevector(i)) for i in range(len(values))])
+
+    @timed("simulate", samples=len)
+    def counts(self, values, shots=1024, seed=None):
+        """(B, 2**n) measurement counts indexed by basis state, one Aer job for all B bindings."""
+        values, binds = self._binds(values)
+        result = self.backend.run(self._circuit("counts"), shots=shots, seed_simulator=seed,
+                                  parameter_binds=binds).result()
+        counts = np.zeros((len(values), 2 ** self.template.num_qubits), dtype=np.int64)
+        for i in range(len(values)):
+            for bits, n in result.get_counts(i).items():
+                counts[i, int(bits.replace(" ", ""), 2)] = n
+        return counts
+
+
+_RY_RUNNERS = {}
+
+
+def aer_ry_fidelities(angles, ref_angle):
+    """Ry-encoding fidelities for a whole window through Aer in a single job."""
+    if 1 not in _RY_RUNNERS:
+        _RY_RUNNERS[1] = AerParameterRunner(ry_template(1))
+    angles = np.asarray(angles, dtype=float)
+    states = _RY_RUNNERS[1].statevectors(np.append(angles, ref_angle))
+    return np.abs(states[:-1] @ np.conj(states[-1])) ** 2
+
+
+# Encodings evaluated by a simulator, one job per window (see fidelity_scores).
+SIMULATED_ENCODINGS = {
+    "aer-ry": aer_ry_fidelities,
+}
+
+
+# --- 3-QUBIT ENTANGLED ENCODING (case2) ---
+# Ry(Bx) ⊗ Ry(By) ⊗ Ry(Bz) followed by CX(0,1), CX(1,2), CX(2,0).
+ENTANGLED3_RING = [(0, 1), (1, 2), (2, 0)]
+
+
+def ry_product_amplitudes(angles):
+    """
+    Product-state amplitudes of Ry(angles[:, q]) on each qubit q.
+
+    `angles` has shape (N, n_qubits); the result is (N, 2**n_qubits) in
+    Qiskit's little-endian order (qubit 0 is the least significant bit).
+    """
+    angles = np.atleast_2d(np.asarray(angles, dtype=float))
+    n_rows, n_qubits = angles.shape
+    amps = np.ones((n_rows, 1))
+    for q in range(n_qubits):
+        qubit = np.stack([np.cos(angles[:, q] / 2), np.sin(angles[:, q] / 2)], axis=1)
+        amps = (qubit[:, :, None] * amps[:, None, :]).reshape(n_rows, -1)
+    return amps
+
+
+def cx_permutation(n_qubits, pairs):
+    """
+    Index permutation equivalent to applying the CX gates in `pairs` in order:
+    `new_amps = amps[..., perm]`.
+    """
+    perm = np.arange(2 ** n_qubits)
+    # new[b] = old[g1(g2(...gk(b)))] since each CX is its own inverse,
+    # so the gate index maps are composed last-gate-first.
+    for control, target in reversed(pairs):
+        flip = (perm >> control) & 1
+        perm = perm ^ (flip << target)
+    return perm
+
+
+ENTANGLED3_PERMUTATION = cx_permutation(3, ENTANGLED3_RING)
+
+
+def entangled3_states_from_angles(angles):
+    """Encoded (N, 8) statevectors for an (N, 3) array of Ry angles."""
+    return ry_product_amplitudes(angles)[:, ENTANGLED3_PERMUTATION]
+
+
+@timed("encode", samples=len)
+def entangled3_states(vectors, min_vals, max_vals, eps=1e-6):
+    """Encoded (N, 8) statevectors for every (Bx, By, Bz) row, as in encode_multidimensional."""
+    return entangled3_states_from_angles(values_to_angles(vectors, min_vals, max_vals, eps))
+
+
+@timed("score", samples=len)
+def entangled3_fidelity_scores(vectors, reference_vector, min_vals, max_vals, eps=1e-6):
+    """Fidelity of every row against the reference row as one batched inner product."""
+    states = entangled3_states(vectors, min_vals, max_vals, eps)
+    state_ref = entangled3_states(reference_vector, min_vals, max_vals, eps)[0]
+    # Ry + CX only: amplitudes are real, |<ref|psi>|^2 is a plain square.
+    return (states @ state_ref) ** 2
+
+
+def entangled3_anomaly_scores(vectors, n_reference=20, eps=1e-6):
+    """1 - fidelity for an (N, 3) record normalized per column, as in complex_quantum.py."""
+    vectors = np.asarray(vectors, dtype=float)
+    min_vals = np.min(vectors, axis=0)
+    max_vals = np.max(vectors, axis=0)
+    reference_vector = np.mean(vectors[:n_reference], axis=0)
+    return 1 - entangled3_fidelity_scores(vectors, reference_vector, min_vals, max_vals, eps)
+
+
+# --- NOISY (DENSITY-MATRIX) ENCODINGS ---
+# Gate noise model: after every gate, each qubit it acts on goes through one
+# single-qubit channel,
+#
+#     depolarizing(p):       rho -> (1 - p) rho + p I/2   (Bloch vector * (1 - p))
+#     amplitude_damping(g):  |1> decays to |0> with probability g
+#
+# Samples and the reference are prepared by the same noisy circuit, and the
+# score uses the Uhlmann fidelity F = (Tr sqrt(sqrt(s) r sqrt(s)))^2 of the
+# mixed states (what qiskit.quantum_info.state_fidelity returns). For one
+# qubit both the channel and F are closed-form in the Bloch vector; the
+# 3-qubit encoding is a batched (N, 8, 8) density-matrix update (real Kraus
+# operators, CX as an index permutation), processed in chunks of samples.
+NOISE_CHANNELS = ("depolarizing", "amplitude_damping")
+
+
+def kraus_operators(channel, strength):
+    """(K, 2, 2) real Kraus operators of a single-qubit channel."""
+    if not 0 <= strength <= 1:
+        raise ValueError(f"Noise strength must be in [0, 1], got {strength}")
+    if channel == "depolarizing":
+        # (1 - 3p/4) rho + p/4 (X rho X + Y rho Y + Z rho Z); Y rho Y = Y' rho Y'^T for real Y'.
+        paulis = np.array([[[1, 0], [0, 1]], [[0, 1], [1, 0]], [[0, -1], [1, 0]], [[1, 0], [0, -1]]], dtype=float)
+        return paulis * np.sqrt([1 - 3 * strength / 4] + [strength / 4] * 3)[:, None, None]
+    if channel == "amplitude_damping":
+        return np.array([[[1, 0], [0, np.sqrt(1 - strength)]], [[0, np.sqrt(strength)], [0, 0]]])
+    raise ValueError(f"Unknown noise channel: {channel!r} (expected one of {NOISE_CHANNELS})")
+
+
+def noisy_ry_bloch(angles, channel, strength):
+    """(N, 3) Bloch vectors of Ry(angles)|0> after one application of the channel."""
+    angles = np.asarray(angles, dtype=float)
+    x, z = np.sin(angles), np.cos(angles)
+    if channel == "depolarizing":
+        x, z = (1 - strength) * x, (1 - strength) * z
+    elif channel == "amplitude_damping":
+        x, z = np.sqrt(1 - strength) * x, strength + (1 - strength) * z
+    else:
+        kraus_operators(channel, strength)  # raises
+    return np.stack([x, np.zeros_like(x), z], axis=-1)
+
+
+def qubit_fidelities(bloch, ref_bloch):
+    """Uhlmann fidelity of qubit states from Bloch vectors: (1 + r.s + sqrt((1-|r|^2)(1-|s|^2))) / 2."""
+    bloch, ref_bloch = np.asarray(bloch, dtype=float), np.asarray(ref_bloch, dtype=float)
+    purity = np.clip(1 - np.sum(bloch ** 2, axis=-1), 0, None) * max(1 - float(ref_bloch @ ref_bloch), 0)
+    return (1 + bloch @ ref_bloch + np.sqrt(purity)) / 2
+
+
+def noisy_ry_fidelities(angles, ref_angle, channel, strength):
+    """Closed-form fidelity of the noisy 1-qubit Ry encoding against the (noisy) reference."""
+    return qubit_fidelities(noisy_ry_bloch(angles, channel, strength),
+                            noisy_ry_bloch(ref_angle, channel, strength))
+
+
+def apply_channel(rho, kraus, qubit):
+    """sum_k K rho K^T on `qubit` of a batch of n-qubit density matrices (B, 2**n, 2**n)."""
+    batch, dim = rho.shape[0], rho.shape[1]
+    n = dim.bit_length() - 1
+    tensor = rho.reshape((batch,) + (2,) * (2 * n))
+    row, col = n - qubit, 2 * n - qubit  # little-endian: qubit 0 is the last axis of each index
+    out = np.zeros_like(tensor)
+    for k in kraus:
+        term = np.moveaxis(np.tensordot(k, tensor, axes=([1], [row])), 0, row)
+        out += np.moveaxis(np.tensordot(term, k, axes=([col], [1])), -1, col)
+    return out.reshape(batch, dim, dim)
+
+
+def entangled3_noise_layers(rho, channel, strength):
+    """Noise after the Ry layer, then each CX of the ring with noise on both of its qubits."""
+    kraus = kraus_operators(channel, strength)
+    for q in range(3):
+        rho = apply_channel(rho, kraus, q)
+    for control, target in ENTANGLED3_RING:
+        perm = cx_permutation(3, [(control, target)])
+        rho = rho[:, perm][:, :, perm]
+        rho = apply_channel(apply_channel(rho, kraus, control), kraus, target)
+    return rho
+
+
+_NOISE_SUPEROPERATORS = {}
+
+
+def entangled3_noise_superoperator(channel, strength):
+    """
+    (64, 64) matrix S of everything after the ideal Ry layer: vec(rho_out) =
+    vec(rho_in) @ S. The map does not depend on the data, so it is built once
+    per (channel, strength) from the 64 basis matrices.
+    """
+    key = (channel, float(strength))
+    if key not in _NOISE_SUPEROPERATORS:
+        basis = np.eye(64).reshape(64, 8, 8)
+        _NOISE_SUPEROPERATORS[key] = entangled3_noise_layers(basis, channel, strength).reshape(64, 64)
+    return _NOISE_SUPEROPERATORS[key]
+
+
+def noisy_entangled3_density_matrices(angles, channel, strength):
+    """(N, 8, 8) density matrices of the entangled3 circuit with gate noise (real: Ry, CX, real Kraus)."""
+    psi = ry_product_amplitudes(angles)
+    rho = (psi[:, :, None] * psi[:, None, :]).reshape(len(psi), 64)
+    return (rho @ entangled3_noise_superoperator(channel, strength)).reshape(-1, 8, 8)
+
+
+def density_fidelities(rhos, sigma):
+    """Uhlmann fidelity of every (real symmetric) density matrix in `rhos` against `sigma`."""
+    evals, evecs = np.linalg.eigh(sigma)
+    sqrt_sigma = (evecs * np.sqrt(np.clip(evals, 0, None))) @ evecs.T
+    inner = np.linalg.eigvalsh(sqrt_sigma @ rhos @ sqrt_sigma)
+    return np.sum(np.sqrt(np.clip(inner, 0, None)), axis=-1) ** 2
+
+
+@timed("score", samples=len)
+def noisy_entangled3_fidelity_scores(vectors, reference_vector, min_vals, max_vals, channel, strength,
+                                     eps=1e-6, chunksize=16384):
+    """entangled3_fidelity_scores() under gate noise, in chunks of `chunksize` samples."""
+    angles = values_to_angles(vectors, min_vals, max_vals, eps)
+    sigma = noisy_entangled3_density_matrices(values_to_angles(reference_vector, min_vals, max_vals, eps),
+                                              channel, strength)[0]
+    fidelities = np.empty(len(angles))
+    for lo in range(0, len(angles), chunksize):
+        rho = noisy_entangled3_density_matrices(angles[lo:lo + chunksize], channel, strength)
+        fidelities[lo:lo + chunksize] = density_fidelities(rho, sigma)
+    count("density_matrix_evaluations", len(angles) + 1)
+    return np.clip(fidelities, 0, 1)
+
+
+def noisy_anomaly_scores(data, channel, strength, n_reference=10, eps=1e-6):
+    """anomaly_scores() (1-qubit Ry) with the encoding circuit under gate noise."""
+    data = np.asarray(data, dtype=float)
+    min_val, max_val = np.min(data), np.max(data)
+    with timer("score", len(data)):
+        angles = values_to_angles(data, min_val, max_val, eps)
+        ref_angle = values_to_angles(np.mean(data[:n_reference]), min_val, max_val, eps)
+        return 1 - np.clip(noisy_ry_fidelities(angles, ref_angle, channel, strength), 0, 1)
+
+
+def noisy_entangled3_anomaly_scores(vectors, channel, strength, n_reference=20, eps=1e-6):
+    """entangled3_anomaly_scores() with the encoding circuit under gate noise."""
+    vectors = np.asarray(vectors, dtype=float)
+    min_vals = np.min(vectors, axis=0)
+    max_vals = np.max(vectors, axis=0)
+    reference_vector = np.mean(vectors[:n_reference], axis=0)
+    return 1 - noisy_entangled3_fidelity_scores(vectors, reference_vector, min_vals, max_vals,
+                                                channel, strength, eps)
+
+
+# --- SHOT-BASED (COMPUTE-UNCOMPUTE) SCORING ---
+# On hardware the fidelity is estimated, not read off a statevector:
+# F(x, ref) = P(0...0) after U(x) followed by U(ref)^dagger. One Aer template
+# per encoding carries both angle sets as parameters, so every round is one
+# batched job. Shots are allocated adaptively: every sample starts with
+# `initial_shots`; a sample is settled once the Wilson interval of its score
+# lies entirely on one side of the anomaly threshold (0.1 in
+# quantum_anomaly.py); unsettled samples double their shots, up to `max_shots`.
+ANOMALY_THRESHOLD = 0.1
+SHOT_ENCODINGS = {"ry": 1, "entangled3": 3}  # encoding -> qubits
+
+
+def encoder_template(encoding, name="theta"):
+    """Parameterized encoding circuit: Ry on each qubit (+ the CX ring for entangled3)."""
+    qc = ry_template(SHOT_ENCODINGS[encoding], name)
+    if encoding == "entangled3":
+        for control, target in ENTANGLED3_RING:
+            qc.cx(control, target)
+    return qc
+
+
+def compute_uncompute_template(encoding):
+    """U(theta) then U(ref)^dagger; P(all zeros) is the fidelity of the two encoded states."""
+    if encoding not in SHOT_ENCODINGS:
+        raise ValueError(f"Unknown shot encoding: {encoding!r} (expected one of {tuple(SHOT_ENCODINGS)})")
+    return encoder_template(encoding).compose(encoder_template(encoding, "ref").inverse())
+
+
+_CU_RUNNERS = {}
+
+
+def _cu_runner(encoding):
+    if encoding not in _CU_RUNNERS:
+        _CU_RUNNERS[encoding] = AerParameterRunner(compute_uncompute_template(encoding))
+    return _CU_RUNNERS[encoding]
+
+
+def _cu_values(runner, angles, ref_angles):
+    """(B, P) bindings in template parameter order from (B, n) sample and (n,) reference angles."""
+    angles = np.asarray(angles, dtype=float).reshape(len(angles), -1)
+    ref_angles = np.broadcast_to(np.asarray(ref_angles, dtype=float).ravel(), angles.shape)
+    columns = {f"theta[{i}]": angles[:, i] for i in range(angles.shape[1])}
+    columns.update({f"ref[{i}]": ref_angles[:, i] for i in range(angles.shape[1])})
+    return np.stack([columns[p.name] for p in runner.parameters], axis=1)
+
+
+def wilson_interval(hits, shots, z=3.0):
+    """(low, high) Wilson score interval of a binomial proportion hits / shots."""
+    hits, shots = np.asarray(hits, dtype=float), np.asarray(shots, dtype=float)
+    p = hits / shots
+    denom = 1 + z ** 2 / shots
+    center = (p + z ** 2 / (2 * shots)) / denom
+    half = z * np.sqrt(p * (1 - p) / shots + z ** 2 / (4 * shots ** 2)) / denom
+    return center - half, center + half
+
+
+@timed("score", samples=lambda result: len(result[0]))
+def shot_fidelities(angles, ref_angles, encoding="ry", shots="adaptive", threshold=ANOMALY_THRESHOLD,
+                    initial_shots=64, max_shots=2048, z=3.0, seed=None):
+    """
+    (fidelity estimates, shots used per sample) from compute-uncompute counts.
+    `shots` is a fixed per-sample count or "adaptive" (initial_shots doubling
+    up to max_shots around `threshold` on the score 1 - F).
+    """
+    runner = _cu_runner(encoding)
+    values = _cu_values(runner, angles, ref_angles)
+    n = len(values)
+    hits = np.zeros(n, dtype=np.int64)
+    used = np.zeros(n, dtype=np.int64)
+    if shots != "adaptive":
+        initial_shots = max_shots = int(shots)
+
+    active = np.arange(n)
+    round_shots = initial_shots
+    round_index = 0
+    while active.size:
+        counts = runner.counts(values[active], round_shots, None if seed is None else seed + round_index)
+        hits[active] += counts[:, 0]
+        used[active] += round_shots
+        count("shots", round_shots * len(active))
+
+        low, high = wilson_interval(hits[active], used[active], z)
+        settled = (1 - low < threshold) | (1 - high > threshold) | (used[active] >= max_shots)
+        active = active[~settled]
+        if active.size:
+            # Active samples have all survived every round: same total so far, doubled next.
+            total = int(used[active[0]])
+            round_shots = min(total, max_shots - total)
+        round_index += 1
+    return hits / used, used
+
+
+def shot_anomaly_scores(data, encoding="ry", n_reference=None, shots="adaptive", seed=None, **options):
+    """
+    (1 - estimated fidelity, shots per sample) for a B_Mag series ("ry", as in
+    quantum_anomaly.py) or an (N, 3) Bx/By/Bz record ("entangled3", as in
+    complex_quantum.py). `options` go to shot_fidelities().
+    """
+    data = np.asarray(data, dtype=float)
+    n_reference = n_reference or (20 if encoding == "entangled3" else 10)
+    min_val, max_val = np.min(data, axis=0), np.max(data, axis=0)
+    angles = values_to_angles(data, min_val, max_val)
+    ref_angles = values_to_angles(np.mean(data[:n_reference], axis=0), min_val, max_val)
+    fidelities, used = shot_fidelities(angles, ref_angles, encoding, shots, seed=seed, **options)
+    return 1 - fidelities, used
+
+
+# --- SLIDING-WINDOW k-QUBIT ENCODING ---
+# Window i of a series puts samples i*stride .. i*stride + k - 1 on k qubits
+# with Ry rotations. For product states the fidelity factorizes per qubit,
+#
+#     |<psi(a)|psi(b)>|^2 = prod_q cos^2((a_q - b_q) / 2),
+#
+# so windows are kept as (W, k) angle arrays and never expanded to 2**k
+# amplitudes; k = 20+ over the whole record costs O(W * k) memory.
+
+def window_angles(values, k, stride=1, min_val=None, max_val=None, eps=1e-6):
+    """
+    (W, k) Ry angles of every k-sample window. The series is scaled once and
+    the windows are a strided read-only view of it (no W * k copy).
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < k:
+        raise ValueError(f"Need at least k={k} samples, got {len(values)}")
+    min_val = np.min(values) if min_val is None else min_val
+    max_val = np.max(values) if max_val is None else max_val
+    angles = values_to_angles(values, min_val, max_val, eps)
+    return np.lib.stride_tricks.sliding_window_view(angles, k)[::stride]
+
+
+def window_qubit_states(angles):
+    """Per-qubit amplitudes (W, k, 2) = [cos(a/2), sin(a/2)] of the windowed product states."""
+    angles = np.asarray(angles, dtype=float)
+    return np.stack([np.cos(angles / 2), np.sin(angles / 2)], axis=-1)
+
+
+@timed("score", samples=len)
+def window_fidelities(angles, ref_angles, chunksize=65536):
+    """Product-state fidelity of each window against the reference window, in chunks of windows."""
+    angles = np.asarray(angles, dtype=float)
+    ref_angles = np.asarray(ref_angles, dtype=float)
+    fidelities = np.empty(len(angles))
+    for start in range(0, len(angles), chunksize):
+        chunk = angles[start:start + chunksize]
+        fidelities[start:start + chunksize] = np.prod(np.cos((chunk - ref_angles) / 2) ** 2, axis=1)
+    return fidelities
+
+
+def window_anomaly_scores(data, k=4, stride=1, n_reference=10, eps=1e-6):
+    """
+    1 - fidelity for every k-sample window of a record.
+
+    Normalization uses the record's min/max and the reference window is the
+    element-wise mean of the first `n_reference` windows (the temporal
+    analogue of anomaly_scores). Score i belongs to the window starting at
+    sample i * stride.
+    """
+    data = np.asarray(data, dtype=float)
+    angles = window_angles(data, k, stride, eps=eps)
+    return 1 - window_fidelities(angles, angles[:n_reference].mean(axis=0))
+
+
+# --- ONLINE (REAL-TIME) SCORING ---
+RENORMALIZE_POLICIES = ("expand", "freeze", "clip")
+
+
+class OnlineAnomalyScorer:
+    """
+    Incremental anomaly scorer for live telemetry: `update(sample) -> score`.
+
+    encoding="ry" scores scalar samples like quantum_anomaly.data_to_quantum_state,
+    encoding="entangled3" scores (Bx, By, Bz) samples like
+    complex_quantum.encode_multidimensional.
+
+    The reference is the mean of the first `n_reference` samples unless given;
+    scores are NaN until it is known. Extrema grow with the data during that
+    warm-up. Afterwards `renormalize` decides what a new extreme does:
+
+    - "expand": widen min/max to include it (the reference angle is re-derived),
+    - "freeze": keep the range; the sample maps outside [0, pi],
+    - "clip":   keep the range and clip the sample into it.
+
+    A range that is still empty (min == max, e.g. a given `reference` without
+    `min_val`/`max_val`) keeps widening until it is not.
+
+    Seeding `reference`, `min_val` and `max_val` with the offline window's
+    values and using "freeze" reproduces the offline scores exactly.
+    """
+
+    def __init__(self, encoding="ry", n_reference=10, reference=None,
+                 min_val=None, max_val=None, renormalize="expand", eps=1e-6):
+        if encoding not in ("ry", "entangled3"):
+            raise ValueError(f"Unknown encoding: {encoding!r}")
+        if renormalize not in RENORMALIZE_POLICIES:
+            raise ValueError(f"renormalize must be one of {RENORMALIZE_POLICIES}")
+        self.encoding = encoding
+        self.n_features = 1 if encoding == "ry" else 3
+        self.n_reference = n_reference
+        self.renormalize = renormalize
+        self.eps = eps
+        self.reference = None if reference is None else self._features(reference)
+        self.min = None if min_val is None else self._features(min_val)
+        self.max = None if max_val is None else self._features(max_val)
+        self.count = 0
+        self._head = []
+
+    def _features(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n_features,)).copy()
+
+    def _rows(self, samples):
+        return np.asarray(samples, dtype=float).reshape(-1, self.n_features)
+
+    def update(self, sample):
+        """Scores one sample (scalar, or a length-3 vector for entangled3)."""
+        return self.update_many([sample])[0]
+
+    @timed("score.online", samples=len)
+    def update_many(self, samples):
+        """Vectorized equivalent of calling update() on each sample in order."""
+        x = self._rows(samples)
+        n = len(x)
+        scores = np.full(n, np.nan)
+        if n == 0:
+            return scores
+
+        # Index of the first sample that gets a score (the one completing the reference).
+        ready = 0
+        warming = self.reference is None
+        if warming:
+            missing = self.n_reference - sum(len(h) for h in self._head)
+            self._head.append(x[:missing].copy())
+            if missing > n:
+                ready = n
+            else:
+                ready = missing - 1
+                self.reference = np.mean(np.concatenate(self._head), axis=0)
+                self._head = []
+
+        # Running extrema through the batch; fixed after warm-up unless "expand".
+        carried = self.min is not None
+        lo = np.fmin.accumulate(np.vstack([self.min if carried else x[:1], x]))[1:]
+        hi = np.fmax.accumulate(np.vstack([self.max if carried else x[:1], x]))[1:]
+        if self.renormalize != "expand":
+            # The range freezes once the reference is known and it is non-empty;
+            # until then it keeps widening, or every score would be 0.
+            for j in range(self.n_features):
+                if carried and not warming and self.max[j] > self.min[j]:
+                    lo[:, j], hi[:, j] = self.min[j], self.max[j]
+                    continue
+                wide = np.flatnonzero(hi[ready:, j] > lo[ready:, j])
+                if len(wide):
+                    k = ready + wide[0]
+                    lo[k + 1:, j], hi[k + 1:, j] = lo[k, j], hi[k, j]
+
+        self.min, self.max = lo[-1].copy(), hi[-1].copy()
+        self.count += n
+        if ready >= n:
+            return scores
+
+        values, lo, hi = x[ready:], lo[ready:], hi[ready:]
+        if self.renormalize == "clip":
+            values = np.clip(values, lo, hi)
+        angles = values_to_angles(values, lo, hi, self.eps)
+        ref_angles = values_to_angles(self.reference, lo, hi, self.eps)
+        if self.encoding == "ry":
+            fidelities = ry_fidelity(angles[:, 0], ref_angles[:, 0])
+        else:
+            fidelities = np.sum(entangled3_states_from_angles(angles)
+                                * entangled3_states_from_angles(ref_angles), axis=1) ** 2
+        scores[ready:] = 1 - fidelities
+        return scores
+
+
+# --- NUMPY STATEVECTOR ENGINE ---
+# Every circuit in this repo is small (<= ~10 qubits), so Qiskit/Aer call
+# overhead (circuit objects, transpilation, result marshalling) dwarfs the
+# arithmetic. This engine applies the gates directly to a (B, 2, ..., 2) array:
+# one call simulates B parameter sets / input states. Amplitudes are in
+# Qiskit's little-endian order (qubit 0 is the last tensor axis).
+SV_GATES = ("h", "x", "z", "ry", "rz", "p", "cx", "cz", "cp", "swap")
+_SV_IGNORED = ("barrier", "id")
+
+
+def _coef(value, ndim):
+    """Broadcasts a scalar or per-batch (B,) gate parameter against a (B, ...) slice."""
+    value = np.asarray(value)
+    return value.reshape(value.shape + (1,) * (ndim - value.ndim)) if value.ndim else value
+
+
+def _index(ndim, axes_values):
+    index = [slice(None)] * ndim
+    for axis, bit in axes_values:
+        index[axis] = bit
+    return tuple(index)
+
+
+def apply_gate(psi, name, qubits, param=None):
+    """
+    Applies one gate in place to psi of shape (B,) + (2,) * n.
+
+    `param` is a float or a (B,) array (one angle per batch entry).
+    """
+    n = psi.ndim - 1
+    axes = [n - q for q in qubits]
+    if len(axes) == 1:
+        i0, i1 = _index(psi.ndim, [(axes[0], 0)]), _index(psi.ndim, [(axes[0], 1)])
+        if name == "h":
+            a = psi[i0].copy()
+            psi[i0] = (a + psi[i1]) * np.sqrt(0.5)
+            psi[i1] = (a - psi[i1]) * np.sqrt(0.5)
+        elif name == "x":
+            a = psi[i0].copy()
+            psi[i0] = psi[i1]
+            psi[i1] = a
+        elif name == "z":
+            psi[i1] *= -1
+        elif name == "p":
+            psi[i1] *= _coef(np.exp(1j * np.asarray(param)), n)
+        elif name == "rz":
+            phase = _coef(np.exp(0.5j * np.asarray(param)), n)
+            psi[i0] *= np.conj(phase)
+            psi[i1] *= phase
+        elif name == "ry":
+            c = _coef(np.cos(np.asarray(param) / 2), n)
+            s = _coef(np.sin(np.asarray(param) / 2), n)
+            a = psi[i0].copy()
+            psi[i0] = c * a - s * psi[i1]
+            psi[i1] = s * a + c * psi[i1]
+        else:
+            raise ValueError(f"Unsupported gate: {name!r}")
+        return psi
+
+    (ca, ta) = axes
+    i11 = _index(psi.ndim, [(ca, 1), (ta, 1)])
+    if name == "cx":
+        i10 = _index(psi.ndim, [(ca, 1), (ta, 0)])
+        a = psi[i10].copy()
+        psi[i10] = psi[i11]
+        psi[i11] = a
+    elif name == "cz":
+        psi[i11] *= -1
+    elif name == "cp":
+        psi[i11] *= _coef(np.exp(1j * np.asarray(param)), n - 1)
+    elif name == "swap":
+        i01, i10 = _index(psi.ndim, [(ca, 0), (ta, 1)]), _index(psi.ndim, [(ca, 1), (ta, 0)])
+        a = psi[i01].copy()
+        psi[i01] = psi[i10]
+        psi[i10] = a
+    else:
+        raise ValueError(f"Unsupported gate: {name!r}")
+    return psi
+
+
+def _parameter_function(expr, parameters):
+    """(B, P) parameter values -> (B,) values of `expr` (a Parameter or ParameterExpression)."""
+    from qiskit.circuit import Parameter
+
+    if isinstance(expr, Parameter):
+        column = parameters.index(expr)
+        return lambda values: values[:, column]
+
+    import symengine
+
+    used = list(expr.parameters)
+    columns = [parameters.index(p) for p in used]
+    fn = symengine.Lambdify([p.sympify() for p in used], [expr.sympify()])
+    return lambda values: np.real(fn(values[:, columns])).reshape(len(values))
+
+
+def circuit_ops(qc):
+    """
+    Compiles a Qiskit circuit into (name, qubits, param) instructions for
+    simulate_ops(). Composite gates are decomposed until only SV_GATES remain;
+    symbolic parameters become functions of a (B, P) array of values ordered
+    like `qc.parameters`. A trailing ("gphase", (), phase) keeps the global phase.
+    """
+    from qiskit.circuit import ParameterExpression
+
+    parameters = list(qc.parameters)
+
+    def param_of(value):
+        if isinstance(value, ParameterExpression):
+            if value.parameters:
+                return _parameter_function(value, parameters)
+            value = complex(value).real
+        return float(value)
+
+    for _ in range(10):
+        names = {inst.operation.name for inst in qc.data} - set(_SV_IGNORED)
+        if names <= set(SV_GATES):
+            break
+        qc = qc.decompose()
+    else:
+        raise ValueError(f"Unsupported gates: {sorted(names - set(SV_GATES))}")
+
+    ops = []
+    for inst in qc.data:
+        name = inst.operation.name
+        if name in _SV_IGNORED:
+            continue
+        qubits = tuple(qc.find_bit(q).index for q in inst.qubits)
+        params = inst.operation.params
+        ops.append((name, qubits, param_of(params[0]) if params else None))
+    if qc.global_phase != 0:
+        ops.append(("gphase", (), param_of(qc.global_phase)))
+    return ops
+
+
+@timed("simulate.numpy", samples=len)
+def simulate_ops(num_qubits, ops, parameter_values=None, initial=None):
+    """
+    Batched statevector simulation of `ops` (see circuit_ops / apply_gate).
+
+    The batch size B comes from `initial` ((B, 2**n) states, default |0...0>),
+    `parameter_values` ((B, P), for compiled symbolic parameters) or from any
+    (B,) array given directly as a gate parameter. Returns (B, 2**n) amplitudes.
+    """
+    if parameter_values is not None:
+        parameter_values = np.atleast_2d(np.asarray(parameter_values, dtype=float))
+    params = [p(parameter_values) if callable(p) else p for _, _, p in ops]
+
+    sizes = {np.shape(p)[0] for p in params if np.ndim(p)}
+    if initial is not None:
+        sizes.add(np.atleast_2d(initial).shape[0])
+    elif parameter_values is not None:
+        sizes.add(len(parameter_values))
+    batch = max(sizes, default=1)
+
+    if initial is None:
+        psi = np.zeros((batch, 2 ** num_qubits), dtype=complex)
+        psi[:, 0] = 1
+    else:
+        psi = np.array(np.atleast_2d(initial), dtype=complex)
+        psi = np.broadcast_to(psi, (batch, psi.shape[1])).copy()
+    psi = psi.reshape((batch,) + (2,) * num_qubits)
+
+    for (name, qubits, _), param in zip(ops, params):
+        if name == "gphase":
+            psi *= _coef(np.exp(1j * np.asarray(param)), psi.ndim)
+        else:
+            apply_gate(psi, name, qubits, param)
+    count("statevector_evaluations", batch)
+    return psi.reshape(batch, 2 ** num_qubits)
+
+
+def simulate_circuit(qc, parameter_values=None, initial=None):
+    """simulate_ops(circuit_ops(qc), ...); compile once with circuit_ops() when looping."""
+    return simulate_ops(qc.num_qubits, circuit_ops(qc), parameter_values, initial)
+
+
+# --- CIRCUIT GENERATORS (Grover / QFT) ---
+# Bitstrings follow Qiskit's counts convention: the rightmost character is qubit 0.
+
+def _as_bitstrings(marked, num_qubits):
+    """Marked states as unique bitstrings (a state flipped twice would cancel out of the oracle)."""
+    if isinstance(marked, (str, int, np.integer)):
+        marked = [marked]
+    bitstrings = []
+    for state in marked:
+        if not isinstance(state, str):
+            state = format(int(state), f"0{num_qubits}b")
+        if len(state) != num_qubits or set(state) - {"0", "1"}:
+            raise ValueError(f"Marked state {state!r} is not a {num_qubits}-bit string")
+        bitstrings.append(state)
+    return list(dict.fromkeys(bitstrings))
+
+
+def _multi_controlled_z(qc, qubits):
+    if len(qubits) == 1:
+        qc.z(qubits[0])
+    else:
+        qc.h(qubits[-1])
+        qc.mcx(list(qubits[:-1]), qubits[-1])
+        qc.h(qubits[-1])
+
+
+def grover_oracle(num_qubits, marked):
+    """Phase oracle flipping the sign of every marked basis state."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits, name="Oracle")
+    qubits = list(range(num_qubits))
+    for state in _as_bitstrings(marked, num_qubits):
+        zeros = [q for q, bit in enumerate(reversed(state)) if bit == "0"]
+        if zeros:
+            qc.x(zeros)
+        _multi_controlled_z(qc, qubits)
+        if zeros:
+            qc.x(zeros)
+    return qc
+
+
+def grover_diffuser(num_qubits):
+    """Reflection about the uniform superposition, 2|s><s| - I."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits, name="Diffuser")
+    qubits = list(range(num_qubits))
+    qc.h(qubits)
+    qc.x(qubits)
+    _multi_controlled_z(qc, qubits)
+    qc.x(qubits)
+    qc.h(qubits)
+    return qc
+
+
+def grover_iterations(num_qubits, num_marked=1):
+    """Iteration count maximizing the success probability, round(pi / (4 theta) - 1/2)."""
+    theta = np.arcsin(np.sqrt(num_marked / 2 ** num_qubits))
+    return max(0, int(np.round(np.pi / (4 * theta) - 0.5)))
+
+
+def grover_circuit(num_qubits, marked, iterations=None):
+    """n-qubit Grover search for one or more marked states (no measurements)."""
+    from qiskit import QuantumCircuit
+
+    marked = _as_bitstrings(marked, num_qubits)
+    if iterations is None:
+        iterations = grover_iterations(num_qubits, len(marked))
+    oracle = grover_oracle(num_qubits, marked)
+    diffuser = grover_diffuser(num_qubits)
+
+    qc = QuantumCircuit(num_qubits)
+    qc.h(range(num_qubits))
+    for _ in range(iterations):
+        qc.compose(oracle, inplace=True)
+        qc.compose(diffuser, inplace=True)
+    return qc
+
+
+def qft_circuit(num_qubits, do_swaps=True, inverse=False):
+    """Quantum Fourier Transform built from H and controlled-phase gates (same unitary as QFT())."""
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits, name="QFT")
+    for target in reversed(range(num_qubits)):
+        qc.h(target)
+        for control in reversed(range(target)):
+            qc.cp(np.pi / 2 ** (target - control), control, target)
+    if do_swaps:
+        for q in range(num_qubits // 2):
+            qc.swap(q, num_qubits - q - 1)
+    return qc.inverse() if inverse else qc
+
+
+# --- EXECUTION: EXACT PROBABILITIES OR SHOT SAMPLING ---
+
+def exact_probabilities(qc, backend=None):
+    """
+    Basis-state probabilities read from the final statevector (no shot noise).
+
+    Runs on Aer's statevector method, which applies multi-controlled gates
+    natively; returns an array of length 2**n in little-endian index order.
+    """
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    backend = backend or AerSimulator(method="statevector")
+    sv_qc = qc.remove_final_measurements(inplace=False)
+    sv_qc.save_probabilities()
+    result = backend.run(transpile(sv_qc, backend)).result()
+    count("statevector_evaluations")
+    return np.asarray(result.data(0)["probabilities"])
+
+
+def probabilities_dict(probs, num_qubits, atol=1e-12):
+    """Nonzero probabilities keyed by bitstring, in the same format as get_counts()."""
+    return {format(i, f"0{num_qubits}b"): float(p)
+            for i, p in enumerate(probs) if p > atol}
+
+
+def sample_counts(qc, shots=2048, seed=None, backend=None):
+    """Shot-sampled measurement counts (the app's original execution mode)."""
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    backend = backend or AerSimulator()
+    m_qc = qc.copy()
+    m_qc.measure_all()
+    return backend.run(transpile(m_qc, backend), shots=shots, seed_simulator=seed).result().get_counts()
+
+
+# --- SCALING BENCHMARK ---
+
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def benchmark_circuits(min_qubits=2, max_qubits=20, algorithms=("grover", "qft"), exact=True, shots=2048):
+    """
+    Build and run time of the generators as the register grows.
+
+    Memory is reported as the statevector size (16 * 2**n bytes) and the
+    process' peak RSS so far (monotonic, so read it as a running maximum).
+    """
+    import time
+
+    rows = []
+    for algorithm in algorithms:
+        for n in range(min_qubits, max_qubits + 1):
+            t0 = time.perf_counter()
+            qc = grover_circuit(n, "1" * n) if algorithm == "grover" else qft_circuit(n)
+            build_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            if exact:
+                exact_probabilities(qc)
+            else:
+                sample_counts(qc, shots=shots, seed=0)
+            run_s = time.perf_counter() - t0
+
+            rows.append({
+                "algorithm": algorithm,
+                "qubits": n,
+                "mode": "exact" if exact else f"{shots} shots",
+                "gates": sum(qc.count_ops().values()),
+                "build_s": build_s,
+                "run_s": run_s,
+                "statevector_mb": 16 * 2 ** n / 2 ** 20,
+                "peak_rss_mb": _peak_rss_mb(),
+            })
+            print(f"{algorithm:>6} n={n:>2} | build {build_s:8.3f}s | run {run_s:8.3f}s | "
+                  f"state {rows[-1]['statevector_mb']:10.2f} MB | peak RSS {rows[-1]['peak_rss_mb']:8.1f} MB")
+    return rows
+
+
+def benchmark_simulators(num_qubits=4, batch=1000, reps=2, seed=0):
+    """
+    Wall time of B = `batch` evaluations of ZZFeatureMap + RealAmplitudes
+    (the signal_classifier circuit) per backend: Statevector.from_instruction
+    per parameter set, one Aer job over the B bound circuits, and a single
+    batched simulate_ops() call (compilation included).
+    """
+    import time
+
+    from qiskit import transpile
+    from qiskit.circuit.library import RealAmplitudes, ZZFeatureMap
+    from qiskit.quantum_info import Statevector
+    from qiskit_aer import AerSimulator
+
+    qc = ZZFeatureMap(num_qubits).compose(RealAmplitudes(num_qubits, reps=reps))
+    values = np.random.default_rng(seed).uniform(0, np.pi, (batch, qc.num_parameters))
+
+    def qiskit_statevector():
+        return np.array([Statevector.from_instruction(qc.assign_parameters(v)).data for v in values])
+
+    def aer():
+        backend = AerSimulator(method="statevector")
+        circuits = []
+        for v in values:
+            bound = qc.assign_parameters(v)
+            bound.save_statevector()
+            circuits.append(bound)
+        result = backend.run(transpile(circuits, backend)).result()
+        return np.array([result.get_statevector(i).data for i in range(batch)])
+
+    def numpy_batched():
+        return simulate_circuit(qc, values)
+
+    rows = []
+    reference = None
+    for name, fn in (("qiskit.Statevector", qiskit_statevector), ("aer", aer), ("numpy", numpy_batched)):
+        t0 = time.perf_counter()
+        states = fn()
+        seconds = time.perf_counter() - t0
+        if reference is None:
+            reference = states
+        rows.append({
+            "backend": name,
+            "qubits": num_qubits,
+            "batch": batch,
+            "seconds": seconds,
+            "us_per_state": seconds / batch * 1e6,
+            "max_abs_error": float(np.max(np.abs(np.abs(states) - np.abs(reference)))),
+        })
+        print(f"{name:>18} | {seconds:8.3f}s | {rows[-1]['us_per_state']:9.1f} us/state | "
+              f"max |amp| error {rows[-1]['max_abs_error']:.1e}")
+    return rows
+
+
+def benchmark_noise(n_samples=100_000, channel="depolarizing", strength=0.01, seed=0):
+    """
+    Throughput of the ideal and gate-noise (density-matrix) anomaly scores for
+    the 1-qubit Ry and 3-qubit entangled encodings on the same random record.
+    """
+    import time
+
+    rng = np.random.default_rng(seed)
+    data = rng.normal(10, 3, n_samples)
+    vectors = rng.normal(0, 3, (n_samples, 3))
+    paths = (
+        ("ry", "ideal", lambda: anomaly_scores(data)),
+        ("ry", "noisy", lambda: noisy_anomaly_scores(data, channel, strength)),
+        ("entangled3", "ideal", lambda: entangled3_anomaly_scores(vectors)),
+        ("entangled3", "noisy", lambda: noisy_entangled3_anomaly_scores(vectors, channel, strength)),
+    )
+    rows = []
+    for encoding, path, fn in paths:
+        t0 = time.perf_counter()
+        scores = fn()
+        seconds = time.perf_counter() - t0
+        rows.append({
+            "encoding": encoding,
+            "path": path,
+            "channel": channel if path == "noisy" else None,
+            "strength": strength if path == "noisy" else 0.0,
+            "samples": n_samples,
+            "seconds": seconds,
+            "samples_per_sec": n_samples / seconds,
+            "mean_score": float(np.mean(scores)),
+        })
+        print(f"{encoding:>10} {path:>5} | {seconds:8.3f}s | {rows[-1]['samples_per_sec']:12,.0f} samples/s | "
+              f"mean score {rows[-1]['mean_score']:.4f}")
+    return rows
+
+
+def benchmark_shots(n_samples=2000, encoding="ry", fixed_shots=2048, seeds=3, threshold=ANOMALY_THRESHOLD,
+                    initial_shots=64, seed=0):
+    """
+    Shots needed by adaptive allocation vs a fixed `fixed_shots` per sample.
+    Accuracy is agreement of (score > threshold) with the exact decision; the
+    adaptive cap is raised (1x, 2x, 4x fixed_shots) until its mean error count
+    is no worse than the fixed allocation, and the budget saved at that cap is
+    reported.
+    """
+    rng = np.random.default_rng(seed)
+    data = rng.normal(10, 3, n_samples) if encoding == "ry" else rng.normal(0, 3, (n_samples, 3))
+    exact = anomaly_scores(data) if encoding == "ry" else entangled3_anomaly_scores(data)
+    truth = exact > threshold
+
+    def errors(max_shots=None):
+        wrong, used = [], []
+        for run in range(seeds):
+            shots = fixed_shots if max_shots is None else "adaptive"
+            scores, per_sample = shot_anomaly_scores(data, encoding, shots=shots, threshold=threshold,
+                                                     initial_shots=initial_shots, max_shots=max_shots or fixed_shots,
+                                                     seed=seed + 1000 * (run + 1))
+            wrong.append(int(np.sum((scores > threshold) != truth)))
+            used.append(int(per_sample.sum()))
+        return float(np.mean(wrong)), float(np.mean(used))
+
+    fixed_errors, fixed_total = errors()
+    rows = [{"allocation": "fixed", "max_shots": fixed_shots, "errors": fixed_errors,
+             "accuracy": 1 - fixed_errors / n_samples, "total_shots": fixed_total, "saved": 0.0}]
+    for factor in (1, 2, 4):
+        adaptive_errors, adaptive_total = errors(factor * fixed_shots)
+        rows.append({"allocation": "adaptive", "max_shots": factor * fixed_shots, "errors": adaptive_errors,
+                     "accuracy": 1 - adaptive_errors / n_samples, "total_shots": adaptive_total,
+                     "saved": 1 - adaptive_total / fixed_total})
+        if adaptive_errors <= fixed_errors:
+            break
+    for row in rows:
+        row.update(encoding=encoding, samples=n_samples, seeds=seeds)
+        print(f"{encoding:>10} {row['allocation']:>8} max {row['max_shots']:>5} | accuracy {row['accuracy']:.4f} | "
+              f"{row['total_shots']:12,.0f} shots | saved {row['saved']:6.1%}")
+    return rows
+
+
+# Modules that must start without Qiskit, matplotlib, scipy, sklearn or weasyprint.
+STARTUP_MODULES = ("quantum_engine", "voyager_data", "qnn_engine", "results_store",
+                   "batch_runner", "report_engine", "feature_pipeline", "pds_download", "instrumentation",
+                   "sim_jobs")
+HEAVY_MODULES = ("qiskit", "qiskit_aer", "qiskit_machine_learning", "matplotlib",
+                 "scipy", "sklearn", "weasyprint", "pandas")
+
+
+def benchmark_imports(modules=STARTUP_MODULES):
+    """Cold-start import time per module (`python -X importtime`) and the heavy packages it pulls in."""
+    from instrumentation import import_times
+
+    rows = []
+    for module in modules:
+        profile = import_times(module)
+        heavy = sorted(h for h in HEAVY_MODULES if h in profile["modules"])
+        rows.append({"module": module, "seconds": profile["total"], "heavy": heavy})
+        print(f"{module:>16} | {profile['total'] * 1000:8.1f} ms | heavy: {', '.join(heavy) or '-'}")
+    return rows
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    import batch_runner
+
+    parser = argparse.ArgumentParser(prog="quantum_engine", description="Quantum Lab engine tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bench = commands.add_parser("bench", help="Grover/QFT runtime and memory scaling")
+    bench.add_argument("--min-qubits", type=int, default=2)
+    bench.add_argument("--max-qubits", type=int, default=20)
+    bench.add_argument("--algorithms", nargs="+", default=["grover", "qft"], choices=["grover", "qft"])
+    bench.add_argument("--shots", type=int, default=None, help="Sample shots instead of exact probabilities")
+    bench.add_argument("--out", default=None, help="Write the rows as JSON")
+
+    bench_sim = commands.add_parser("bench-sim", help="NumPy batched simulator vs Qiskit/Aer call overhead")
+    bench_sim.add_argument("--qubits", type=int, default=4)
+    bench_sim.add_argument("--batch", type=int, default=1000)
+    bench_sim.add_argument("--reps", type=int, default=2, help="RealAmplitudes layers")
+    bench_sim.add_argument("--out", default=None, help="Write the rows as JSON")
+
+    bench_noise = commands.add_parser("bench-noise", help="Ideal vs gate-noise (density-matrix) scoring throughput")
+    bench_noise.add_argument("--samples", type=int, default=100_000)
+    bench_noise.add_argument("--channel", default="depolarizing", choices=list(NOISE_CHANNELS))
+    bench_noise.add_argument("--strength", type=float, default=0.01)
+    bench_noise.add_argument("--out", default=None, help="Write the rows as JSON")
+
+    bench_shots = commands.add_parser("bench-shots", help="Adaptive vs fixed shot allocation at equal accuracy")
+    bench_shots.add_argument("--samples", type=int, default=2000)
+    bench_shots.add_argument("--encoding", default="ry", choices=list(SHOT_ENCODINGS))
+    bench_shots.add_argument("--shots", type=int, default=2048, help="Fixed shots per sample")
+    bench_shots.add_argument("--seeds", type=int, default=3)
+    bench_shots.add_argument("--out", default=None, help="Write the rows as JSON")
+
+    bench_import = commands.add_parser("bench-import", help="Cold-start import time of the project modules")
+    bench_import.add_argument("modules", nargs="*", default=list(STARTUP_MODULES))
+    bench_import.add_argument("--out", default=None, help="Write the rows as JSON")
+
+    run = commands.add_parser("run", help="Headless batch analyses (scores to files, no plt.show)")
+    run.add_argument("analysis", nargs="?", choices=list(batch_runner.ANALYSES),
+                     help="Required unless --jobs is given (each job names its own analysis)")
+    run.add_argument("--files", nargs="+", default=[batch_runner.DEFAULT_DATA_PATH])
+    run.add_argument("--start", default=None)
+    run.add_argument("--end", default=None)
+    run.add_argument("--windows", nargs="+", default=None, metavar="START,END",
+                     help="Several windows per file (overrides --start/--end)")
+    run.add_argument("--jobs", default=None, help="JSON job list (overrides analysis/files/windows)")
+    run.add_argument("--encoding", default="ry", choices=list(batch_runner.ENCODINGS))
+    run.add_argument("--n-reference", type=int, default=None)
+    run.add_argument("--k", type=int, default=4, help="Window size for 'window'")
+    run.add_argument("--stride", type=int, default=1, help="Window stride for 'window'")
+    run.add_argument("--shots", default=None, type=lambda v: v if v == "adaptive" else int(v),
+                     help="'anomaly': estimate fidelities from N shots per sample, or 'adaptive'")
+    run.add_argument("--workers", type=int, default=None)
+    run.add_argument("--out", default=batch_runner.DEFAULT_OUT_DIR)
+    run.add_argument("--plot", action="store_true", help="Also render PNG figures (Agg)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.jobs:
+            jobs = batch_runner.load_job_list(args.jobs)
+        elif args.analysis is None:
+            run.error("the analysis argument is required without --jobs")
+        else:
+            windows = ([batch_runner.parse_window(w) for w in args.windows] if args.windows
+                       else [(args.start, args.end)])
+            jobs = batch_runner.make_jobs(args.analysis, args.files, windows, encoding=args.encoding,
+                                          n_reference=args.n_reference, k=args.k, stride=args.stride,
+                                          shots=args.shots)
+        records = batch_runner.run_jobs(jobs, args.out, args.workers, args.plot)
+        for record in records:
+            detail = record.get("error") or f"{record['n_samples']} samples, max score {record.get('max_score')}"
+            print(f"{record['name']:>32} | {record['status']:>5} | {record['seconds']:6.2f}s | {detail}")
+        if any(record["status"] != "ok" for record in records):
+            sys.exit(1)
+        return
+    if args.command == "bench":
+        rows = benchmark_circuits(args.min_qubits, args.max_qubits, args.algorithms,
+                                  exact=args.shots is None, shots=args.shots or 2048)
+    elif args.command == "bench-import":
+        rows = benchmark_imports(args.modules)
+    elif args.command == "bench-shots":
+        rows = benchmark_shots(args.samples, args.encoding, args.shots, args.seeds)
+    elif args.command == "bench-noise":
+        rows = benchmark_noise(args.samples, args.channel, args.strength)
+    else:
+        rows = benchmark_simulators(args.qubits, args.batch, args.reps)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Report Engine: in-memory, cached HTML/PDF reports for the signal classifier.
+
+signal_classifier used to save its plot to a temp PNG, read it back, base64 it
+into a large inline HTML string and run WeasyPrint synchronously at the end of
+training. Here:
+
+- figures go straight from matplotlib into a PNG byte buffer,
+- the page and section templates are parsed once at import (string.Template),
+- every rendered section is cached by the hash of its inputs, so sections that
+  do not change between runs (architecture, conclusion, ...) are built once,
+- a report can hold many training runs, one group of sections per run,
+- PDFs are written by a background JobQueue worker (sim_jobs), keyed by the
+  report's content hash: training continues while WeasyPrint runs, and
+  re-submitting identical content neither re-renders nor rewrites the file
+  while it is still there (content keys live under results/reports).
+
+WeasyPrint is imported by the worker, only when a PDF is actually written.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from string import Template
+
+from instrumentation import count, timed
+
+INVESTIGATOR = "Aleyna Nil Uzunoğlu"
+
+# Content keys of written PDFs (one file per target path), outside the source tree.
+KEY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "reports")
+
+_CSS = """
+    @page { size: A4; margin: 20mm; background-color: #fdfbf7; }
+    body { font-family: 'Georgia', serif; color: #2c2c2c; line-height: 1.6; background-color: #fdfbf7; }
+    .header { border-bottom: 2px solid #5d4037; padding-bottom: 10px; margin-bottom: 30px; }
+    h1 { color: #5d4037; font-size: 24pt; margin: 0; }
+    .meta { font-size: 10pt; color: #795548; font-style: italic; }
+    .section { margin-bottom: 25px; padding: 15px; background: white; border-left: 5px solid #8d6e63; box-shadow: 2px 2px 5px rgba(0,0,0,0.05); }
+    h2 { color: #795548; font-size: 16pt; margin-top: 0; border-bottom: 1px solid #eee; }
+    .metric-box { display: inline-block; width: 45%; padding: 10px; text-align: center; border: 1px solid #d7ccc8; margin-right: 10px; }
+    .math { font-family: 'Times New Roman', serif; font-style: italic; font-weight: bold; color: #4e342e; }
+    .plot { width: 100%; margin-top: 20px; border: 1px solid #d7ccc8; }
+    table { width: 100%; border-collapse: collapse; margin-top: 10px; }
+    th, td { border: 1px solid #d7ccc8; padding: 8px; text-align: left; font-size: 10pt; }
+    th { background-color: #efebe9; }
+"""
+
+PAGE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <style>$css</style>
+</head>
+<body>
+    <div class="header">
+        <h1>$title</h1>
+        <div class="meta">Generated on: $generated | Investigator: $investigator</div>
+    </div>
+$sections
+</body>
+</html>
+""")
+
+SECTIONS = {
+    "summary": Template("""
+    <div class="section">
+        <h2>$number. Executive Summary</h2>
+        <p>This report documents the results of $models trained to classify deep-space telemetry signals.
+        The model distinguishes between <b>Natural Stochastic Noise</b> (Voyager 2) and <b>Coherent Artificial Signals</b> using Hilbert Space mapping.</p>
+    </div>"""),
+    "architecture": Template("""
+    <div class="section">
+        <h2>$number. Model Architecture</h2>
+        <ul>
+            <li><b>Model:</b> $model</li>
+            <li><b>Encoding:</b> <span class="math">ZZFeatureMap</span> (4 Qubits)</li>$details
+            <li><b>Optimization:</b> $optimization</li>
+        </ul>
+    </div>"""),
+    "metrics": Template("""
+    <div class="section">
+        <h2>$number. Performance Metrics$run_label</h2>
+        <div class="metric-box">
+            <div style="font-size: 9pt;">Training Accuracy</div>
+            <div style="font-size: 18pt; font-weight: bold;">$train_acc%</div>
+        </div>
+        <div class="metric-box">
+            <div style="font-size: 9pt;">Test Accuracy</div>
+            <div style="font-size: 18pt; font-weight: bold; color: #bf360c;">$test_acc%</div>
+        </div>
+        <p style="font-size: 9pt;">$results</p>
+    </div>"""),
+    "figure": Template("""
+    <div class="section">
+        <h2>$number. Training Visualizations$run_label</h2>
+        <img src="data:image/png;base64,$png_base64" class="plot">
+    </div>"""),
+    "conclusion": Template("""
+    <div class="section">
+        <h2>$number. Analysis &amp; Conclusion</h2>$paragraphs
+    </div>"""),
+}
+
+# Per-model name and conclusion paragraph; a run's 'model' is one of these keys.
+MODELS = {
+    "qnn": {
+        "name": "Quantum Neural Network (QNN)",
+        "conclusion": """
+        <p>The convergence of the loss function indicates that the <span class="math">SamplerQNN</span> successfully identified non-linear
+        periodicities in the Hilbert space. The variance in predictions likely stems from Gaussian noise injected into the artificial signal.
+        Further research will focus on entanglement-driven feature maps.</p>""",
+    },
+    "kernel": {
+        "name": "Fidelity-Kernel Support Vector Machine",
+        "conclusion": """
+        <p>The support vector machine separates the classes using only the state overlaps
+        <span class="math">K(x, x') = |&lang;&phi;(x)|&phi;(x')&rang;|&sup2;</span> of the feature map; there is no trained circuit and no loss curve.
+        The block structure of the training kernel shows how well the encoding alone distinguishes natural noise from the coherent signal.
+        Further research will focus on entanglement-driven feature maps.</p>""",
+    },
+}
+
+_section_cache = {}
+_SECTION_CACHE_SIZE = 256
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def figure_png(fig, dpi=100, bbox_inches=None):
+    """Renders a matplotlib figure to PNG bytes (no temp file) and closes it."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches=bbox_inches)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def section(kind, **fields):
+    """HTML of one section; identical (kind, fields) are rendered once."""
+    key = content_hash(kind, {k: v for k, v in fields.items() if k != "png"}, fields.get("png", b""))
+    html = _section_cache.get(key)
+    if html is None:
+        if "png" in fields:
+            fields["png_base64"] = base64.b64encode(fields.pop("png")).decode("ascii")
+        html = SECTIONS[kind].substitute(fields)
+        if len(_section_cache) >= _SECTION_CACHE_SIZE:
+            _section_cache.pop(next(iter(_section_cache)))
+        _section_cache[key] = html
+        count("report.sections_rendered")
+    else:
+        count("report.sections_cached")
+    return html
+
+
+def run_sections(runs):
+    """
+    Section list for one or more training runs. Each run is a dict with
+    'train_acc', 'test_acc', 'model' (a MODELS key), 'optimization' (setup),
+    'png' and optionally 'ansatz', 'loss' (variational models only),
+    'results' and 'label'. Runs with the same model setup share one
+    architecture section.
+    """
+    models = dict.fromkeys(run["model"] for run in runs)
+    parts = [("summary", {"models": " and ".join(f"a {MODELS[model]['name']}" for model in models)})]
+    setups = dict.fromkeys((run["model"], run.get("ansatz"), run.get("loss"), run["optimization"]) for run in runs)
+    for model, ansatz, loss, optimization in setups:
+        details = "".join(f"\n            <li><b>{name}:</b> {value}</li>"
+                          for name, value in (("Variational Layer", ansatz), ("Loss Function", loss)) if value)
+        parts.append(("architecture", {"model": MODELS[model]["name"], "details": details,
+                                       "optimization": optimization}))
+    for run in runs:
+        label = f" ({run['label']})" if run.get("label") and len(runs) > 1 else ""
+        parts.append(("metrics", {"train_acc": f"{run['train_acc']:.2f}", "test_acc": f"{run['test_acc']:.2f}",
+                                  "results": run.get("results", ""), "run_label": label}))
+        parts.append(("figure", {"png": run["png"], "run_label": label}))
+    parts.append(("conclusion", {"paragraphs": "".join(MODELS[model]["conclusion"] for model in models)}))
+    return [section(kind, number=i, **fields) for i, (kind, fields) in enumerate(parts, start=1)]
+
+
+def render_report(sections, title="Quantum Signal Analysis Report", investigator=INVESTIGATOR):
+    """(html, content key) for a list of section HTML strings; the key ignores the timestamp."""
+    body = "".join(sections)
+    html = PAGE.substitute(css=_CSS, title=title, investigator=investigator, sections=body,
+                           generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    return html, content_hash(title, investigator, body)
+
+
+@timed("report.pdf")
+def _key_path(path):
+    name = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(KEY_DIR, f"{name}.key")
+
+
+def write_pdf(html, path, key=None):
+    """
+    Writes the PDF unless `path` exists and holds the report with this
+    content key (stored under KEY_DIR). Returns the path.
+    """
+    key_path = _key_path(path)
+    if key is not None and os.path.exists(path) and os.path.exists(key_path):
+        with open(key_path) as f:
+            if f.read() == key:
+                count("report.pdf_cached")
+                return path
+
+    from weasyprint import HTML
+
+    tmp_path = os.fspath(path) + ".tmp"
+    HTML(string=html).write_pdf(tmp_path)
+    os.replace(tmp_path, path)
+    if key is not None:
+        os.makedirs(KEY_DIR, exist_ok=True)
+        with open(key_path, "w") as f:
+            f.write(key)
+    count("report.pdf_written")
+    return path
+
+
+def report_queue():
+    """Shared single-worker JobQueue for PDF rendering (created on first use)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            from sim_jobs import JobQueue
+
+            _queue = JobQueue(max_workers=1)
+        return _queue
+
+
+def submit_report(runs, path, title="Quantum Signal Analysis Report"):
+    """
+    Renders the HTML now (cheap, cached sections) and queues the PDF write.
+    Returns the job id; wait with report_queue().result(job_id). A finished
+    job is only reused while its PDF is still on disk.
+    """
+    html, key = render_report(run_sections(runs), title)
+    queue = report_queue()
+    job_key = (os.path.abspath(path), key)
+    if not os.path.exists(path):
+        queue.forget(job_key)
+    return queue.submit(job_key, write_pdf, html, path, key)
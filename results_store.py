@@ -0,0 +1,164 @@
+"""
+Results Store: persistent, memory-mapped anomaly scores and intermediate states.
+
+Each analysis result lives in its own directory under the store root,
+
+    <root>/<encoding>/<dataset id[:16]>-<params hash[:16]>/
+        scores.npy     float64 (N,)
+        states.npy     optional, e.g. (N, 2**n) statevector amplitudes
+        meta.json      dataset, encoding, params, shapes, user metadata
+
+keyed by the dataset (a file's SHA-256 or the hash of an array), the encoding
+name and a hash of the parameters. Reads are `np.load(mmap_mode='r')`, so a
+downstream tool can slice a long score series without loading or recomputing
+it. Like the voyager_data cache, meta.json is written last: an entry without
+it is incomplete and treated as missing. Entries are written to a temporary
+directory and renamed into place, so concurrent writers (e.g. benchmark
+workers) never expose half-written arrays.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from instrumentation import count
+
+META_FILE = "meta.json"
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "store")
+
+
+def params_hash(params):
+    """Stable hash of a JSON-serializable parameter dict (key order does not matter)."""
+    blob = json.dumps(params or {}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def dataset_id(*sources):
+    """
+    Identity of the analysed data: TAB file paths hash to their content
+    SHA-256 (from the voyager_data cache metadata), arrays to the SHA-256 of
+    their bytes, dtype and shape.
+    """
+    digest = hashlib.sha256()
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            from voyager_data import ensure_cache
+
+            digest.update(ensure_cache(source)['sha256'].encode())
+        else:
+            array = np.ascontiguousarray(source)
+            digest.update(f"{array.dtype.str}{array.shape}".encode())
+            digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """Directory of result entries keyed by (dataset id, encoding, params)."""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = os.fspath(root)
+
+    def path(self, dataset, encoding, params=None):
+        return os.path.join(self.root, encoding, f"{dataset[:16]}-{params_hash(params)[:16]}")
+
+    def metadata(self, dataset, encoding, params=None):
+        try:
+            with open(os.path.join(self.path(dataset, encoding, params), META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def has(self, dataset, encoding, params=None):
+        return self.metadata(dataset, encoding, params) is not None
+
+    def save(self, dataset, encoding, params, scores, states=None, metadata=None):
+        """Writes (or replaces) one entry and returns its directory."""
+        entry = self.path(dataset, encoding, params)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(entry))
+        try:
+            scores = np.asarray(scores, dtype=np.float64)
+            np.save(os.path.join(tmp_dir, "scores.npy"), scores)
+            if states is not None:
+                states = np.asarray(states)
+                np.save(os.path.join(tmp_dir, "states.npy"), states)
+            meta = {
+                'dataset': dataset,
+                'encoding': encoding,
+                'params': params or {},
+                'params_hash': params_hash(params),
+                'n_samples': len(scores),
+                'states_shape': None if states is None else list(states.shape),
+                'created': time.time(),
+                'metadata': metadata or {},
+            }
+            with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+                json.dump(meta, f, default=str)
+            if os.path.exists(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp_dir, entry)
+            except OSError:
+                if not os.path.exists(os.path.join(entry, META_FILE)):
+                    raise
+                # A concurrent writer stored the same key first; keep theirs.
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        count("results_saved")
+        return entry
+
+    def load(self, dataset, encoding, params=None, mmap=True):
+        """
+        {'scores', 'states' (None if not stored), 'meta'} for an entry, or
+        None if it is missing. Arrays are read-only memory maps unless mmap=False.
+        """
+        meta = self.metadata(dataset, encoding, params)
+        if meta is None:
+            return None
+        entry = self.path(dataset, encoding, params)
+        mmap_mode = 'r' if mmap else None
+        states_path = os.path.join(entry, "states.npy")
+        count("results_loaded")
+        return {
+            'scores': np.load(os.path.join(entry, "scores.npy"), mmap_mode=mmap_mode),
+            'states': np.load(states_path, mmap_mode=mmap_mode) if os.path.exists(states_path) else None,
+            'meta': meta,
+        }
+
+    def get_or_compute(self, dataset, encoding, params, compute, metadata=None):
+        """
+        Stored scores for the key, computing and saving them first if needed.
+        `compute()` returns scores or (scores, states).
+        """
+        cached = self.load(dataset, encoding, params)
+        if cached is not None:
+            return cached
+        result = compute()
+        scores, states = result if isinstance(result, tuple) else (result, None)
+        self.save(dataset, encoding, params, scores, states, metadata)
+        return self.load(dataset, encoding, params)
+
+    def entries(self, encoding=None):
+        """Metadata of every complete entry (optionally of one encoding)."""
+        if encoding is not None:
+            encodings = [encoding]
+        else:
+            encodings = sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []
+        found = []
+        for enc in encodings:
+            enc_dir = os.path.join(self.root, enc)
+            if not os.path.isdir(enc_dir):
+                continue
+            for name in sorted(os.listdir(enc_dir)):
+                try:
+                    with open(os.path.join(enc_dir, name, META_FILE)) as f:
+                        found.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return found
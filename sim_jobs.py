@@ -0,0 +1,170 @@
+"""
+Sim Jobs: background execution service for simulations launched from the app.
+
+Streamlit runs each session's script on its own thread, so a synchronous
+`backend.run(...).result()` inside a button handler freezes that session and
+competes with everyone else's. Sessions instead submit work to one shared
+JobQueue and poll it:
+
+- a bounded thread pool caps how many simulations run at once
+  (Aer releases the GIL while simulating),
+- identical requests (same key) that are queued, running or recently
+  finished share one job,
+- every job has a status, and queued jobs can be cancelled; a running job
+  cannot be interrupted, so cancelling it only discards its result.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class Job:
+    __slots__ = ("id", "key", "state", "result", "error", "submitted_at",
+                 "started_at", "finished_at", "future")
+
+    def __init__(self, job_id, key):
+        self.id = job_id
+        self.key = key
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    def status(self):
+        return {
+            "id": self.id,
+            "key": self.key,
+            "state": self.state,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """Shared job table in front of a ThreadPoolExecutor with `max_workers` slots."""
+
+    def __init__(self, max_workers=2, max_finished=256):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sim-job")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._by_key = {}
+        self._finished = OrderedDict()  # LRU of finished job ids
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        Schedules fn(*args, **kwargs) and returns its job id. If a job with the
+        same key is queued, running or finished (and still retained), that
+        job's id is returned instead.
+        """
+        with self._lock:
+            existing = self._jobs.get(self._by_key.get(key))
+            if existing is not None and existing.state in (QUEUED, RUNNING, DONE):
+                if existing.id in self._finished:
+                    self._finished.move_to_end(existing.id)
+                return existing.id
+
+            job = Job(next(self._ids), key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job.id
+            job.future = self._pool.submit(self._run, job, fn, args, kwargs)
+            return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            if job.state == CANCELLED:
+                job.finished_at = time.time()
+                self._retire(job)
+                return
+            job.state = RUNNING
+            job.started_at = time.time()
+        try:
+            result, error = fn(*args, **kwargs), None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        with self._lock:
+            job.finished_at = time.time()
+            if job.state != CANCELLED:
+                job.result, job.error = result, error
+                job.state = DONE if error is None else FAILED
+            self._retire(job)
+
+    def _retire(self, job):
+        self._finished[job.id] = None
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            old = self._jobs.pop(old_id, None)
+            if old is not None and self._by_key.get(old.key) == old_id:
+                del self._by_key[old.key]
+
+    def forget(self, key):
+        """Stops a finished job being shared, so the next submit() with `key` runs again."""
+        with self._lock:
+            job = self._jobs.get(self._by_key.get(key))
+            if job is not None and job.state not in ACTIVE_STATES:
+                del self._by_key[key]
+
+    def cancel(self, job_id):
+        """Cancels a queued or running job; returns False if it already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in ACTIVE_STATES:
+                return False
+            was_queued = job.state == QUEUED
+            job.state = CANCELLED
+            if self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+            if was_queued and job.future.cancel():
+                job.finished_at = time.time()
+                self._retire(job)
+            return True
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.status()
+
+    def result(self, job_id, timeout=None):
+        """
+        Blocks until the job finishes and returns its result (None if it failed
+        or was cancelled). Raises KeyError for an id that was never issued or
+        whose finished job has been evicted (see `max_finished`).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown or evicted job: {job_id!r}")
+        if job.state in ACTIVE_STATES:
+            try:
+                job.future.result(timeout=timeout)
+            except CancelledError:
+                pass
+        return job.result
+
+    def jobs(self):
+        with self._lock:
+            return [job.status() for job in self._jobs.values()]
+
+    def active_count(self):
+        with self._lock:
+            return sum(job.state in ACTIVE_STATES for job in self._jobs.values())
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
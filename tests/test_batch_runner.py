@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_runner import load_job_list, make_jobs, parse_window, run_jobs
+from quantum_engine import anomaly_scores, entangled3_anomaly_scores, main
+from tests.test_voyager_data import write_tab
+
+
+def test_jobs_cover_files_and_windows_in_parallel(tmp_path):
+    paths = [str(write_tab(tmp_path / 'a.TAB', n_rows=400)), str(write_tab(tmp_path / 'b.TAB', n_rows=400, seed=1))]
+    windows = [('1979-07-08 00:00', '1979-07-08 02:00'), ('1979-07-08 02:00', None)]
+    jobs = make_jobs('anomaly', paths, windows, encoding='entangled3')
+
+    records = run_jobs(jobs, tmp_path / 'out', workers=2, plot=True)
+
+    assert [r['status'] for r in records] == ['ok'] * 4
+    assert len({r['name'] for r in records}) == 4
+    with open(tmp_path / 'out' / 'summary.json') as f:
+        assert json.load(f) == json.loads(json.dumps(records))
+    out = pd.read_csv(tmp_path / 'out' / f"{records[0]['name']}.csv")
+    expected = entangled3_anomaly_scores(out[['Bx', 'By', 'Bz']].values, n_reference=20)
+    np.testing.assert_allclose(out['score'].values, expected)
+    assert (tmp_path / 'out' / f"{records[0]['name']}.png").exists()
+
+
+def test_cli_run_from_job_list(tmp_path, capsys):
+    path = str(write_tab(tmp_path / 'a.TAB', n_rows=300))
+    job_list = tmp_path / 'jobs.json'
+    job_list.write_text(json.dumps([
+        {'analysis': 'anomaly', 'path': path, 'name': 'ry'},
+        {'analysis': 'window', 'path': path, 'k': 6, 'stride': 2, 'name': 'win'},
+        {'analysis': 'signal', 'path': path, 'start': '1979-07-08 01:00', 'name': 'sig'},
+    ]))
+    assert len(load_job_list(job_list)) == 3
+
+    main(['run', '--jobs', str(job_list), '--out', str(tmp_path / 'out')])
+
+    ry = pd.read_csv(tmp_path / 'out' / 'ry.csv')
+    np.testing.assert_allclose(ry['score'].values, anomaly_scores(ry['B_Mag'].values))
+    win = pd.read_csv(tmp_path / 'out' / 'win.csv')
+    assert win['score'].notna().sum() == ((300 - 6) // 2 + 1) * 2
+    assert 'score' not in pd.read_csv(tmp_path / 'out' / 'sig.csv')
+    assert not list(tmp_path.glob('out/*.png'))
+    assert capsys.readouterr().out.count(' ok ') == 3
+
+
+def test_parse_window():
+    assert parse_window('1979-07-08 12:00,1979-07-10') == ('1979-07-08 12:00', '1979-07-10')
+    assert parse_window(',1979-07-10') == (None, '1979-07-10')
+
+
+def test_cli_shot_based_anomaly_scores(tmp_path):
+    path = str(write_tab(tmp_path / 'a.TAB', n_rows=120))
+    main(['run', 'anomaly', '--files', path, '--shots', 'adaptive', '--out', str(tmp_path / 'out')])
+
+    with open(tmp_path / 'out' / 'summary.json') as f:
+        record = json.load(f)[0]
+    out = pd.read_csv(tmp_path / 'out' / f"{record['name']}.csv")
+    assert record['total_shots'] == out['shots'].sum()
+    assert out['shots'].min() >= 64
+    exact = anomaly_scores(out['B_Mag'].values)
+    assert np.mean((out['score'].values > 0.1) == (exact > 0.1)) > 0.9
+
+
+def test_cli_run_needs_analysis_without_job_list(capsys):
+    with pytest.raises(SystemExit):
+        main(['run', '--files', 'missing.TAB'])
+    assert 'analysis argument is required' in capsys.readouterr().err
+
@@ -0,0 +1,93 @@
+import importlib.util
+import json
+import os
+import sys
+
+import numpy as np
+
+BENCHMARK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'case1_voyager_telemetry_analysis', '5_benchmark._study.py')
+
+
+def load_benchmark():
+    spec = importlib.util.spec_from_file_location('benchmark_study', BENCHMARK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # worker processes unpickle run_task by module name
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_roc_auc_separates_shock():
+    bench = load_benchmark()
+    labels = np.array([0, 0, 0, 1, 1], dtype=bool)
+
+    assert bench.roc_auc(labels, np.array([0.1, 0.2, 0.3, 0.8, 0.9])) == 1.0
+    assert bench.roc_auc(labels, np.array([0.5] * 5)) == 0.5
+
+
+def test_sweep_is_reproducible_across_workers(tmp_path):
+    bench = load_benchmark()
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(0, 1, (120, 3))
+    b_mag = rng.normal(5, 1, 120)
+    labels = np.zeros(120, dtype=bool)
+    labels[80:100] = True
+    b_mag[labels] += 20
+    vectors[labels] += 10
+
+    serial = bench.run_sweep(b_mag, vectors, labels, [0, 2], n_seeds=2, workers=1, out_dir=tmp_path / 'a')
+    parallel = bench.run_sweep(b_mag, vectors, labels, [0, 2], n_seeds=2, workers=2, out_dir=tmp_path / 'b')
+
+    assert len(serial) == 2 * 2 * 3
+    assert [r['auc'] for r in serial] == [r['auc'] for r in parallel]
+    assert all(r['auc'] > 0.9 for r in serial if r['noise'] == 0)
+    with open(tmp_path / 'a' / 'benchmark_results.json') as f:
+        assert len(json.load(f)['results']) == len(serial)
+
+    windows = [('1979-07-09 00:00', '1979-07-09 06:00')]
+    bench.run_sweep(b_mag, vectors, labels, [0], n_seeds=1, workers=1, out_dir=tmp_path / 'c', shock_windows=windows)
+    with open(tmp_path / 'c' / 'benchmark_results.json') as f:
+        assert json.load(f)['shock_windows'] == [list(w) for w in windows]
+    assert 'quantum_noise0_seed0_fpr' in np.load(tmp_path / 'a' / 'benchmark_scores.npz')
+
+
+def test_sweep_reuses_stored_scores(tmp_path):
+    bench = load_benchmark()
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(0, 1, (60, 3))
+    b_mag = rng.normal(5, 1, 60)
+    labels = np.zeros(60, dtype=bool)
+    labels[40:50] = True
+
+    store = tmp_path / 'store'
+    first = bench.run_sweep(b_mag, vectors, labels, [1], n_seeds=2, workers=1,
+                            out_dir=tmp_path / 'a', store_root=store)
+    second = bench.run_sweep(b_mag, vectors, labels, [1], n_seeds=2, workers=2,
+                             out_dir=tmp_path / 'b', store_root=store)
+
+    assert not any(r['cached'] for r in first)
+    assert all(r['cached'] for r in second)
+    assert [r['auc'] for r in first] == [r['auc'] for r in second]
+    # Cached entries are not re-timed: the stored time is kept apart from this run's speed.
+    assert all(r['wall_time'] is None and r['samples_per_sec'] is None for r in second)
+    assert [r['wall_time'] for r in first] == [r['stored_wall_time'] for r in second]
+
+
+def test_sweep_runs_gate_noise_variants(tmp_path):
+    bench = load_benchmark()
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(0, 1, (80, 3))
+    b_mag = rng.normal(5, 1, 80)
+    labels = np.zeros(80, dtype=bool)
+    labels[50:60] = True
+    b_mag[labels] += 20
+    vectors[labels] += 10
+
+    records = bench.run_sweep(b_mag, vectors, labels, [0], n_seeds=1, workers=1, out_dir=tmp_path,
+                              variants=('quantum', 'quantum-dm', 'entangled3-dm'),
+                              gate_noise=('amplitude_damping', 0.05))
+    by_variant = {r['variant']: r for r in records}
+    assert by_variant['quantum']['gate_noise'] is None
+    assert by_variant['entangled3-dm']['gate_noise'] == ['amplitude_damping', 0.05]
+    assert all(r['samples_per_sec'] > 0 for r in records)
+    assert all(r['auc'] > 0.9 for r in records)
@@ -1,7 +1,13 @@
+import numpy as np
 import pytest
 from qiskit import QuantumCircuit
+from qiskit.circuit.library import QFT
+from qiskit.quantum_info import Operator
 from qiskit_aer import AerSimulator
 
+from quantum_engine import (exact_probabilities, grover_circuit, grover_iterations,
+                            qft_circuit, sample_counts)
+
 
 def test_hadamard_logic():
     qc = QuantumCircuit(1)
@@ -18,13 +24,7 @@ def test_hadamard_logic():
 
 
 def test_grover_oracle():
-    qc = QuantumCircuit(2)
-    qc.h(range(2))
-    qc.cz(0, 1)
-    qc.h(range(2))
-    qc.z(range(2))
-    qc.cz(0, 1)
-    qc.h(range(2))
+    qc = grover_circuit(2, '11')
     qc.measure_all()
 
     backend = AerSimulator()
@@ -32,4 +32,38 @@ def test_grover_oracle():
     counts = result.get_counts()
 
     max_state = max(counts, key=counts.get)
-    assert max_state == '11'
\ No newline at end of file
+    assert max_state == '11'
+
+
+@pytest.mark.parametrize("n, marked", [(3, '101'), (5, '01100'), (8, '11111111')])
+def test_grover_amplifies_marked_state(n, marked):
+    probs = exact_probabilities(grover_circuit(n, marked))
+
+    assert probs.shape == (2 ** n,)
+    assert np.argmax(probs) == int(marked, 2)
+    assert probs[int(marked, 2)] > 0.9
+    assert grover_iterations(n) == round(np.pi / (4 * np.arcsin(2 ** (-n / 2))) - 0.5)
+
+
+def test_grover_multiple_marked_states():
+    probs = exact_probabilities(grover_circuit(4, ['0011', '1100']))
+    assert probs[0b0011] + probs[0b1100] > 0.9
+
+
+def test_grover_duplicate_marked_states_are_merged():
+    probs = exact_probabilities(grover_circuit(3, ['101', '101', 5]))
+    np.testing.assert_allclose(probs, exact_probabilities(grover_circuit(3, '101')), atol=1e-12)
+    assert probs[0b101] > 0.9
+
+
+def test_grover_sampled_counts_match_exact():
+    qc = grover_circuit(4, '1010')
+    counts = sample_counts(qc, shots=4000, seed=7)
+    assert max(counts, key=counts.get) == '1010'
+    assert counts['1010'] / 4000 == pytest.approx(exact_probabilities(qc)[0b1010], abs=0.03)
+
+
+@pytest.mark.parametrize("n", [2, 3, 5])
+def test_qft_matches_library(n):
+    assert Operator(qft_circuit(n)).equiv(Operator(QFT(n)))
+    assert Operator(qft_circuit(n, inverse=True)).equiv(Operator(QFT(n, inverse=True)))
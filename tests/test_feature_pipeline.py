@@ -0,0 +1,62 @@
+import numpy as np
+
+from feature_pipeline import build_dataset, dataset_chunks, load_series, split_scaled, windows
+from tests.test_voyager_data import write_tab
+
+
+def test_windows_are_a_view_of_the_series():
+    series = np.arange(20.0)
+    view = windows(series, 4)
+    assert np.shares_memory(view, series)
+    np.testing.assert_array_equal(view, series.reshape(-1, 4))
+    np.testing.assert_array_equal(windows(series, 4, stride=1)[3], [3, 4, 5, 6])
+
+
+def test_build_dataset_drops_gaps_and_balances_classes():
+    series = np.random.default_rng(0).normal(10, 2, 400)
+    series[[10, 201]] = np.nan
+    X, y = build_dataset(series, stride=2, seed=1)
+
+    natural = windows(series, 4, stride=2)
+    expected = natural[~np.isnan(natural).any(axis=1)]
+    n = len(expected)
+    assert len(X) == 2 * n and (y[:n] == 0).all() and (y[n:] == 1).all()
+    np.testing.assert_array_equal(X[:n], expected)
+    assert np.isfinite(X).all()
+    # Artificial class: 5 sin(t) + 10 + N(0, 0.5) at the same positions.
+    positions = np.flatnonzero(~np.isnan(natural).any(axis=1)) * 2
+    t = (positions[:, None] + np.arange(4)) * 20 / 399
+    assert np.abs(X[n:] - (5 * np.sin(t) + 10)).std() < 0.6
+
+
+def test_chunked_build_matches_single_pass():
+    series = np.random.default_rng(2).normal(10, 2, 10_001)
+    series[::997] = np.nan
+    X, y = build_dataset(series, stride=3, chunk=100, seed=7)
+    X_ref, y_ref = build_dataset(series, stride=3, chunk=1 << 20, seed=7)
+    np.testing.assert_array_equal(X, X_ref)
+    np.testing.assert_array_equal(y, y_ref)
+    assert max(len(nat) for nat, _ in dataset_chunks(series, stride=3, chunk=100)) <= 100
+
+
+def test_scaler_is_fitted_on_training_split_only():
+    X, y = build_dataset(np.random.default_rng(3).normal(10, 2, 2000), seed=0)
+    X_train, X_test, y_train, y_test = split_scaled(X, y, test_size=0.3, random_state=42)
+    np.testing.assert_allclose(X_train.min(axis=0), 0, atol=1e-12)
+    np.testing.assert_allclose(X_train.max(axis=0), 1, atol=1e-12)
+    assert len(X_test) == len(y_test) == round(0.3 * len(X))
+
+    from sklearn.model_selection import train_test_split
+
+    raw_train, raw_test, _, _ = train_test_split(X, y, test_size=0.3, random_state=42)
+    lo, hi = raw_train.min(axis=0), raw_train.max(axis=0)
+    np.testing.assert_allclose(X_test, (raw_test - lo) / (hi - lo))
+
+
+def test_load_series_by_rows_and_time(tmp_path):
+    path = write_tab(tmp_path / 'S3_48S.TAB', n_rows=300)
+    rows = load_series(path, 50, 150)
+    assert isinstance(rows, np.memmap) and len(rows) == 100
+    # 48 s cadence: rows 75..149 fall in [01:00:00, 01:59:12].
+    by_time = load_series(path, '1979-07-08 01:00', '1979-07-08 01:59:12')
+    np.testing.assert_array_equal(by_time, load_series(path, 75, 150))
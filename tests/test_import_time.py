@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from instrumentation import import_times
+from quantum_engine import HEAVY_MODULES, STARTUP_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall-clock time depends on the machine, so it is only reported (pytest -s);
+# which heavy modules get imported is the deterministic check.
+
+
+def heavy_imports(profile):
+    return sorted(h for h in HEAVY_MODULES if h in profile["modules"])
+
+
+@pytest.mark.parametrize("module", STARTUP_MODULES)
+def test_project_modules_start_without_heavy_backends(module):
+    profile = import_times(module, cwd=ROOT)
+
+    assert module in profile["modules"]
+    assert heavy_imports(profile) == []
+    print(f"{module}: {profile['total']:.3f} s")
+
+
+@pytest.mark.parametrize("script", [
+    ["quantum_engine.py", "--help"],
+    ["case1_voyager_telemetry_analysis/5_benchmark._study.py", "--help"],
+    ["case1_voyager_telemetry_analysis/quantum_bridge.py", "--help"],
+    ["case3_signal_classifier/signal_classifier.py", "--help"],
+])
+def test_cli_help_does_not_load_qiskit(script):
+    profile = import_times(script, cwd=ROOT)
+
+    assert heavy_imports(profile) == []
+    print(f"{' '.join(script)}: {profile['total']:.3f} s")
+
+
+def test_qiskit_is_loaded_on_first_simulated_path():
+    profile = import_times(["-c", "import numpy as np, quantum_engine as q; "
+                                  "q.fidelity_scores(np.arange(5.0), 1.0, 0.0, 4.0, encoding=q.ry_circuit)"], cwd=ROOT)
+    assert "qiskit" in profile["modules"]
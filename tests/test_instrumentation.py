@@ -0,0 +1,39 @@
+import json
+
+import numpy as np
+
+import instrumentation
+from quantum_engine import fidelity_scores, ry_circuit
+
+
+def test_disabled_instrumentation_records_nothing():
+    instrumentation.disable()
+    instrumentation.reset()
+
+    with instrumentation.timer("load", samples=10):
+        pass
+    instrumentation.count("circuits_built")
+    fidelity_scores(np.arange(5.0), 1.0, 0.0, 4.0)
+
+    profile = instrumentation.profile()
+    assert profile["stages"] == {} and profile["counters"] == {}
+
+
+def test_profile_tracks_stages_and_counters(tmp_path):
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        data = np.linspace(0, 10, 50)
+        fidelity_scores(data, 1.0, 0.0, 10.0)
+        fidelity_scores(data[:8], 1.0, 0.0, 10.0, encoding=ry_circuit)
+        path = instrumentation.dump(tmp_path / "profile.json")
+    finally:
+        instrumentation.disable()
+
+    with open(path) as f:
+        profile = json.load(f)
+    assert profile["stages"]["score"]["calls"] == 2
+    assert profile["stages"]["score"]["samples"] == 58
+    assert profile["stages"]["simulate"]["samples"] == 8
+    assert profile["counters"]["circuits_built"] == 9
+    assert profile["counters"]["statevector_evaluations"] == 9
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pds_download import ChecksumError, download, download_all, parse_label_md5
+from tests.test_voyager_data import write_tab
+
+
+class RangeHandler(SimpleHTTPRequestHandler):
+    """Static files with single-range support; `drop_after` cuts a full response short once."""
+
+    server_version = "PDSStandIn"
+    honor_range = True
+    drop_after = {}  # file name -> bytes sent before the connection is dropped (once)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return self.send_error(404)
+        with open(path, 'rb') as f:
+            data = f.read()
+        start = 0
+        header = self.headers.get('Range')
+        if header and self.honor_range:
+            start = int(header.split('=')[1].split('-')[0])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        cut = self.drop_after.pop(os.path.basename(path), None)
+        self.wfile.write(body if cut is None else body[:cut])
+        if cut is not None:
+            self.close_connection = True
+
+
+@pytest.fixture
+def pds_server(tmp_path):
+    root = tmp_path / 'server'
+    root.mkdir()
+    handler = type('Handler', (RangeHandler,), {'drop_after': {}})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield root, f"http://127.0.0.1:{server.server_port}", handler
+    server.shutdown()
+    server.server_close()
+
+
+def add_product(root, name, n_rows=400, label=True, seed=0):
+    path = write_tab(root / name, n_rows=n_rows, seed=seed)
+    md5 = hashlib.md5(path.read_bytes()).hexdigest()
+    if label:
+        (root / (name.rsplit('.', 1)[0] + '.LBL')).write_text(
+            f'PDS_VERSION_ID = PDS3\nFILE_NAME = "{name}"\nMD5_CHECKSUM = "{md5}"\nEND\n')
+    return path.read_bytes(), md5
+
+
+def test_parse_label_md5():
+    md5 = 'd41d8cd98f00b204e9800998ecf8427e'
+    assert parse_label_md5(f'OBJECT = FILE\n  MD5_CHECKSUM = "{md5.upper()}"\nEND') == md5
+    assert parse_label_md5(f'<File><md5_checksum>{md5}</md5_checksum></File>') == md5
+    assert parse_label_md5('PDS_VERSION_ID = PDS3\nEND') is None
+
+
+def test_parallel_download_verifies_label_checksums(pds_server, tmp_path):
+    root, base, _ = pds_server
+    products = {f'P{i}.TAB': add_product(root, f'P{i}.TAB', seed=i) for i in range(4)}
+    add_product(root, 'NOLABEL.TAB', label=False)
+
+    records = download_all([f"{base}/{name}" for name in [*products, 'NOLABEL.TAB', 'MISSING.TAB']],
+                           tmp_path / 'out', workers=3, chunk_size=1000)
+
+    assert [r['status'] for r in records] == ['ok'] * 5 + ['error']
+    assert all(r['verified'] for r in records[:4]) and not records[4]['verified']
+    for name, (data, md5) in products.items():
+        assert (tmp_path / 'out' / name).read_bytes() == data
+    assert not list((tmp_path / 'out').glob('*.part'))
+
+    again = download_all([f"{base}/P0.TAB"], tmp_path / 'out')
+    assert again[0]['status'] == 'cached' and again[0]['bytes'] == 0
+
+
+def test_interrupted_download_resumes_with_range(pds_server, tmp_path):
+    root, base, handler = pds_server
+    data, md5 = add_product(root, 'S3_48S.TAB', n_rows=2000)
+    handler.drop_after['S3_48S.TAB'] = 10_000
+
+    record = download(f"{base}/S3_48S.TAB", tmp_path / 'S3_48S.TAB', chunk_size=4096)
+
+    assert record['status'] == 'ok' and record['verified'] and record['md5'] == md5
+    assert (tmp_path / 'S3_48S.TAB').read_bytes() == data
+    assert record['bytes'] == len(data)  # the second request only fetched the rest
+
+
+def test_existing_part_is_resumed_or_restarted(pds_server, tmp_path):
+    root, base, handler = pds_server
+    data, _ = add_product(root, 'A.TAB')
+    (tmp_path / 'A.TAB.part').write_bytes(data[:5000])
+    record = download(f"{base}/A.TAB", tmp_path / 'A.TAB')
+    assert record['bytes'] == len(data) - 5000
+    assert (tmp_path / 'A.TAB').read_bytes() == data
+
+    # A server without Range support resends everything; the part is rewritten.
+    handler.honor_range = False
+    (tmp_path / 'B.TAB.part').write_bytes(data[:5000])
+    record = download(f"{base}/A.TAB", tmp_path / 'B.TAB')
+    assert record['bytes'] == len(data)
+    assert (tmp_path / 'B.TAB').read_bytes() == data
+
+
+def test_checksum_mismatch_never_replaces_target(pds_server, tmp_path):
+    root, base, _ = pds_server
+    add_product(root, 'A.TAB')
+    with pytest.raises(ChecksumError):
+        download(f"{base}/A.TAB", tmp_path / 'A.TAB', md5='0' * 32, retries=1)
+    assert not (tmp_path / 'A.TAB').exists()
+    assert not (tmp_path / 'A.TAB.part').exists()
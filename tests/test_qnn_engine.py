@@ -0,0 +1,138 @@
+import numpy as np
+from qiskit.circuit.library import RealAmplitudes, ZZFeatureMap
+
+import instrumentation
+from qnn_engine import FidelityKernel, StatevectorQNN, fit, fit_kernel_svm, parity, qnn_forward, sampler_qnn
+
+
+def test_fast_forward_matches_sampler_qnn():
+    feature_map = ZZFeatureMap(4)
+    ansatz = RealAmplitudes(4, reps=2)
+    reference = sampler_qnn(feature_map, ansatz, interpret=parity, output_shape=2)
+    fast = StatevectorQNN(feature_map, ansatz, interpret=parity, output_shape=2)
+
+    rng = np.random.default_rng(0)
+    X = rng.random((12, 4))
+    for _ in range(2):
+        weights = rng.uniform(-np.pi, np.pi, fast.num_weights)
+        np.testing.assert_allclose(fast.forward(X, weights), reference.forward(X, weights), atol=1e-10)
+
+
+def test_forward_calls_are_counted_for_both_qnns():
+    feature_map = ZZFeatureMap(2)
+    ansatz = RealAmplitudes(2, reps=1)
+    X = np.random.default_rng(3).random((6, 2))
+    y = (X[:, 0] > 0.5).astype(float)
+
+    for qnn in (sampler_qnn(feature_map, ansatz), StatevectorQNN(feature_map, ansatz)):
+        instrumentation.enable()
+        instrumentation.reset()
+        try:
+            _, history, _ = fit(qnn, X, y, np.full(4, 0.1), maxiter=5)
+            qnn_forward(qnn, X[:4], np.full(4, 0.1))
+            counters = instrumentation.profile()["counters"]
+        finally:
+            instrumentation.disable()
+        assert counters["qnn_forward_calls"] == len(history) + 1
+        assert counters["qnn_forward_rows"] == 6 * len(history) + 4
+
+
+def test_parameter_shift_gradient_matches_finite_difference():
+    qnn = StatevectorQNN(ZZFeatureMap(4), RealAmplitudes(4, reps=2))
+    rng = np.random.default_rng(1)
+    X = rng.random((10, 4))
+    weights = rng.uniform(-1, 1, qnn.num_weights)
+
+    _, grad = qnn.backward(X, weights)
+    step = 1e-6
+    numeric = np.stack([(qnn.forward(X, weights + step * e) - qnn.forward(X, weights - step * e)) / (2 * step)
+                        for e in np.eye(qnn.num_weights)], axis=-1)
+
+    np.testing.assert_allclose(grad, numeric, atol=1e-7)
+
+
+def test_sharded_states_and_minibatch_training():
+    rng = np.random.default_rng(2)
+    X = rng.random((40, 4))
+    y = (X[:, 0] > 0.5).astype(float)
+
+    serial = StatevectorQNN(ZZFeatureMap(4), RealAmplitudes(4, reps=1))
+    sharded = StatevectorQNN(ZZFeatureMap(4), RealAmplitudes(4, reps=1))
+    np.testing.assert_allclose(sharded.feature_states(X, workers=2), serial.feature_states(X))
+
+    x0 = np.full(serial.num_weights, 0.1)
+    first, history, _ = fit(serial, X, y, x0, method="Adam", maxiter=30, batch_size=8, seed=0)
+    second, _, _ = fit(sharded, X, y, x0, method="Adam", maxiter=30, batch_size=8, seed=0)
+
+    np.testing.assert_allclose(first.x, second.x)
+    assert len(history) == 30
+
+
+def test_feature_state_cache_is_bounded():
+    qnn = StatevectorQNN(ZZFeatureMap(2), RealAmplitudes(2, reps=1), cache_size=2)
+    rng = np.random.default_rng(6)
+    first, second, third = (rng.random((5, 2)) for _ in range(3))
+
+    instrumentation.enable()
+    instrumentation.reset()
+    try:
+        for X in (first, second, first, third, first, second):
+            qnn.feature_states(X)
+        counters = instrumentation.profile()["counters"]
+    finally:
+        instrumentation.disable()
+    assert len(qnn._states) == 2
+    assert counters["circuits_built"] == 4  # first stays cached, second is evicted by third
+    assert counters["statevector_evaluations"] == 4 * 5
+
+
+def test_fidelity_kernel_matches_statevector_overlaps():
+    from qiskit.quantum_info import Statevector
+
+    feature_map = ZZFeatureMap(4)
+    X = np.random.default_rng(4).random((11, 4))
+    states = np.array([Statevector(feature_map.assign_parameters(x)).data for x in X])
+    expected = np.abs(states @ states.conj().T) ** 2
+
+    kernel = FidelityKernel(feature_map, block_size=4)  # uneven tiles
+    gram = kernel.gram(X)
+    np.testing.assert_allclose(gram, expected, atol=1e-12)
+    np.testing.assert_array_equal(gram, gram.T)
+    np.testing.assert_allclose(kernel.cross(X[:3], X[3:]), expected[:3, 3:], atol=1e-12)
+
+
+def test_fidelity_kernel_gram_is_cached_by_dataset(tmp_path):
+    X = np.random.default_rng(5).random((8, 4))
+    gram = FidelityKernel(ZZFeatureMap(4), cache_dir=tmp_path).gram(X)
+    assert len(list(tmp_path.glob("gram_*.npy"))) == 1
+
+    instrumentation.reset()
+    instrumentation.enable()
+    try:
+        kernel = FidelityKernel(ZZFeatureMap(4), cache_dir=tmp_path)
+        np.testing.assert_array_equal(kernel.gram(X), gram)
+        cached_profile = instrumentation.profile()
+        X_test = np.random.default_rng(6).random((3, 4))
+        cross = kernel.cross(X_test, X)
+        profile = instrumentation.profile()
+    finally:
+        instrumentation.disable()
+    assert cached_profile["counters"]["kernel.gram_cached"] == 1
+    assert "kernel.states" not in cached_profile["stages"]
+    # Only the test points are simulated; the training states come from the cache.
+    assert profile["stages"]["kernel.states"]["samples"] == 3
+    assert profile["counters"]["kernel.states_cached"] == 1
+    np.testing.assert_allclose(cross, FidelityKernel(ZZFeatureMap(4)).cross(X_test, X), atol=1e-12)
+
+    FidelityKernel(ZZFeatureMap(4, reps=1), cache_dir=tmp_path).gram(X)
+    FidelityKernel(ZZFeatureMap(4), cache_dir=tmp_path).gram(X[:6])
+    assert len(list(tmp_path.glob("gram_*.npy"))) == 3
+
+
+def test_kernel_svm_separates_classes():
+    rng = np.random.default_rng(6)
+    X = np.concatenate([rng.normal(0.2, 0.05, (20, 4)), rng.normal(0.8, 0.05, (20, 4))])
+    y = np.repeat([0, 1], 20)
+    kernel = FidelityKernel(ZZFeatureMap(4))
+    svm = fit_kernel_svm(kernel.gram(X[::2]), y[::2])
+    assert (svm.predict(kernel.cross(X[1::2], X[::2])) == y[1::2]).mean() >= 0.9
@@ -0,0 +1,341 @@
+import numpy as np
+import pytest
+
+from quantum_engine import (
+    NOISE_CHANNELS,
+    RENORMALIZE_POLICIES,
+    SV_GATES,
+    AerParameterRunner,
+    OnlineAnomalyScorer,
+    anomaly_scores,
+    circuit_ops,
+    compute_uncompute_template,
+    cx_permutation,
+    density_fidelities,
+    entangled3_anomaly_scores,
+    entangled3_fidelity_scores,
+    entangled3_states,
+    fidelity_scores,
+    noisy_anomaly_scores,
+    noisy_entangled3_anomaly_scores,
+    noisy_entangled3_density_matrices,
+    noisy_ry_fidelities,
+    qft_circuit,
+    ry_circuit,
+    ry_fidelity,
+    ry_product_amplitudes,
+    ry_template,
+    simulate_circuit,
+    shot_anomaly_scores,
+    shot_fidelities,
+    simulate_ops,
+    window_angles,
+    window_anomaly_scores,
+    window_fidelities,
+    window_qubit_states,
+    wilson_interval,
+)
+
+
+def test_closed_form_matches_statevector_path():
+    rng = np.random.default_rng(7)
+    data = rng.normal(10, 3, 64)
+    min_val, max_val = data.min(), data.max()
+    ref = data[:10].mean()
+
+    fast = fidelity_scores(data, ref, min_val, max_val)
+    slow = fidelity_scores(data, ref, min_val, max_val, encoding=ry_circuit)
+
+    np.testing.assert_allclose(fast, slow, atol=1e-12)
+
+
+def test_aer_window_scores_match_closed_form():
+    data = np.random.default_rng(11).normal(10, 3, 200)
+    np.testing.assert_allclose(anomaly_scores(data, encoding="aer-ry"), anomaly_scores(data), atol=1e-12)
+
+
+def test_aer_runner_binds_many_parameter_sets():
+    from qiskit.quantum_info import Statevector
+
+    runner = AerParameterRunner(ry_template(3))
+    values = np.random.default_rng(5).uniform(0, np.pi, (6, 3))
+
+    states = runner.statevectors(values)
+    expected = [Statevector.from_instruction(runner.template.assign_parameters(v)).data for v in values]
+    np.testing.assert_allclose(states, expected, atol=1e-12)
+
+    counts = runner.counts(values, shots=2000, seed=3)
+    assert counts.shape == (6, 8)
+    assert np.all(counts.sum(axis=1) == 2000)
+    np.testing.assert_allclose(counts / 2000, np.abs(states) ** 2, atol=0.05)
+    assert len(runner._compiled) == 2  # one transpiled circuit per mode
+
+
+def test_anomaly_scores_flag_the_shock():
+    data = np.concatenate([np.full(50, 5.0), np.full(10, 40.0)])
+    scores = anomaly_scores(data)
+
+    assert scores.shape == data.shape
+    assert np.all(scores[:50] < 1e-9)
+    assert np.all(scores[50:] > 0.9)
+
+
+def test_entangled3_matches_qiskit_circuit():
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector, state_fidelity
+
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(0, 5, (16, 3))
+    min_vals, max_vals = vectors.min(axis=0), vectors.max(axis=0)
+    ref_vector = vectors[:4].mean(axis=0)
+
+    def encode(row):
+        angles = (row - min_vals) / (max_vals - min_vals + 1e-6) * np.pi
+        qc = QuantumCircuit(3)
+        for i, angle in enumerate(angles):
+            qc.ry(angle, i)
+        qc.cx(0, 1)
+        qc.cx(1, 2)
+        qc.cx(2, 0)
+        return Statevector.from_instruction(qc)
+
+    states = entangled3_states(vectors, min_vals, max_vals)
+    expected = [state_fidelity(encode(ref_vector), encode(row)) for row in vectors]
+
+    for row, state in zip(vectors, states):
+        np.testing.assert_allclose(state, encode(row).data.real, atol=1e-12)
+    np.testing.assert_allclose(
+        entangled3_fidelity_scores(vectors, ref_vector, min_vals, max_vals), expected, atol=1e-12
+    )
+
+
+def test_window_fidelities_match_full_product_states():
+    data = np.random.default_rng(2).normal(10, 3, 40)
+    angles = window_angles(data, k=5, stride=3)
+    ref = angles[:4].mean(axis=0)
+
+    assert angles.shape == (12, 5)
+    np.testing.assert_array_equal(window_qubit_states(angles)[:, :, 0], np.cos(angles / 2))
+    states = ry_product_amplitudes(angles)
+    expected = (states @ ry_product_amplitudes(ref)[0]) ** 2
+    np.testing.assert_allclose(window_fidelities(angles, ref, chunksize=5), expected, atol=1e-12)
+
+
+def test_window_scores_scale_to_wide_windows():
+    data = np.concatenate([np.full(500, 5.0), np.full(30, 40.0), np.full(500, 5.0)])
+    scores = window_anomaly_scores(data, k=24, stride=2)
+
+    assert scores.shape == ((len(data) - 24) // 2 + 1,)
+    assert np.all(scores[:200] < 1e-9)
+    assert scores.max() > 0.99
+    assert 250 - 12 <= np.argmax(scores) <= 265
+
+
+def test_online_scorer_replays_offline_scores():
+    rng = np.random.default_rng(11)
+    data = rng.normal(10, 3, 300)
+    vectors = rng.normal(0, 5, (300, 3))
+
+    scalar = OnlineAnomalyScorer(reference=data[:10].mean(), min_val=data.min(),
+                                 max_val=data.max(), renormalize="freeze")
+    entangled = OnlineAnomalyScorer("entangled3", reference=vectors[:20].mean(axis=0),
+                                    min_val=vectors.min(axis=0), max_val=vectors.max(axis=0),
+                                    renormalize="freeze")
+
+    np.testing.assert_allclose([scalar.update(v) for v in data], anomaly_scores(data))
+    np.testing.assert_allclose(entangled.update_many(vectors), entangled3_anomaly_scores(vectors))
+
+
+def test_online_update_many_matches_update():
+    rng = np.random.default_rng(5)
+    data = rng.normal(10, 3, 200)
+    data[120:130] += 25
+
+    for policy in RENORMALIZE_POLICIES:
+        single = OnlineAnomalyScorer(renormalize=policy)
+        batched = OnlineAnomalyScorer(renormalize=policy)
+        one = np.array([single.update(v) for v in data])
+        many = np.concatenate([batched.update_many(data[:4]), batched.update_many(data[4:])])
+
+        np.testing.assert_allclose(one, many, equal_nan=True)
+        assert np.isnan(one[:9]).all() and not np.isnan(one[9:]).any()
+
+
+def test_online_range_widens_until_non_empty():
+    data = [10, 10, 11, 12, 9, 30]
+    for policy in ("freeze", "clip"):
+        batched = OnlineAnomalyScorer(reference=10.0, renormalize=policy).update_many(data)
+        single = OnlineAnomalyScorer(reference=10.0, renormalize=policy)
+
+        np.testing.assert_allclose([single.update(v) for v in data], batched)
+        assert batched[2] == pytest.approx(1.0)  # frozen at [10, 11] after the first distinct sample
+        assert batched.max() > 0
+
+    vectors = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 1], [5, 5, 5]])
+    whole = OnlineAnomalyScorer("entangled3", reference=0.0, renormalize="clip").update_many(vectors)
+    entangled = OnlineAnomalyScorer("entangled3", reference=0.0, renormalize="clip")
+    parts = np.concatenate([entangled.update_many(vectors[:2]), entangled.update_many(vectors[2:])])
+    np.testing.assert_allclose(parts, whole)
+    np.testing.assert_array_equal(entangled.min, [0, 0, 0])
+    np.testing.assert_array_equal(entangled.max, [1, 1, 1])
+
+
+def random_circuit(num_qubits, depth, rng):
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(depth):
+        gate = SV_GATES[rng.integers(len(SV_GATES))]
+        qubits = [int(q) for q in rng.choice(num_qubits, 2, replace=False)]
+        angle = rng.uniform(-np.pi, np.pi)
+        if gate in ("h", "x", "z"):
+            getattr(qc, gate)(qubits[0])
+        elif gate in ("ry", "rz", "p"):
+            getattr(qc, gate)(angle, qubits[0])
+        elif gate == "cp":
+            qc.cp(angle, *qubits)
+        else:
+            getattr(qc, gate)(*qubits)
+    return qc
+
+
+@pytest.mark.parametrize("num_qubits", [2, 3, 5])
+def test_numpy_simulator_matches_statevector(num_qubits):
+    from qiskit.quantum_info import Statevector
+
+    rng = np.random.default_rng(num_qubits)
+    for _ in range(5):
+        qc = random_circuit(num_qubits, 30, rng)
+        np.testing.assert_allclose(simulate_circuit(qc)[0], Statevector.from_instruction(qc).data, atol=1e-12)
+
+
+def test_numpy_simulator_batches_parameters_and_initial_states():
+    from qiskit import QuantumCircuit
+    from qiskit.circuit.library import RealAmplitudes, ZZFeatureMap
+    from qiskit.quantum_info import Statevector
+
+    qc = ZZFeatureMap(4).compose(RealAmplitudes(4, reps=2))
+    values = np.random.default_rng(0).uniform(0, np.pi, (16, qc.num_parameters))
+    expected = np.array([Statevector.from_instruction(qc.assign_parameters(v)).data for v in values])
+    np.testing.assert_allclose(simulate_circuit(qc, values), expected, atol=1e-12)
+
+    # Hand-written ops with a (B,) angle array, applied to B different input states.
+    angles = np.linspace(0, np.pi, 6)
+    initial = np.eye(4)[[0, 1, 2, 3, 0, 1]]
+    states = simulate_ops(2, [("ry", (0,), angles), ("cx", (0, 1), None)], initial=initial)
+    for state, angle, start in zip(states, angles, initial):
+        qc2 = QuantumCircuit(2)
+        qc2.ry(angle, 0)
+        qc2.cx(0, 1)
+        np.testing.assert_allclose(state, Statevector(start).evolve(qc2).data, atol=1e-12)
+
+
+def test_circuit_ops_decomposes_library_circuits():
+    from qiskit.circuit.library import QFT
+    from qiskit.quantum_info import Statevector
+
+    for qc in (QFT(4), qft_circuit(4, inverse=True)):
+        assert {name for name, _, _ in circuit_ops(qc)} <= set(SV_GATES) | {"gphase"}
+        np.testing.assert_allclose(simulate_circuit(qc)[0], Statevector.from_instruction(qc).data, atol=1e-12)
+
+
+def aer_noisy_density_matrix(qc, channel, strength):
+    from qiskit.quantum_info import DensityMatrix
+    from qiskit_aer import AerSimulator
+    from qiskit_aer.noise import NoiseModel, amplitude_damping_error, depolarizing_error
+
+    error = depolarizing_error(strength, 1) if channel == "depolarizing" else amplitude_damping_error(strength)
+    model = NoiseModel()
+    model.add_all_qubit_quantum_error(error, ["ry"])
+    model.add_all_qubit_quantum_error(error.tensor(error), ["cx"])
+    qc = qc.copy()
+    qc.save_density_matrix()
+    backend = AerSimulator(method="density_matrix", noise_model=model)
+    result = backend.run(qc).result()  # already Ry/CX only: no transpile, so every gate gets its error
+    return DensityMatrix(result.data()["density_matrix"])
+
+
+@pytest.mark.parametrize("channel", NOISE_CHANNELS)
+def test_noisy_scores_match_aer_density_matrix(channel):
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import state_fidelity
+
+    strength = 0.2
+    angles = np.random.default_rng(8).uniform(0, np.pi, (5, 3))
+    rhos = noisy_entangled3_density_matrices(angles, channel, strength)
+    for a, rho in zip(angles, rhos):
+        qc = QuantumCircuit(3)
+        for q in range(3):
+            qc.ry(a[q], q)
+        for control, target in [(0, 1), (1, 2), (2, 0)]:
+            qc.cx(control, target)
+        np.testing.assert_allclose(rho, aer_noisy_density_matrix(qc, channel, strength).data, atol=1e-12)
+
+    expected = [state_fidelity(aer_noisy_density_matrix(ry_circuit(a), channel, strength),
+                               aer_noisy_density_matrix(ry_circuit(angles[0, 0]), channel, strength))
+                for a in angles[:, 0]]
+    np.testing.assert_allclose(noisy_ry_fidelities(angles[:, 0], angles[0, 0], channel, strength),
+                               expected, atol=1e-6)
+
+    from qiskit.quantum_info import DensityMatrix
+
+    sigma = rhos[0]
+    expected = [state_fidelity(DensityMatrix(rho), DensityMatrix(sigma)) for rho in rhos]
+    np.testing.assert_allclose(density_fidelities(rhos, sigma), expected, atol=1e-6)
+
+
+def test_zero_noise_reproduces_ideal_scores():
+    rng = np.random.default_rng(9)
+    data, vectors = rng.normal(10, 3, 300), rng.normal(0, 3, (300, 3))
+    for channel in NOISE_CHANNELS:
+        np.testing.assert_allclose(noisy_anomaly_scores(data, channel, 0.0), anomaly_scores(data), atol=1e-12)
+        np.testing.assert_allclose(noisy_entangled3_anomaly_scores(vectors, channel, 0.0),
+                                   entangled3_anomaly_scores(vectors), atol=1e-6)
+
+    # Depolarizing noise pulls every state towards I/2**n: scores shrink, ranking is kept.
+    noisy = noisy_anomaly_scores(data, "depolarizing", 0.3)
+    ideal = anomaly_scores(data)
+    assert noisy.max() < ideal.max()
+    assert np.array_equal(np.argsort(noisy, kind="stable"), np.argsort(ideal, kind="stable"))
+    with pytest.raises(ValueError):
+        noisy_anomaly_scores(data, "dephasing", 0.1)
+
+
+@pytest.mark.parametrize("encoding", ["ry", "entangled3"])
+def test_compute_uncompute_circuit_measures_fidelity(encoding):
+    from qiskit.quantum_info import Statevector
+
+    template = compute_uncompute_template(encoding)
+    n = template.num_qubits
+    angles = np.random.default_rng(12).uniform(0, np.pi, (4, n))
+    ref = angles[0] * 0.5
+    if encoding == "ry":
+        exact = ry_fidelity(angles[:, 0], ref[0])
+    else:
+        states = ry_product_amplitudes(np.vstack([angles, ref]))[:, cx_permutation(3, [(0, 1), (1, 2), (2, 0)])]
+        exact = (states[:-1] @ states[-1]) ** 2
+    for a, expected in zip(angles, exact):
+        bound = template.assign_parameters({**{f"theta[{i}]": a[i] for i in range(n)},
+                                            **{f"ref[{i}]": ref[i] for i in range(n)}})
+        assert abs(Statevector(bound).probabilities()[0] - expected) < 1e-12
+
+    estimates, used = shot_fidelities(angles, ref, encoding, shots=4000, seed=1)
+    assert (used == 4000).all()
+    np.testing.assert_allclose(estimates, exact, atol=0.04)
+
+
+def test_adaptive_shots_concentrate_near_threshold():
+    data = np.random.default_rng(13).normal(10, 3, 300)
+    exact = anomaly_scores(data)
+    scores, used = shot_anomaly_scores(data, "ry", initial_shots=64, max_shots=2048, seed=5)
+
+    assert used.min() >= 64 and used.max() <= 2048
+    assert set(np.unique(used)) <= {64, 128, 256, 512, 1024, 2048}
+    far, near = np.abs(exact - 0.1) > 0.2, np.abs(exact - 0.1) < 0.01
+    assert (used[far] == 64).all()
+    assert used[near].mean() > 4 * used[far].mean()
+    assert used.sum() < 0.5 * 2048 * len(data)
+    assert np.mean((scores > 0.1) == (exact > 0.1)) > 0.95
+
+    lo, hi = wilson_interval(np.array([0, 50, 100]), np.array([100, 100, 100]))
+    assert (lo >= 0).all() and (hi <= 1).all() and lo[1] < 0.5 < hi[1]
@@ -0,0 +1,113 @@
+import base64
+import sys
+import types
+
+import pytest
+
+import instrumentation
+import report_engine
+from report_engine import figure_png, render_report, report_queue, run_sections, submit_report
+
+
+def make_run(label, acc, png=b'\x89PNG fake'):
+    return {'train_acc': acc, 'test_acc': acc - 5, 'model': 'qnn', 'ansatz': 'RealAmplitudes (reps=2)',
+            'loss': 'Mean Squared Error', 'optimization': 'COBYLA (maxiter=150)',
+            'results': f'COBYLA (loss={acc / 1000:.3f})', 'png': png, 'label': label}
+
+
+def line_plot_png():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    plt.plot([0, 1], [1, 0])
+    return figure_png(fig)
+
+
+def test_figure_renders_to_png_bytes():
+    import matplotlib.pyplot as plt
+
+    png = line_plot_png()
+
+    assert png.startswith(b'\x89PNG')
+    assert not plt.get_fignums()
+
+
+def test_multi_run_report_shares_unchanged_sections():
+    runs = [make_run('rows 0-400', 90.0, b'png-a'), make_run('rows 400-800', 80.0, b'png-b')]
+    html, key = render_report(run_sections(runs))
+
+    assert html.count('Model Architecture') == 1
+    assert html.count('Performance Metrics') == 2
+    assert '(rows 400-800)' in html
+    assert base64.b64encode(b'png-b').decode() in html
+
+    instrumentation.enable()
+    instrumentation.reset()
+    try:
+        html_again, key_again = render_report(run_sections(runs))
+        counters = instrumentation.profile()['counters']
+    finally:
+        instrumentation.disable()
+    assert key_again == key
+    assert counters == {'report.sections_cached': len(run_sections(runs))}
+
+    _, key_more = render_report(run_sections(runs + [make_run('rows 800-1200', 70.0, b'png-c')]))
+    assert key_more != key
+
+
+def test_kernel_runs_are_described_without_ansatz_or_loss():
+    kernel_run = dict(make_run('kernel, rows 0-400', 85.0), model='kernel', optimization='SVC (C=1.0)')
+    del kernel_run['ansatz'], kernel_run['loss']
+    html, _ = render_report(run_sections([kernel_run]))
+
+    assert 'Fidelity-Kernel Support Vector Machine' in html
+    assert 'RealAmplitudes' not in html and 'Loss Function' not in html and 'SamplerQNN' not in html
+
+    html, _ = render_report(run_sections([make_run('rows 0-400', 90.0), kernel_run]))
+    assert html.count('Model Architecture') == 2
+    assert 'SamplerQNN' in html and 'no loss curve' in html
+
+
+def test_pdf_is_written_in_background_and_reused(tmp_path):
+    pytest.importorskip('weasyprint')
+    path = tmp_path / 'report.pdf'
+    runs = [make_run('rows 0-400', 90.0, line_plot_png())]
+
+    job = submit_report(runs, path)
+    assert report_queue().result(job, timeout=120) == path
+    assert path.read_bytes().startswith(b'%PDF')
+    assert submit_report(runs, path) == job
+
+
+def test_deleted_pdf_is_written_again(tmp_path, monkeypatch):
+    written = []
+
+    class FakeHTML:
+        def __init__(self, string):
+            self.string = string
+
+        def write_pdf(self, target):
+            written.append(target)
+            with open(target, 'wb') as f:
+                f.write(b'%PDF fake')
+
+    monkeypatch.setitem(sys.modules, 'weasyprint', types.SimpleNamespace(HTML=FakeHTML))
+    monkeypatch.setattr(report_engine, 'KEY_DIR', str(tmp_path / 'keys'))
+    path = tmp_path / 'pdf' / 'report.pdf'
+    path.parent.mkdir()
+    runs = [make_run('rows 0-400', 91.0, b'png-deleted')]
+
+    job = submit_report(runs, path)
+    report_queue().result(job, timeout=30)
+    assert submit_report(runs, path) == job
+    assert [p.name for p in path.parent.iterdir()] == ['report.pdf']  # no key file next to the PDF
+    assert len(list((tmp_path / 'keys').iterdir())) == 1
+
+    path.unlink()
+    again = submit_report(runs, path)
+    report_queue().result(again, timeout=30)
+    assert again != job and path.exists()
+    assert len(written) == 2
+
@@ -0,0 +1,52 @@
+import numpy as np
+
+from results_store import ResultsStore, dataset_id, params_hash
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    store = ResultsStore(tmp_path)
+    data = np.random.default_rng(0).normal(10, 3, 1000)
+    dataset = dataset_id(data)
+    scores = np.linspace(0, 1, 1000)
+    states = np.random.default_rng(1).normal(size=(1000, 8)) + 0j
+
+    assert store.load(dataset, 'entangled3', {'n_reference': 20}) is None
+    store.save(dataset, 'entangled3', {'n_reference': 20}, scores, states, metadata={'source': 'test'})
+
+    entry = store.load(dataset, 'entangled3', {'n_reference': 20})
+    assert isinstance(entry['scores'], np.memmap)
+    np.testing.assert_array_equal(entry['scores'][100:200], scores[100:200])
+    np.testing.assert_array_equal(entry['states'], states)
+    assert entry['meta']['metadata'] == {'source': 'test'}
+    assert entry['meta']['states_shape'] == [1000, 8]
+    assert store.load(dataset, 'entangled3', {'n_reference': 10}) is None
+    assert [m['encoding'] for m in store.entries()] == ['entangled3']
+
+
+def test_get_or_compute_runs_once(tmp_path):
+    store = ResultsStore(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(5.0)
+
+    for _ in range(3):
+        entry = store.get_or_compute('abc' * 10, 'ry', {'eps': 1e-6}, compute)
+        np.testing.assert_array_equal(entry['scores'], np.arange(5.0))
+    assert len(calls) == 1
+    assert entry['states'] is None
+
+
+def test_keys_are_content_based(tmp_path):
+    a = np.arange(10.0)
+    assert dataset_id(a) == dataset_id(a.copy())
+    assert dataset_id(a) != dataset_id(a.astype(np.float32))
+    assert dataset_id(a) != dataset_id(a.reshape(2, 5))
+    assert params_hash({'a': 1, 'b': 2}) == params_hash({'b': 2, 'a': 1})
+
+    store = ResultsStore(tmp_path)
+    store.save(dataset_id(a), 'ry', {}, a)
+    assert store.has(dataset_id(a.copy()), 'ry', {})
+    assert not store.has(dataset_id(a + 1), 'ry', {})
+    assert not any(p.name.startswith('.tmp-') for p in (tmp_path / 'ry').iterdir())
@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from sim_jobs import CANCELLED, DONE, FAILED, JobQueue
+
+
+def test_identical_requests_share_one_job():
+    queue = JobQueue(max_workers=2)
+    gate = threading.Event()
+    calls = []
+
+    def simulate(shots):
+        calls.append(shots)
+        gate.wait(5)
+        return {'0': shots}
+
+    first = queue.submit(('H', 1024), simulate, 1024)
+    second = queue.submit(('H', 1024), simulate, 1024)
+    gate.set()
+
+    assert first == second
+    assert queue.result(first, timeout=5) == {'0': 1024}
+    assert queue.submit(('H', 1024), simulate, 1024) == first  # finished results are reused
+    assert calls == [1024]
+    queue.shutdown()
+
+
+def test_concurrency_limit_cancel_and_failure():
+    queue = JobQueue(max_workers=1)
+    gate = threading.Event()
+    running = []
+
+    def slow():
+        running.append(time.time())
+        gate.wait(5)
+        return 'ok'
+
+    def broken():
+        raise RuntimeError('backend down')
+
+    blocker = queue.submit('slow', slow)
+    queued = queue.submit('queued', slow)
+    failing = queue.submit('broken', broken)
+    time.sleep(0.1)
+
+    assert len(running) == 1  # only one slot
+    assert queue.cancel(queued)
+    gate.set()
+
+    assert queue.result(blocker, timeout=5) == 'ok'
+    queue.result(failing, timeout=5)
+    assert queue.status(blocker)['state'] == DONE
+    assert queue.status(queued)['state'] == CANCELLED
+    assert queue.status(failing)['state'] == FAILED
+    assert 'backend down' in queue.status(failing)['error']
+    assert len(running) == 1
+    queue.shutdown()
+
+
+def test_result_of_evicted_job_raises_clear_error():
+    queue = JobQueue(max_workers=1, max_finished=1)
+    first = queue.submit('a', lambda: 1)
+    assert queue.result(first, timeout=5) == 1
+    second = queue.submit('b', lambda: 2)
+    assert queue.result(second, timeout=5) == 2
+
+    with pytest.raises(KeyError, match='evicted'):
+        queue.result(first)
+    with pytest.raises(KeyError, match='evicted'):
+        queue.result(999)
+    queue.shutdown()
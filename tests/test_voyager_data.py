@@ -0,0 +1,121 @@
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from quantum_engine import anomaly_scores, entangled3_anomaly_scores
+from voyager_data import RunningStats, iter_tab_chunks, load_window, open_store
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_case(folder, name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, folder, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_tab(path, n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range('1979-07-08', periods=n_rows, freq='48s')
+    with open(path, 'w') as f:
+        for t, row in zip(times, rng.normal(10, 3, (n_rows, 8))):
+            f.write(t.strftime('%Y-%m-%dT%H:%M:%S.000') + ',' + ','.join(f"{v:.3f}" for v in row) + '\n')
+    return path
+
+
+def test_window_matches_pandas_mask(tmp_path):
+    path = write_tab(tmp_path / 'S3_48S.TAB')
+    start, end = '1979-07-08 01:00', '1979-07-08 03:00'
+
+    df = pd.read_csv(path, header=None, sep=',', on_bad_lines='skip')
+    df[0] = pd.to_datetime(df[0])
+    expected = df.loc[(df[0] >= start) & (df[0] <= end)]
+
+    window = load_window(path, start, end, {'Time': 0, 'Bx': 3, 'B_Mag': 8})
+
+    assert len(window) == len(expected)
+    np.testing.assert_array_equal(window['Time'].values, expected[0].values)
+    np.testing.assert_allclose(window['Bx'].values, expected[3].values)
+    np.testing.assert_allclose(window['B_Mag'].values, expected[8].values)
+
+
+def test_cache_rebuilds_only_when_source_changes(tmp_path):
+    path = write_tab(tmp_path / 'S3_48S.TAB')
+    col_file = str(path) + '.cache/col_8.npy'
+
+    first = np.array(open_store(path, [8])[8])
+    built_at = os.stat(col_file).st_mtime_ns
+
+    os.utime(path)  # same content, new mtime
+    open_store(path, [8])
+    assert os.stat(col_file).st_mtime_ns == built_at
+
+    write_tab(path, seed=1)
+    second = np.array(open_store(path, [8])[8])
+    assert not np.allclose(first, second)
+
+
+def test_streamed_chunks_carry_scorer_state(tmp_path):
+    first = write_tab(tmp_path / 'part1.TAB', n_rows=300, seed=2)
+    second = write_tab(tmp_path / 'part2.TAB', n_rows=200, seed=3)
+    full = np.concatenate([np.array(open_store(p, [3, 8])[8]) for p in (first, second)])
+
+    stats = RunningStats([8], n_reference=10)
+    blocks = list(iter_tab_chunks([first, second], [3, 8], chunksize=64, stats=stats))
+
+    assert all(len(b[0]) <= 64 for b in blocks)
+    assert blocks[0][0].dtype == np.dtype('datetime64[ns]')
+    np.testing.assert_allclose(np.concatenate([b[8] for b in blocks]), full)
+    assert stats.count == len(full)
+    np.testing.assert_allclose([stats.min[0], stats.max[0]], [full.min(), full.max()])
+    np.testing.assert_allclose(stats.mean[0], full.mean())
+    np.testing.assert_allclose(stats.reference[0], full[:10].mean())
+
+
+def test_reference_is_none_before_any_row():
+    stats = RunningStats([8])
+    stats.update({8: np.array([])})
+    assert stats.reference is None and stats.count == 0
+
+
+def test_streamed_scores_match_offline_scores(tmp_path):
+    first = write_tab(tmp_path / 'part1.TAB', n_rows=300, seed=4)
+    second = write_tab(tmp_path / 'part2.TAB', n_rows=200, seed=5)
+    store = [open_store(p, [3, 4, 5, 8]) for p in (first, second)]
+    magnitude = np.concatenate([s[8] for s in store])
+    vectors = np.concatenate([np.column_stack([s[3], s[4], s[5]]) for s in store])
+
+    case1 = load_case('case1_voyager_telemetry_analysis', 'quantum_anomaly')
+    case2 = load_case('case2_anomaly_detection', 'complex_quantum')
+    streamed = [scores for _, scores in case1.stream_anomaly_detection([first, second], chunksize=64)]
+    np.testing.assert_allclose(np.concatenate(streamed), anomaly_scores(magnitude), atol=1e-12)
+    streamed = [scores for _, scores in case2.stream_complex_analysis([first, second], chunksize=64)]
+    np.testing.assert_allclose(np.concatenate(streamed), entangled3_anomaly_scores(vectors), atol=1e-12)
+
+    empty = case1.stream_anomaly_detection([first], start='2001-01-01')
+    assert list(empty) == []
+
+
+def test_gaps_in_the_reference_rows_are_skipped(tmp_path):
+    path = write_tab(tmp_path / 'gap.TAB', n_rows=100, seed=6)
+    lines = path.read_text().splitlines()
+    fields = lines[3].split(',')
+    fields[8] = 'N/A'  # a gap among the first n_reference rows
+    lines[3] = ','.join(fields)
+    path.write_text('\n'.join(lines) + '\n')
+    values = np.array(open_store(path, [8])[8])
+    assert np.isnan(values[3])
+
+    stats = RunningStats([8], n_reference=10)
+    for _ in iter_tab_chunks(path, [8], chunksize=7, stats=stats):
+        pass
+    np.testing.assert_allclose(stats.reference[0], np.nanmean(values[:10]))
+    np.testing.assert_allclose(stats.mean[0], np.nanmean(values))
+
+    case1 = load_case('case1_voyager_telemetry_analysis', 'quantum_anomaly')
+    scores = np.concatenate([s for _, s in case1.stream_anomaly_detection(path, chunksize=7)])
+    assert np.isnan(scores[3]) and not np.isnan(np.delete(scores, 3)).any()
@@ -0,0 +1,254 @@
+"""
+Voyager Data: shared loader for the PDS magnetometer TAB files.
+
+The TAB text is parsed once with pandas and stored next to the source as one
+`.npy` file per column (`<file>.cache/`). Every later open is a memory-mapped
+`np.load`, and time windows are cut with a binary search on the sorted
+timestamps instead of a boolean mask over the full record.
+
+The cache is rebuilt only when the source file changes: size/mtime are checked
+first and, if they moved, the SHA-256 of the file decides.
+
+pandas is imported on first use (parsing, DataFrames): opening a warm cache
+and cutting windows by ISO timestamps only needs NumPy.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from instrumentation import count, timed
+
+CACHE_SUFFIX = ".cache"
+META_FILE = "meta.json"
+
+# Column layout of the S3 48-second summary files (0 = time).
+TIME = 0
+COLUMNS = {'Time': 0, 'Bx': 3, 'By': 4, 'Bz': 5, 'B_Mag': 8}
+
+
+def cache_dir_for(path):
+    return os.fspath(path) + CACHE_SUFFIX
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return {'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+
+def _read_meta(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(cache_dir, meta):
+    # meta.json is written last (and atomically): a cache without it is invalid.
+    tmp_path = os.path.join(cache_dir, META_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(cache_dir, META_FILE))
+
+
+def _typed_columns(df):
+    """Raw read_csv frame -> {column index: array}, dropping rows without a valid time."""
+    import pandas as pd
+
+    times = pd.to_datetime(df[TIME], errors='coerce')
+    keep = times.notna().to_numpy()
+    columns = {TIME: times.to_numpy(dtype='datetime64[ns]')[keep]}
+    for col in df.columns:
+        if col != TIME:
+            columns[int(col)] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)[keep]
+    return columns
+
+
+def parse_tab(path):
+    """Parses a TAB file into {column index: array}; column 0 is datetime64[ns]."""
+    import pandas as pd
+
+    columns = _typed_columns(pd.read_csv(path, header=None, sep=',', on_bad_lines='skip'))
+    times = columns[TIME]
+    if len(times) > 1 and np.any(times[1:] < times[:-1]):
+        order = np.argsort(times, kind='stable')
+        columns = {col: values[order] for col, values in columns.items()}
+    return columns
+
+
+@timed("load.parse")
+def build_cache(path, cache_dir=None):
+    """Parses `path` and (re)writes its column cache. Returns the cache directory."""
+    cache_dir = cache_dir or cache_dir_for(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    columns = parse_tab(path)
+    for col, values in columns.items():
+        np.save(os.path.join(cache_dir, f"col_{col}.npy"), values)
+
+    meta = dict(_source_stamp(path),
+                sha256=file_sha256(path),
+                n_rows=len(columns[TIME]),
+                columns=sorted(columns))
+    _write_meta(cache_dir, meta)
+    return cache_dir
+
+
+def ensure_cache(path, cache_dir=None):
+    """Returns the cache metadata, rebuilding the cache only if the source changed."""
+    cache_dir = cache_dir or cache_dir_for(path)
+    meta = _read_meta(cache_dir)
+    stamp = _source_stamp(path)
+
+    if meta is not None and all(meta.get(k) == v for k, v in stamp.items()):
+        return meta
+    if meta is not None and meta.get('size') == stamp['size'] and meta.get('sha256') == file_sha256(path):
+        # Touched (e.g. re-downloaded) but identical: only refresh the stamp.
+        meta.update(stamp)
+        _write_meta(cache_dir, meta)
+        return meta
+
+    build_cache(path, cache_dir)
+    return _read_meta(cache_dir)
+
+
+def open_store(path, columns=None, cache_dir=None):
+    """
+    Memory-mapped columns of a TAB file as {column index: array}.
+
+    `columns` limits which column indices are opened (time is always included).
+    """
+    cache_dir = cache_dir or cache_dir_for(path)
+    meta = ensure_cache(path, cache_dir)
+    wanted = meta['columns'] if columns is None else sorted({TIME, *columns})
+    return {col: np.load(os.path.join(cache_dir, f"col_{col}.npy"), mmap_mode='r')
+            for col in wanted}
+
+
+def _to_datetime64(value):
+    try:
+        # ISO strings, datetime and datetime64 without importing pandas.
+        return np.datetime64(value).astype('datetime64[ns]')
+    except (TypeError, ValueError):
+        import pandas as pd
+
+        return pd.Timestamp(value).to_datetime64().astype('datetime64[ns]')
+
+
+def time_slice(times, start=None, end=None):
+    """Row slice for start <= time <= end on sorted timestamps (binary search)."""
+    lo = 0 if start is None else int(np.searchsorted(times, _to_datetime64(start), side='left'))
+    hi = len(times) if end is None else int(np.searchsorted(times, _to_datetime64(end), side='right'))
+    return slice(lo, max(lo, hi))
+
+
+@timed("load", samples=len)
+def load_window(path, start=None, end=None, columns=None):
+    """
+    Time window of a TAB file as a DataFrame with a fresh RangeIndex.
+
+    `columns` maps output names to column indices, e.g. {'Time': 0, 'B_Mag': 8}.
+    """
+    import pandas as pd
+
+    columns = columns or {'Time': COLUMNS['Time'], 'B_Mag': COLUMNS['B_Mag']}
+    store = open_store(path, columns.values())
+    rows = time_slice(store[TIME], start, end)
+    return pd.DataFrame({name: np.array(store[col][rows]) for name, col in columns.items()})
+
+
+# --- STREAMING INGESTION ---
+# For full-mission archives that should not be loaded whole: files are read in
+# fixed-size chunks and the scorers' normalization state is carried along.
+
+class RunningStats:
+    """
+    Running min/max/mean of selected columns, plus the "quiet space" reference
+    (mean of the first `n_reference` rows) that the anomaly scorers use.
+    Gaps (NaN) are skipped: `mean` and `reference` average the values present.
+    """
+
+    def __init__(self, columns, n_reference=10):
+        self.columns = list(columns)
+        self.n_reference = n_reference
+        self.count = 0
+        self.min = np.full(len(self.columns), np.inf)
+        self.max = np.full(len(self.columns), -np.inf)
+        self._sum = np.zeros(len(self.columns))
+        self._valid = np.zeros(len(self.columns), dtype=np.int64)  # non-NaN values per column
+        self._head = []
+
+    def update(self, block):
+        values = np.column_stack([block[col] for col in self.columns])
+        if len(values) == 0:
+            return
+        missing = self.n_reference - sum(len(h) for h in self._head)
+        if missing > 0:
+            self._head.append(values[:missing].copy())
+        self.min = np.fmin(self.min, np.nanmin(values, axis=0))
+        self.max = np.fmax(self.max, np.nanmax(values, axis=0))
+        self._sum += np.nansum(values, axis=0)
+        self._valid += np.count_nonzero(~np.isnan(values), axis=0)
+        self.count += len(values)
+
+    @property
+    def mean(self):
+        return self._sum / np.maximum(self._valid, 1)
+
+    @property
+    def reference(self):
+        """Mean of the first `n_reference` rows, or None before any row was seen."""
+        if not self._head:
+            return None
+        return np.nanmean(np.concatenate(self._head), axis=0)
+
+
+def iter_tab_chunks(paths, columns=None, chunksize=100_000, start=None, end=None, stats=None):
+    """
+    Streams one or more TAB files as typed blocks of at most `chunksize` rows.
+
+    Each block is {column index: array} (column 0 is datetime64[ns] and always
+    included). Rows outside [start, end] are dropped, and `stats` (a
+    RunningStats) is updated with every block that is yielded.
+    """
+    import pandas as pd
+
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    usecols = sorted({TIME, *(columns or [COLUMNS['B_Mag']])})
+    start = None if start is None else _to_datetime64(start)
+    end = None if end is None else _to_datetime64(end)
+
+    for path in paths:
+        reader = pd.read_csv(path, header=None, sep=',', on_bad_lines='skip',
+                             usecols=usecols, chunksize=chunksize)
+        for chunk in reader:
+            block = _typed_columns(chunk)
+            if start is not None or end is not None:
+                times = block[TIME]
+                keep = np.ones(len(times), dtype=bool)
+                if start is not None:
+                    keep &= times >= start
+                if end is not None:
+                    keep &= times <= end
+                block = {col: values[keep] for col, values in block.items()}
+            if len(block[TIME]) == 0:
+                continue
+            count("load.chunks")
+            count("load.rows", len(block[TIME]))
+            if stats is not None:
+                stats.update(block)
+            yield block